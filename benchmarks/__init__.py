@@ -0,0 +1,13 @@
+"""
+Benchmarks for the site generator.
+
+Run a module from the repository root, e.g.:
+    python3 -m benchmarks.run --size small
+"""
+import os
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
@@ -0,0 +1,95 @@
+"""
+Benchmark the inline tokenizer on paragraphs from 1 KB to 1 MB.
+
+Compares the single-pass text_to_textnodes scanner with the previous
+six-pass pipeline built from the split_nodes_* functions, and reports the
+time per byte for each size. Linear scaling shows up as a flat ns/byte
+column. A second table times the single-pass scanner alone on worst-case
+paragraphs full of brackets that never close.
+
+Usage:
+    python3 benchmarks/bench_inline.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from textnode import (
+    TextNode,
+    TextType,
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+
+SEGMENT = (
+    "Plain words with **bold text** and *italic text* and _more italic_, "
+    "a `code span`, an ![image](/images/tolkien.png) and a [link](/blog/tom). "
+)
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+# Every "[" here is tried as a link that never closes, so a link or image
+# pattern that scans past the next "[" makes these quadratic
+WORST_CASE_SEGMENTS = {
+    "unclosed brackets": "[*a*",
+    "bracket-heavy": "[a",
+    "unclosed images": "![a](",
+}
+
+
+def make_paragraph(size, segment=SEGMENT):
+    """Repeat a segment until the paragraph is at least size bytes."""
+    return segment * (size // len(segment) + 1)
+
+
+def legacy_text_to_textnodes(text):
+    """The previous pipeline: one full pass per kind of markup."""
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def best_time(func, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    print(f"{'size':>10} {'single-pass':>14} {'ns/byte':>9} {'six-pass':>14} {'ns/byte':>9}")
+    for size in SIZES:
+        text = make_paragraph(size)
+        assert text_to_textnodes(text) == legacy_text_to_textnodes(text)
+        repeat = max(3, 1_000_000 // size)
+        single = best_time(text_to_textnodes, text, repeat)
+        legacy = best_time(legacy_text_to_textnodes, text, min(repeat, 3))
+        print(
+            f"{len(text):>10} {single * 1000:>11.2f} ms {single * 1e9 / len(text):>9.1f}"
+            f" {legacy * 1000:>11.2f} ms {legacy * 1e9 / len(text):>9.1f}"
+        )
+
+    # Only the single-pass scanner is timed; the six-pass pipeline is quadratic on bracket-heavy text
+    print()
+    print(f"{'worst case':>18} {'size':>10} {'single-pass':>14} {'ns/byte':>9}")
+    for name, segment in WORST_CASE_SEGMENTS.items():
+        for size in SIZES:
+            text = make_paragraph(size, segment)
+            single = best_time(text_to_textnodes, text, max(1, 100_000 // size))
+            print(f"{name:>18} {len(text):>10} {single * 1000:>11.2f} ms {single * 1e9 / len(text):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
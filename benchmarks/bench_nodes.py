@@ -0,0 +1,82 @@
+"""
+Measure the memory used per node with tracemalloc.
+
+Allocates a large batch of each node type and reports the bytes per node
+for the slotted classes in src/ next to dict-backed copies of the classes
+as they were before slots were added ("before").
+
+Usage:
+    python3 benchmarks/bench_nodes.py [count]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictLeafNode(DictHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+
+class DictParentNode(DictHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+def bytes_per_node(factory, count):
+    """Allocate count nodes and return the traced bytes per node."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding the nodes is not part of the node cost
+    list_bytes = sys.getsizeof(nodes)
+    return (after - before - list_bytes) / count
+
+
+# The text values are shared between all nodes so only the node objects
+# themselves are measured.
+TEXT = "fragment"
+CHILDREN = []
+
+CASES = [
+    ("TextNode", lambda i: DictTextNode(TEXT, TextType.TEXT), lambda i: TextNode(TEXT, TextType.TEXT)),
+    ("LeafNode (text)", lambda i: DictLeafNode(None, TEXT), lambda i: LeafNode(None, TEXT)),
+    ("LeafNode (b)", lambda i: DictLeafNode("b", TEXT), lambda i: LeafNode("b", TEXT)),
+    ("ParentNode (p)", lambda i: DictParentNode("p", CHILDREN), lambda i: ParentNode("p", CHILDREN)),
+]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{'node':<18} {'before':>12} {'after':>12} {'saved':>7}")
+    for name, before_factory, after_factory in CASES:
+        before = bytes_per_node(before_factory, count)
+        after = bytes_per_node(after_factory, count)
+        saved = 100 * (before - after) / before
+        print(f"{name:<18} {before:>8.1f} B/n {after:>8.1f} B/n {saved:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
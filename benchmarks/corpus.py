@@ -0,0 +1,126 @@
+"""
+Deterministic synthetic markdown corpus.
+
+Every page is generated from its own random.Random(seed, index), so the
+same seed always produces the same site, page by page, without holding the
+whole corpus in memory. Pages mix every BlockType and every TextType.
+"""
+import os
+import random
+
+
+SIZES = {
+    "small": 100,
+    "medium": 10_000,
+    "large": 100_000,
+}
+
+WORDS = (
+    "elf ring hobbit shire mountain river forest wizard king road tower "
+    "dragon dwarf song light shadow council journey sword star valley "
+    "the a of and to in is was with for on by"
+).split()
+
+IMAGES = ["/images/tolkien.png", "/images/glorfindel.png", "/images/tom.png", "/images/rivendell.png"]
+
+CODE_LINES = [
+    "def travel(start, end):",
+    "    return road(start, end)",
+    "",
+    "for step in journey:",
+    "    print(step)",
+]
+
+
+def _words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def _inline(rng, count):
+    """A run of text with a random mix of inline markup."""
+    parts = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.55:
+            parts.append(_words(rng, rng.randint(3, 12)))
+        elif kind < 0.67:
+            parts.append(f"**{_words(rng, rng.randint(1, 3))}**")
+        elif kind < 0.75:
+            parts.append(f"*{_words(rng, rng.randint(1, 3))}*")
+        elif kind < 0.80:
+            parts.append(f"_{_words(rng, rng.randint(1, 3))}_")
+        elif kind < 0.88:
+            parts.append(f"`{rng.choice(WORDS)}()`")
+        elif kind < 0.96:
+            parts.append(f"[{_words(rng, rng.randint(1, 4))}](/blog/{rng.choice(WORDS)})")
+        else:
+            parts.append(f"![{_words(rng, 2)}]({rng.choice(IMAGES)})")
+    return " ".join(parts)
+
+
+def _paragraph(rng):
+    return "\n".join(_inline(rng, rng.randint(3, 8)) for _ in range(rng.randint(1, 4)))
+
+
+def _heading(rng):
+    return "#" * rng.randint(2, 4) + " " + _inline(rng, 1)
+
+
+def _code(rng):
+    return "```\n" + "\n".join(rng.choice(CODE_LINES) for _ in range(rng.randint(2, 8))) + "\n```"
+
+
+def _quote(rng):
+    return "\n".join("> " + _inline(rng, rng.randint(1, 3)) for _ in range(rng.randint(1, 4)))
+
+
+def _unordered_list(rng):
+    return "\n".join("- " + _inline(rng, rng.randint(1, 3)) for _ in range(rng.randint(2, 6)))
+
+
+def _ordered_list(rng):
+    return "\n".join(f"{i + 1}. " + _inline(rng, rng.randint(1, 3)) for i in range(rng.randint(2, 6)))
+
+
+# Relative block frequencies, roughly those of a blog
+BLOCK_GENERATORS = [
+    (_paragraph, 50),
+    (_heading, 12),
+    (_code, 8),
+    (_quote, 8),
+    (_unordered_list, 14),
+    (_ordered_list, 8),
+]
+
+
+def generate_page(seed, index):
+    """Return the markdown for page index of the corpus with the given seed."""
+    rng = random.Random(f"{seed}:{index}")
+    generators = [generator for generator, _ in BLOCK_GENERATORS]
+    weights = [weight for _, weight in BLOCK_GENERATORS]
+    blocks = [f"# Page {index}: {_words(rng, 4)}"]
+    for generator in rng.choices(generators, weights, k=rng.randint(5, 30)):
+        blocks.append(generator(rng))
+    return "\n\n".join(blocks) + "\n"
+
+
+def page_path(index):
+    """Relative content path for page index, spread over nested directories."""
+    return os.path.join("blog", f"section{index % 100:02d}", f"post{index}", "index.md")
+
+
+def iter_corpus(pages, seed=0):
+    """Yield (relative path, markdown) for every page of the corpus."""
+    for index in range(pages):
+        yield page_path(index), generate_page(seed, index)
+
+
+def write_corpus(content_dir, pages, seed=0):
+    """Write the corpus as a content/ tree and return the number of bytes written."""
+    total = 0
+    for rel_path, markdown in iter_corpus(pages, seed):
+        path = os.path.join(content_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            total += f.write(markdown)
+    return total
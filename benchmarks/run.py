@@ -0,0 +1,157 @@
+"""
+Time every stage of the page pipeline on a synthetic corpus.
+
+Each page of the corpus is pushed through the stages one after another and
+the time spent in each stage is summed over all pages:
+
+    markdown_to_blocks, block_to_block_type, text_to_textnodes,
+    markdown_to_html_node, to_html, template, write
+
+Results are printed and written as JSON so runs can be compared.
+
+Usage:
+    python3 -m benchmarks.run --size small --out bench_small.json
+    python3 -m benchmarks.run --pages 500 --seed 7
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks import SRC_DIR
+from benchmarks.corpus import SIZES, iter_corpus
+
+from blockhandler import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node
+from template import Template
+from textnode import text_to_textnodes
+
+
+STAGES = [
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "markdown_to_html_node",
+    "to_html",
+    "template",
+    "write",
+]
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(SRC_DIR), "template.html")
+
+
+def run(pages, seed=0, basepath="/"):
+    """Run the benchmark and return the results as a dict."""
+    timings = dict.fromkeys(STAGES, 0.0)
+    block_types = Counter()
+    text_types = Counter()
+    bytes_in = 0
+    bytes_out = 0
+    clock = time.perf_counter
+    template = Template.from_file(TEMPLATE_PATH, basepath)
+    out_dir = tempfile.mkdtemp(prefix="ssg-bench-")
+
+    try:
+        for index, (rel_path, markdown) in enumerate(iter_corpus(pages, seed)):
+            bytes_in += len(markdown.encode("utf-8"))
+
+            start = clock()
+            blocks = markdown_to_blocks(markdown)
+            timings["markdown_to_blocks"] += clock() - start
+
+            start = clock()
+            types = [block_to_block_type(block) for block in blocks]
+            timings["block_to_block_type"] += clock() - start
+            block_types.update(block_type.value for block_type in types)
+
+            inline_texts = [
+                block.replace("\n", " ")
+                for block, block_type in zip(blocks, types)
+                if block_type == BlockType.PARAGRAPH
+            ]
+            start = clock()
+            text_nodes = [text_to_textnodes(text) for text in inline_texts]
+            timings["text_to_textnodes"] += clock() - start
+            text_types.update(node.text_type.value for nodes in text_nodes for node in nodes)
+
+            start = clock()
+            html_node = markdown_to_html_node(markdown)
+            timings["markdown_to_html_node"] += clock() - start
+
+            start = clock()
+            content = html_node.to_html()
+            timings["to_html"] += clock() - start
+
+            start = clock()
+            page = template.render(Title=f"Page {index}", Content=content)
+            timings["template"] += clock() - start
+
+            # Spread the output over a few directories like a real site
+            dest_path = os.path.join(out_dir, str(index % 100), f"{index}.html")
+            start = clock()
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            with open(dest_path, "w") as f:
+                bytes_out += f.write(page)
+            timings["write"] += clock() - start
+    finally:
+        shutil.rmtree(out_dir)
+
+    return {
+        "meta": {
+            "pages": pages,
+            "seed": seed,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "totals": {
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "blocks": dict(sorted(block_types.items())),
+            "inline_nodes": dict(sorted(text_types.items())),
+        },
+        "stages": {
+            stage: {
+                "seconds": round(seconds, 6),
+                "us_per_page": round(seconds * 1e6 / pages, 2) if pages else 0.0,
+                "mb_per_second": round(bytes_in / seconds / 1e6, 2) if seconds else None,
+            }
+            for stage, seconds in timings.items()
+        },
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on a synthetic corpus.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--size", choices=sorted(SIZES), default="small", help="corpus preset (default: small)")
+    group.add_argument("--pages", type=int, help="exact number of pages")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed (default: 0)")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    pages = args.pages if args.pages is not None else SIZES[args.size]
+    results = run(pages, args.seed)
+
+    print(f"{pages} pages, {results['totals']['bytes_in'] / 1e6:.1f} MB of markdown")
+    print(f"{'stage':<24} {'seconds':>10} {'us/page':>10} {'MB/s':>8}")
+    for stage, timing in results["stages"].items():
+        mb_per_second = timing["mb_per_second"] or 0.0
+        print(f"{stage:<24} {timing['seconds']:>10.3f} {timing['us_per_page']:>10.1f} {mb_per_second:>8.1f}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+
+BLOCK_CACHE_FILENAME = "blocks.sqlite3"
+PAGE_CACHE_FILENAME = "pages.sqlite3"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Bump when the layout of cached values changes
+CACHE_FORMAT = 2
+# New blocks are written in batches of this size
+FLUSH_EVERY = 512
+
+
+class BlockCache:
+    """
+    On-disk cache of rendered block HTML.
+    Each block is keyed by the sha256 of its markdown, the parser version
+    and the URL resolver, so identical blocks on different pages share one
+    entry and a parser or basepath change never serves stale HTML. Entries live in a sqlite
+    database in WAL mode: every process opens its own connection, which
+    lets parallel workers read and write the same cache. Once the stored
+    HTML exceeds max_bytes, the least recently used blocks are evicted.
+    """
+
+    filename = BLOCK_CACHE_FILENAME
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        from blockhandler import PARSER_VERSION
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._prefix = f"{CACHE_FORMAT}:{PARSER_VERSION}\0".encode("utf-8")
+        self._pending = {}
+        self._touched = set()
+        self._connection = None
+
+    @classmethod
+    def open(cls, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """Return the cache stored in cache_dir."""
+        return cls(os.path.join(cache_dir, cls.filename), max_bytes)
+
+    def _connect(self):
+        if self._connection is not None:
+            return self._connection
+        dirname = os.path.dirname(self.path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        try:
+            self._connection = self._create()
+        except sqlite3.DatabaseError:
+            # A corrupt cache is simply started over
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+            self._connection = self._create()
+        return self._connection
+
+    def _create(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS blocks ("
+                "key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS blocks_last_used ON blocks (last_used)")
+        except sqlite3.DatabaseError:
+            connection.close()
+            raise
+        return connection
+
+    def key(self, text, resolver=None):
+        """Return the cache key for a piece of markdown rendered with resolver."""
+        context = "" if resolver is None else resolver.cache_key
+        return hashlib.sha256(self._prefix + f"{context}\0{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached HTML for key, or None."""
+        html = self._pending.get(key)
+        if html is None:
+            row = self._connect().execute("SELECT html FROM blocks WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            html = row[0]
+            self._touched.add(key)
+        self.hits += 1
+        return html
+
+    def put(self, key, html):
+        """Store the HTML for key; written to disk on the next flush."""
+        self._pending[key] = html
+        if len(self._pending) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self):
+        """Write new blocks, mark used blocks as recent and evict old ones."""
+        if not self._pending and not self._touched:
+            return
+        now = time.time()
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO blocks (key, html, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, html, len(html.encode("utf-8")), now) for key, html in self._pending.items()],
+            )
+            connection.executemany(
+                "UPDATE blocks SET last_used = ? WHERE key = ?",
+                [(now, key) for key in self._touched if key not in self._pending],
+            )
+            self._evict(connection)
+        self._pending.clear()
+        self._touched.clear()
+
+    def _evict(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM blocks").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in connection.execute("SELECT key, size FROM blocks ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM blocks WHERE key = ?", evicted)
+
+    def close(self):
+        """Flush pending writes and close the database."""
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class PageCache(BlockCache):
+    """
+    On-disk cache of rendered page bodies, keyed by the whole markdown
+    source, the parser version and the URL resolver. The body does not
+    depend on the template, so changing it only re-applies the template
+    to the cached HTML.
+    """
+
+    filename = PAGE_CACHE_FILENAME
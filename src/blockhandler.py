@@ -1,5 +1,15 @@
+import io
+import json
+import time
 from enum import Enum
-from textnode import text_to_textnodes, text_node_to_html_node
+from functools import partial
+from docinfo import DocumentInfo
+from textnode import IMAGE_PATTERN, LINK_OR_IMAGE_PATTERN, text_to_textnodes, text_node_to_html_node
+
+
+# Bump whenever a change to the parser or renderer alters the generated HTML,
+# so that incremental builds know their recorded outputs are out of date.
+PARSER_VERSION = 5
 
 
 class BlockType(Enum):
@@ -11,43 +21,136 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+def _is_blank(line):
+    return not line.strip()
+
+
+def _split_blocks(lines):
+    """
+    Group lines into blocks separated by blank lines, without any special
+    handling for fenced code. Yields lists of lines with the leading
+    whitespace of the first line and the trailing whitespace of the last
+    line removed.
+    """
+    block = []
+    for line in lines:
+        if _is_blank(line):
+            if block:
+                block[-1] = block[-1].rstrip()
+                yield block
+                block = []
+        elif block:
+            block.append(line)
+        else:
+            block.append(line.lstrip())
+    
+    if block:
+        block[-1] = block[-1].rstrip()
+        yield block
+
+
+def _is_fence_start(line):
+    """Check whether a line opens a fenced code block spanning several lines."""
+    if not line.startswith("```"):
+        return False
+    stripped = line.rstrip()
+    # ```code``` on a single line is a complete code block on its own
+    return not (len(stripped) >= 6 and stripped.endswith("```"))
+
+
+def iter_block_lines(lines):
+    """
+    Lex markdown from an iterable of lines, such as an open file, in one pass.
+    Yields each block as a list of lines, without line endings.
+    Blocks are separated by blank lines, except inside fenced code blocks,
+    which run until their closing fence and may contain blank lines.
+    """
+    lines = iter(lines)
+    block = []
+    
+    for line in lines:
+        line = line.rstrip("\r\n")
+        
+        if block:
+            if _is_blank(line):
+                block[-1] = block[-1].rstrip()
+                yield block
+                block = []
+            else:
+                block.append(line)
+            continue
+        
+        if _is_blank(line):
+            continue
+        
+        line = line.lstrip()
+        if not _is_fence_start(line):
+            block.append(line)
+            continue
+        
+        # Fenced code: read up to and including the closing fence
+        fence = [line]
+        for line in lines:
+            line = line.rstrip("\r\n")
+            fence.append(line)
+            if line.rstrip().endswith("```"):
+                fence[-1] = line.rstrip()
+                yield fence
+                break
+        else:
+            # Never closed: treat the lines as ordinary blocks
+            yield from _split_blocks(fence)
+    
+    if block:
+        block[-1] = block[-1].rstrip()
+        yield block
+
+
+def iter_blocks(lines):
+    """
+    Lex markdown from an iterable of lines and yield (BlockType, lines)
+    for every block, classifying each block as it is read.
+    """
+    for block_lines in iter_block_lines(lines):
+        yield lines_to_block_type(block_lines), block_lines
+
+
+def _iter_markdown_lines(markdown):
+    """Iterate over the lines of a markdown string or open file."""
+    if isinstance(markdown, str):
+        return io.StringIO(markdown)
+    return markdown
+
+
 def markdown_to_blocks(markdown):
     """
     Split a markdown document into blocks.
-    Blocks are separated by double newlines.
+    Blocks are separated by blank lines; fenced code blocks may contain them.
     Leading/trailing whitespace is stripped from each block.
     Empty blocks are removed.
     """
-    blocks = markdown.split("\n\n")
-    
-    result = []
-    for block in blocks:
-        stripped = block.strip()
-        if stripped:
-            result.append(stripped)
-    
-    return result
+    return ["\n".join(block_lines) for block_lines in iter_block_lines(_iter_markdown_lines(markdown))]
 
 
-def block_to_block_type(block):
+def lines_to_block_type(lines):
     """
-    Determine the type of a markdown block.
-    Assumes leading/trailing whitespace has been stripped.
+    Determine the type of a markdown block given as a list of lines.
+    Assumes leading/trailing whitespace has been stripped from the block.
     """
-    lines = block.split("\n")
+    first_line = lines[0]
     
-    if block.startswith("#"):
+    if first_line.startswith("#"):
         hash_count = 0
-        for char in block:
+        for char in first_line:
             if char == "#":
                 hash_count += 1
             else:
                 break
         
-        if 1 <= hash_count <= 6 and len(block) > hash_count and block[hash_count] == " ":
+        if 1 <= hash_count <= 6 and len(first_line) > hash_count and first_line[hash_count] == " ":
             return BlockType.HEADING
     
-    if block.startswith("```") and block.endswith("```"):
+    if first_line.startswith("```") and lines[-1].endswith("```"):
         return BlockType.CODE
     
     if all(line.startswith(">") for line in lines):
@@ -70,54 +173,61 @@ def block_to_block_type(block):
     return BlockType.PARAGRAPH
 
 
-def text_to_children(text):
+def block_to_block_type(block):
+    """
+    Determine the type of a markdown block.
+    Assumes leading/trailing whitespace has been stripped.
+    """
+    return lines_to_block_type(block.split("\n"))
+
+
+def text_to_children(text, resolver=None):
     """
     Convert text with inline markdown to a list of HTMLNode children.
     """
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, resolver)
         children.append(html_node)
     return children
 
 
-def _paragraph_to_html(block):
+def _paragraph_to_html(lines, resolver=None):
     """Convert a paragraph block to HTML."""
     from htmlnode import ParentNode
-    normalized_text = block.replace("\n", " ")
-    children = text_to_children(normalized_text)
+    normalized_text = " ".join(lines)
+    children = text_to_children(normalized_text, resolver)
     return ParentNode("p", children)
 
 
-def _heading_to_html(block):
+def _heading_to_html(lines, resolver=None):
     """Convert a heading block to HTML."""
     from htmlnode import ParentNode
     level = 0
-    for char in block:
+    for char in lines[0]:
         if char == "#":
             level += 1
         else:
             break
-    heading_text = block[level + 1:]
-    children = text_to_children(heading_text)
+    heading_text = "\n".join(lines)[level + 1:]
+    children = text_to_children(heading_text, resolver)
     return ParentNode(f"h{level}", children)
 
 
-def _code_to_html(block):
+def _code_to_html(lines):
     """Convert a code block to HTML."""
     from htmlnode import ParentNode, LeafNode
-    code_text = block[3:-3]
+    code_text = "\n".join(lines)[3:-3]
     if code_text.startswith("\n"):
         code_text = code_text[1:]
     code_node = LeafNode("code", code_text)
     return ParentNode("pre", [code_node])
 
 
-def _quote_to_html(block):
+def _quote_to_html(lines, resolver=None):
     """Convert a quote block to HTML."""
     from htmlnode import ParentNode
-    lines = block.split("\n")
     quote_lines = []
     for line in lines:
         if line.startswith("> "):
@@ -125,60 +235,220 @@ def _quote_to_html(block):
         else:
             quote_lines.append(line[1:])
     quote_text = "\n".join(quote_lines)
-    children = text_to_children(quote_text)
+    children = text_to_children(quote_text, resolver)
     return ParentNode("blockquote", children)
 
 
-def _unordered_list_to_html(block):
+def _unordered_list_to_html(lines, resolver=None):
     """Convert an unordered list block to HTML."""
     from htmlnode import ParentNode
-    lines = block.split("\n")
     list_items = []
     for line in lines:
         item_text = line[2:]
-        children = text_to_children(item_text)
+        children = text_to_children(item_text, resolver)
         list_items.append(ParentNode("li", children))
     return ParentNode("ul", list_items)
 
 
-def _ordered_list_to_html(block):
+def _ordered_list_to_html(lines, resolver=None):
     """Convert an ordered list block to HTML."""
     from htmlnode import ParentNode
-    lines = block.split("\n")
     list_items = []
     for i, line in enumerate(lines):
         prefix_length = len(f"{i + 1}. ")
         item_text = line[prefix_length:]
-        children = text_to_children(item_text)
+        children = text_to_children(item_text, resolver)
         list_items.append(ParentNode("li", children))
     return ParentNode("ol", list_items)
 
 
-def markdown_to_html_node(markdown):
+def _block_to_html(block_type, lines, resolver=None):
+    """Convert one typed block to an HTMLNode."""
+    match block_type:
+        case BlockType.PARAGRAPH:
+            return _paragraph_to_html(lines, resolver)
+        case BlockType.HEADING:
+            return _heading_to_html(lines, resolver)
+        case BlockType.CODE:
+            return _code_to_html(lines)
+        case BlockType.QUOTE:
+            return _quote_to_html(lines, resolver)
+        case BlockType.UNORDERED_LIST:
+            return _unordered_list_to_html(lines, resolver)
+        case BlockType.ORDERED_LIST:
+            return _ordered_list_to_html(lines, resolver)
+
+
+def _count_leaves(node):
+    """Count the leaf nodes of a block, i.e. the inline nodes it produced."""
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.children is None:
+            count += 1
+        else:
+            stack.extend(node.children)
+    return count
+
+
+def _heading_info(lines):
+    """Return [level, text] of a heading block, with the text as written."""
+    level = len(lines[0]) - len(lines[0].lstrip("#"))
+    return [level, lines[0][level:].strip()]
+
+
+def _block_metadata(block_type, lines, node, resolver=None):
     """
-    Convert a full markdown document to a single parent HTMLNode.
-    Returns a div containing all the block-level elements.
+    Count the words of one block (code blocks have none) and collect its
+    link and image URLs, in document order.
     """
-    from htmlnode import ParentNode
+    links = []
+    images = []
+    if block_type == BlockType.CODE:
+        return {"words": 0, "links": links, "images": images}
+    
+    text = " ".join(lines)
+    words = len(text.split())
+    # Block markers are split off as words of their own
+    if block_type == BlockType.HEADING:
+        words -= 1
+    elif block_type == BlockType.UNORDERED_LIST or block_type == BlockType.ORDERED_LIST:
+        words -= len(lines)
+    elif block_type == BlockType.QUOTE:
+        words -= sum(1 for line in lines if line == ">" or line.startswith("> "))
+    
+    if "](" not in text:
+        pass
+    elif "`" not in text:
+        # Links and images are matched by the same pattern as the inline
+        # tokenizer, so the tree does not have to be walked
+        for match in LINK_OR_IMAGE_PATTERN.finditer(text):
+            _, src, anchor_text, href = match.groups()
+            if src is not None:
+                images.append(src if resolver is None else resolver.resolve(src))
+                continue
+            links.append(href if resolver is None else resolver.resolve(href))
+            # A linked image comes after its link, as in the tree
+            for image in IMAGE_PATTERN.finditer(anchor_text):
+                images.append(image.group(2) if resolver is None else resolver.resolve(image.group(2)))
+    else:
+        # Code spans may contain link syntax that is not a link
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.tag == "a":
+                links.append(node.props["href"])
+            elif node.tag == "img":
+                images.append(node.props["src"])
+            if node.children is not None:
+                stack.extend(reversed(node.children))
+    
+    return {"words": words, "links": links, "images": images}
+
+
+def _convert_block(block_type, lines, resolver=None, cache=None, info=None, stats=None):
+    """
+    Convert one typed block to an HTMLNode, adding its metadata to a
+    DocumentInfo and its counters to a PageStats when given.
+    With a BlockCache, returns a raw LeafNode holding the block's rendered
+    HTML, taken from the cache when the same block was rendered before.
+    """
+    if cache is None:
+        block_node = _block_to_html(block_type, lines, resolver)
+        if stats is not None:
+            stats.inline_nodes += _count_leaves(block_node)
+        if info is not None:
+            if block_type == BlockType.HEADING:
+                info.add_heading(*_heading_info(lines))
+            info.add_block_lazy(partial(_block_metadata, block_type, lines, block_node, resolver))
+        return block_node
     
-    blocks = markdown_to_blocks(markdown)
+    from htmlnode import LeafNode
+    
+    # Entries hold the HTML and the block's metadata, so a cached block
+    # still contributes to the DocumentInfo
+    key = cache.key("\n".join(lines), resolver)
+    entry = cache.get(key)
+    if entry is None:
+        block_node = _block_to_html(block_type, lines, resolver)
+        if stats is not None:
+            stats.inline_nodes += _count_leaves(block_node)
+        html = block_node.to_html()
+        block_info = _block_metadata(block_type, lines, block_node, resolver)
+        block_info["headings"] = [_heading_info(lines)] if block_type == BlockType.HEADING else []
+        cache.put(key, json.dumps([html, block_info]))
+    else:
+        html, block_info = json.loads(entry)
+        if stats is not None:
+            stats.cached_blocks += 1
+    if info is not None:
+        info.add_block(block_info)
+    return LeafNode(None, html)
+
+
+def _markdown_to_block_nodes_instrumented(blocks, stats, cache=None, resolver=None, info=None):
+    """
+    Convert blocks like markdown_to_html_node, recording the time spent
+    lexing blocks and parsing their inline content in a PageStats.
+    """
+    clock = time.perf_counter
+    cpu_clock = time.process_time
     block_nodes = []
     
-    for block in blocks:
-        block_type = block_to_block_type(block)
+    while True:
+        wall, cpu = clock(), cpu_clock()
+        block = next(blocks, None)
+        stats.add_time("block_split", clock() - wall, cpu_clock() - cpu)
+        if block is None:
+            return block_nodes
         
-        match block_type:
-            case BlockType.PARAGRAPH:
-                block_nodes.append(_paragraph_to_html(block))
-            case BlockType.HEADING:
-                block_nodes.append(_heading_to_html(block))
-            case BlockType.CODE:
-                block_nodes.append(_code_to_html(block))
-            case BlockType.QUOTE:
-                block_nodes.append(_quote_to_html(block))
-            case BlockType.UNORDERED_LIST:
-                block_nodes.append(_unordered_list_to_html(block))
-            case BlockType.ORDERED_LIST:
-                block_nodes.append(_ordered_list_to_html(block))
+        block_type, lines = block
+        wall, cpu = clock(), cpu_clock()
+        block_node = _convert_block(block_type, lines, resolver, cache, info, stats)
+        stats.add_time("inline_parse", clock() - wall, cpu_clock() - cpu)
+        
+        stats.blocks[block_type.value] += 1
+        block_nodes.append(block_node)
+
+
+def parse_markdown(markdown, stats=None, cache=None, resolver=None):
+    """
+    Convert a full markdown document to a single parent HTMLNode and
+    collect its DocumentInfo in the same pass.
+    Accepts a markdown string or an open file, which is read line by line.
+    Pass an instrument.PageStats to record block and inline parsing times,
+    a blockcache.BlockCache to reuse the HTML of previously seen blocks,
+    and a urls.UrlResolver to apply the basepath to link and image URLs.
+    Returns (div node containing all the block-level elements, DocumentInfo).
+    """
+    info = DocumentInfo()
+    return _markdown_to_div(markdown, stats, cache, resolver, info), info
+
+
+def markdown_to_html_node(markdown, stats=None, cache=None, resolver=None):
+    """
+    Convert a full markdown document to a single parent HTMLNode.
+    Takes the same arguments as parse_markdown, without collecting a
+    DocumentInfo. Returns a div containing all the block-level elements.
+    """
+    return _markdown_to_div(markdown, stats, cache, resolver)
+
+
+def _markdown_to_div(markdown, stats=None, cache=None, resolver=None, info=None):
+    from htmlnode import ParentNode
+    
+    blocks = iter_blocks(_iter_markdown_lines(markdown))
+    
+    if stats is not None:
+        return ParentNode("div", _markdown_to_block_nodes_instrumented(blocks, stats, cache, resolver, info))
+    
+    block_nodes = []
+    if cache is None and info is None:
+        for block_type, lines in blocks:
+            block_nodes.append(_block_to_html(block_type, lines, resolver))
+    else:
+        for block_type, lines in blocks:
+            block_nodes.append(_convert_block(block_type, lines, resolver, cache, info))
     
     return ParentNode("div", block_nodes)
@@ -0,0 +1,109 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+GZIP_SUFFIX = ".gz"
+# Outputs that servers send compressed; images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = frozenset({".html", ".css", ".js", ".svg", ".xml"})
+# Files smaller than this gain too little to be worth a sidecar
+DEFAULT_MIN_SIZE = 1024
+
+
+class CompressResult:
+    """Counts of what a compress_outputs() run did."""
+
+    def __init__(self):
+        self.compressed = []
+        self.unchanged = 0
+        self.skipped = 0
+        self.deleted = []
+
+    def __repr__(self):
+        return (
+            f"CompressResult(compressed={len(self.compressed)}, unchanged={self.unchanged}, "
+            f"skipped={self.skipped}, deleted={len(self.deleted)})"
+        )
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def compress_file(path):
+    """
+    Write path + ".gz" at maximum compression.
+    The gzip header holds no name or timestamp, so the same input always
+    gives the same sidecar. Returns False, and removes any old sidecar,
+    when compression does not make the file smaller.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    sidecar_path = path + GZIP_SUFFIX
+    if len(compressed) >= len(data):
+        _remove(sidecar_path)
+        return False
+    tmp_path = sidecar_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, sidecar_path)
+    except BaseException:
+        _remove(tmp_path)
+        raise
+    return True
+
+
+def compress_outputs(dest_dir, jobs=None, min_size=DEFAULT_MIN_SIZE):
+    """
+    Write a .gz sidecar next to every HTML, CSS, JS, SVG and XML file in
+    dest_dir, for servers that send precompressed files as they are.
+    Files with a sidecar newer than themselves are left alone, so pages
+    that a build did not rewrite are not compressed again. Files below
+    min_size bytes get no sidecar, and sidecars whose file is gone, or
+    now too small, are deleted. Compression runs in a thread pool; zlib
+    releases the GIL while it works. Returns a CompressResult.
+    """
+    result = CompressResult()
+    to_compress = []
+    for dirpath, _, filenames in os.walk(dest_dir):
+        names = set(filenames)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if filename.endswith(GZIP_SUFFIX):
+                source_name = filename[:-len(GZIP_SUFFIX)]
+                is_sidecar = os.path.splitext(source_name)[1].lower() in COMPRESSIBLE_EXTENSIONS
+                if is_sidecar and source_name not in names:
+                    os.remove(path)
+                    result.deleted.append(path)
+                continue
+            if os.path.splitext(filename)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            stat = os.stat(path)
+            sidecar_name = filename + GZIP_SUFFIX
+            if stat.st_size < min_size:
+                if sidecar_name in names and _remove(path + GZIP_SUFFIX):
+                    result.deleted.append(path + GZIP_SUFFIX)
+                result.skipped += 1
+                continue
+            if sidecar_name in names and os.stat(path + GZIP_SUFFIX).st_mtime_ns >= stat.st_mtime_ns:
+                result.unchanged += 1
+                continue
+            to_compress.append(path)
+
+    if to_compress:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # list() re-raises the first error, if any
+            written = list(executor.map(compress_file, to_compress))
+        for path, was_written in zip(to_compress, written):
+            if was_written:
+                result.compressed.append(path + GZIP_SUFFIX)
+            else:
+                result.skipped += 1
+
+    return result
@@ -0,0 +1,191 @@
+import os
+import threading
+import traceback
+from collections import OrderedDict
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from blockhandler import parse_markdown
+from docinfo import document_title
+from frontmatter import resolve_page_template, split_front_matter, template_values
+from options import as_build_options
+from watch import file_state
+
+
+# Rendered pages kept in memory; the least recently served are dropped first
+DEFAULT_MAX_PAGES = 1024
+
+
+class PageRenderer:
+    """
+    Renders pages from content_dir on demand and keeps the results in
+    memory. A cached page is served again for as long as its source has
+    the same mtime and size and its template has not been recompiled, so
+    checking a page costs two stats. Nothing is read before the first
+    request. Drafts are rendered too, so they can be previewed.
+    """
+
+    def __init__(self, content_dir, template_path, options=None, max_pages=DEFAULT_MAX_PAGES):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.options = as_build_options(options)
+        self.max_pages = max_pages
+        self.renders = 0
+        self._lock = threading.Lock()
+        # source path -> (source state, page template path, Template, HTML bytes)
+        self._pages = OrderedDict()
+
+    def source_path(self, url_path):
+        """
+        Return the markdown source of the page at url_path, relative to
+        the basepath, or None if no page can live there. "/" and "/blog/"
+        map to index.md in their directory, and "/blog/post.html" to
+        blog/post.md, the same paths a build writes to.
+        """
+        parts = [part for part in url_path.split("/") if part not in ("", ".")]
+        if ".." in parts:
+            return None
+        if url_path.endswith("/") or not parts:
+            return os.path.join(self.content_dir, *parts, "index.md")
+        if parts[-1].endswith(".html"):
+            parts[-1] = parts[-1][:-len(".html")] + ".md"
+            return os.path.join(self.content_dir, *parts)
+        return None
+
+    def render(self, src_path):
+        """Return the HTML of the page built from src_path as bytes, or None if there is no such source."""
+        state = file_state(src_path)
+        if state is None:
+            with self._lock:
+                self._pages.pop(src_path, None)
+            return None
+
+        with self._lock:
+            cached = self._pages.get(src_path)
+            if cached is not None:
+                self._pages.move_to_end(src_path)
+        if cached is not None:
+            cached_state, page_template_path, template, html = cached
+            # load_template() recompiles a template whose file changed
+            current = self.options.load_template(page_template_path)
+            if cached_state == state and current is template:
+                return html
+
+        # Rendering happens outside the lock, so other pages are served meanwhile
+        html, page_template_path, template = self._render(src_path)
+        with self._lock:
+            self.renders += 1
+            self._pages[src_path] = (state, page_template_path, template, html)
+            self._pages.move_to_end(src_path)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+        return html
+
+    def _render(self, src_path):
+        with open(src_path, "r") as f:
+            markdown_content = f.read()
+        front_matter, markdown_content = split_front_matter(markdown_content)
+        page_template_path = resolve_page_template(front_matter, self.template_path)
+        template = self.options.load_template(page_template_path)
+        html_node, info = parse_markdown(markdown_content, resolver=self.options.resolver())
+        values = template_values(front_matter, template.slots)
+        values["Title"] = values.get("title") or document_title(info, markdown_content)
+        values["Content"] = html_node
+        return template.render(**values).encode("utf-8"), page_template_path, template
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves rendered pages from a PageRenderer and everything else straight
+    from the static directory, under the site's basepath.
+    """
+
+    def __init__(self, *args, renderer=None, **kwargs):
+        self.renderer = renderer
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self._serve_page(send_body=True):
+            return
+        super().do_GET()
+
+    def do_HEAD(self):
+        if self._serve_page(send_body=False):
+            return
+        super().do_HEAD()
+
+    def _site_path(self):
+        """Return the request path relative to the basepath, starting with "/", or None outside it."""
+        path = unquote(urlsplit(self.path).path)
+        basepath = self.renderer.options.basepath
+        if not path.startswith(basepath):
+            # The basepath without its trailing slash is the site root too
+            return "/" if path == basepath[:-1] else None
+        return path[len(basepath) - 1:]
+
+    def translate_path(self, path):
+        # Only called for requests inside the basepath; see _serve_page()
+        return super().translate_path(self._site_path())
+
+    def _serve_page(self, send_body):
+        """Serve the page at the request path, if there is one; returns whether a response was sent."""
+        site_path = self._site_path()
+        if site_path is None:
+            self.send_error(404)
+            return True
+        src_path = self.renderer.source_path(site_path)
+        if src_path is None:
+            index_path = self.renderer.source_path(site_path + "/")
+            if index_path is not None and os.path.isfile(index_path):
+                # Like a static server, send directories to their trailing slash so relative links work
+                self.send_response(301)
+                self.send_header("Location", urlsplit(self.path).path + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return True
+            return False
+
+        try:
+            body = self.renderer.render(src_path)
+        except Exception as e:
+            body = f"Error generating page {src_path}: {type(e).__name__}: {e}\n\n{traceback.format_exc()}"
+            self._send(500, "text/plain; charset=utf-8", body.encode("utf-8"), send_body)
+            return True
+        if body is None:
+            return False
+        self._send(200, "text/html; charset=utf-8", body, send_body)
+        return True
+
+    def _send(self, status, content_type, body, send_body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_site(content_dir, static_dir, template_path, options=None, port=8888):
+    """
+    Serve the site on port, rendering each page with options, an
+    options.BuildOptions, when it is requested, until interrupted.
+    Nothing is built up front and docs/ is not used, so the server starts
+    in the same time however large the site is.
+    """
+    renderer = PageRenderer(content_dir, template_path, options)
+    basepath = renderer.options.basepath
+    handler = partial(DevRequestHandler, directory=static_dir, renderer=renderer)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    print(f"Serving {content_dir} at http://localhost:{port}{basepath} (rendering on request, Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
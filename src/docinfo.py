@@ -0,0 +1,157 @@
+import re
+from collections import Counter
+
+
+# Runs of characters that do not belong in an anchor
+SLUG_SEPARATOR_PATTERN = re.compile(r"[^\w]+")
+
+
+def slugify(text):
+    """
+    Turn heading text into an anchor: lowercase words joined by hyphens,
+    with markdown markup and punctuation dropped.
+    """
+    slug = SLUG_SEPARATOR_PATTERN.sub("-", text.lower().replace("_", " ")).strip("-")
+    return slug or "section"
+
+
+class Heading:
+    __slots__ = ("level", "text", "anchor")
+
+    def __init__(self, level, text, anchor):
+        self.level = level
+        self.text = text
+        self.anchor = anchor
+
+    def __eq__(self, other):
+        return (self.level, self.text, self.anchor) == (other.level, other.text, other.anchor)
+
+    def __repr__(self):
+        return f"Heading({self.level!r}, {self.text!r}, {self.anchor!r})"
+
+
+class DocumentInfo:
+    """
+    Metadata of a markdown document, collected while its blocks are parsed.
+    Holds the title (the first h1), the heading outline with an anchor per
+    heading that is unique within the document, the word count, and the
+    link and image URLs in document order, as written to the page.
+
+    Headings, and with them the title, are recorded as they are parsed.
+    The other counters are kept per block and only added up when first
+    read, so a build that only needs the title does not pay for them.
+    """
+
+    def __init__(self):
+        self.title = None
+        self.headings = []
+        self._word_count = 0
+        self._links = []
+        self._images = []
+        self._anchors = Counter()
+        # Block metadata not added up yet: dicts, or callables returning one
+        self._pending = []
+
+    def add_heading(self, level, text):
+        slug = slugify(text)
+        anchor = slug if not self._anchors[slug] else f"{slug}-{self._anchors[slug]}"
+        self._anchors[slug] += 1
+        self.headings.append(Heading(level, text, anchor))
+        if level == 1 and self.title is None:
+            self.title = text
+
+    def add_block(self, block_info):
+        """
+        Add the metadata of one block, a dict with "headings" as
+        [level, text] pairs, "words", "links" and "images".
+        """
+        for level, text in block_info["headings"]:
+            self.add_heading(level, text)
+        self._pending.append(block_info)
+
+    def add_block_lazy(self, collect):
+        """
+        Add the words, links and images of one block, computed by calling
+        collect() the first time any of them is read.
+        """
+        self._pending.append(collect)
+
+    def _collect(self):
+        for block_info in self._pending:
+            if callable(block_info):
+                block_info = block_info()
+            self._word_count += block_info["words"]
+            self._links.extend(block_info["links"])
+            self._images.extend(block_info["images"])
+        self._pending.clear()
+
+    @property
+    def word_count(self):
+        if self._pending:
+            self._collect()
+        return self._word_count
+
+    @property
+    def links(self):
+        if self._pending:
+            self._collect()
+        return self._links
+
+    @property
+    def images(self):
+        if self._pending:
+            self._collect()
+        return self._images
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "headings": [[heading.level, heading.text, heading.anchor] for heading in self.headings],
+            "word_count": self.word_count,
+            "links": self.links,
+            "images": self.images,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        info = cls()
+        for level, text, _ in data["headings"]:
+            info.add_heading(level, text)
+        info.title = data["title"]
+        info._word_count = data["word_count"]
+        info._links = list(data["links"])
+        info._images = list(data["images"])
+        return info
+
+    def __repr__(self):
+        return (
+            f"DocumentInfo(title={self.title!r}, headings={len(self.headings)}, "
+            f"word_count={self.word_count}, links={len(self.links)}, images={len(self.images)})"
+        )
+
+
+def extract_title(markdown):
+    """
+    Extract the h1 header from a markdown string.
+    Returns the header text without the # and whitespace.
+    Raises an exception if no h1 header is found.
+    """
+    lines = markdown.split("\n")
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("# ") and not stripped.startswith("## "):
+            # Remove the # and strip whitespace
+            return stripped[2:].strip()
+
+    raise Exception("No h1 header found in markdown")
+
+
+def document_title(info, markdown):
+    """
+    Return the title collected in a DocumentInfo.
+    Falls back to extract_title() for documents whose h1 is not a heading
+    block of its own, which raises if there is none at all.
+    """
+    if info.title is not None:
+        return info.title
+    return extract_title(markdown)
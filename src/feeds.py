@@ -0,0 +1,240 @@
+import heapq
+import os
+import re
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+
+from docinfo import extract_title
+from frontmatter import split_front_matter
+from output import WriteResult, write_if_changed
+
+
+SITEMAP_FILENAME = "sitemap.xml"
+FEED_FILENAME = "atom.xml"
+# The most URLs a single sitemap file may list
+SITEMAP_MAX_URLS = 50_000
+# Newest pages listed in the feed
+DEFAULT_FEED_ENTRIES = 20
+# Sitemap shards written next to the index when a site outgrows one file
+SHARD_FILENAME_PATTERN = re.compile(r"sitemap-(\d+)\.xml")
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+
+
+def format_timestamp(mtime_ns):
+    """Format a timestamp in nanoseconds as a UTC W3C datetime, as sitemaps and Atom use."""
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(mtime_ns // 1_000_000_000))
+
+
+def format_date(value):
+    """
+    Format a front matter date, such as 2024-01-15 or 2024-01-15T09:30:00+02:00,
+    as a UTC W3C datetime. Dates without a time zone are taken as UTC.
+    Returns None for anything that is not an ISO 8601 date.
+    """
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def page_url(site_url, basepath, rel_path):
+    """
+    Return the absolute URL of the page written to rel_path, relative to
+    the output directory. index.html pages are linked as their directory.
+    """
+    rel_path = rel_path.replace(os.sep, "/")
+    if rel_path == "index.html":
+        rel_path = ""
+    elif rel_path.endswith("/index.html"):
+        rel_path = rel_path[:-len("index.html")]
+    return site_url.rstrip("/") + basepath + quote(rel_path)
+
+
+def page_title(src_path):
+    """Return the title of a markdown page: its front matter title, else its h1."""
+    with open(src_path, "r") as f:
+        front_matter, markdown = split_front_matter(f.read())
+    title = front_matter.get("title")
+    if title:
+        return str(title)
+    return extract_title(markdown)
+
+
+class SitemapWriter:
+    """
+    Writes dest_dir/sitemap.xml from URLs added one at a time, in the
+    order they are added. Only one shard of at most max_urls URLs is held
+    in memory: once a shard is full it is written out as sitemap-N.xml,
+    and sitemap.xml becomes a sitemap index listing the shards. Files are
+    written with write_if_changed(), so shards whose URLs and lastmod
+    dates are the same as last time keep their mtime.
+    """
+
+    def __init__(self, dest_dir, max_urls=SITEMAP_MAX_URLS):
+        self.dest_dir = dest_dir
+        self.max_urls = max_urls
+        self.result = WriteResult()
+        self._urls = []
+        self._lastmod = ""
+        # (file name, latest lastmod) of every shard written so far
+        self._shards = []
+
+    def add(self, url, lastmod):
+        if len(self._urls) == self.max_urls:
+            self._write_shard()
+        self._urls.append(f"<url><loc>{escape(url)}</loc><lastmod>{lastmod}</lastmod></url>\n")
+        self._lastmod = max(self._lastmod, lastmod)
+
+    def _write(self, filename, text):
+        path = os.path.join(self.dest_dir, filename)
+        self.result.add(path, write_if_changed(path, text.encode("utf-8")))
+
+    def _urlset(self):
+        return f'{XML_DECLARATION}<urlset xmlns="{SITEMAP_NAMESPACE}">\n{"".join(self._urls)}</urlset>\n'
+
+    def _write_shard(self):
+        filename = f"sitemap-{len(self._shards) + 1}.xml"
+        self._write(filename, self._urlset())
+        self._shards.append((filename, self._lastmod))
+        self._urls = []
+        self._lastmod = ""
+
+    def close(self, site_url, basepath="/"):
+        """
+        Write what is left and remove shards left over from a larger site.
+        site_url and basepath locate the shards for the sitemap index.
+        Returns an output.WriteResult of the files written and left unchanged.
+        """
+        if self._shards:
+            if self._urls:
+                self._write_shard()
+            base = site_url.rstrip("/") + basepath
+            entries = "".join(
+                f"<sitemap><loc>{escape(base + filename)}</loc><lastmod>{lastmod}</lastmod></sitemap>\n"
+                for filename, lastmod in self._shards
+            )
+            index = f'{XML_DECLARATION}<sitemapindex xmlns="{SITEMAP_NAMESPACE}">\n{entries}</sitemapindex>\n'
+            self._write(SITEMAP_FILENAME, index)
+        else:
+            self._write(SITEMAP_FILENAME, self._urlset())
+
+        for filename in os.listdir(self.dest_dir):
+            match = SHARD_FILENAME_PATTERN.fullmatch(filename)
+            if match is not None and int(match.group(1)) > len(self._shards):
+                os.remove(os.path.join(self.dest_dir, filename))
+        return self.result
+
+
+class FeedWriter:
+    """
+    Writes an Atom feed of the max_entries newest pages to
+    dest_dir/atom.xml. A page is as new as its front matter date, or its
+    lastmod when it has no date. Pages are added one at a time and only the
+    newest are kept, in a heap, so memory does not grow with the site.
+    Titles are read once the newest pages are known, so pages that do not
+    make it into the feed are never read. A front matter summary becomes
+    the entry summary, and a front matter date its published date.
+    """
+
+    def __init__(self, dest_dir, max_entries=DEFAULT_FEED_ENTRIES):
+        self.dest_dir = dest_dir
+        self.max_entries = max_entries
+        self._count = 0
+        # (published date or lastmod, order added, url, source path, lastmod, published date, front matter)
+        self._newest = []
+
+    def add(self, url, lastmod, src_path, front_matter):
+        published = format_date(front_matter["date"]) if front_matter.get("date") else None
+        # Later pages win ties, like they would in a sort by date
+        item = (published or lastmod, self._count, url, src_path, lastmod, published, front_matter)
+        self._count += 1
+        if len(self._newest) < self.max_entries:
+            heapq.heappush(self._newest, item)
+        elif self.max_entries:
+            heapq.heappushpop(self._newest, item)
+
+    def close(self, site_url, basepath="/", title=None):
+        """
+        Write the feed for the site at site_url and basepath. title is
+        the feed title and author, the site URL if not given.
+        Returns whether the feed was written.
+        """
+        base = site_url.rstrip("/") + basepath
+        title = title or base
+        entries = []
+        updated = ""
+        for _, _, url, src_path, lastmod, published, front_matter in sorted(self._newest, reverse=True):
+            try:
+                entry_title = page_title(src_path)
+            except Exception:
+                # Pages without a title are still listed
+                entry_title = url
+            # A page is never updated before it was published
+            entry_updated = max(lastmod, published) if published else lastmod
+            updated = max(updated, entry_updated)
+            entry = (
+                f"<entry><title>{escape(entry_title)}</title><link href={quoteattr(url)}/>"
+                f"<id>{escape(url)}</id><updated>{entry_updated}</updated>"
+            )
+            if published:
+                entry += f"<published>{published}</published>"
+            summary = front_matter.get("summary")
+            if summary:
+                entry += f"<summary>{escape(str(summary))}</summary>"
+            entries.append(entry + "</entry>\n")
+        feed = (
+            f'{XML_DECLARATION}<feed xmlns="{ATOM_NAMESPACE}">\n'
+            f"<title>{escape(title)}</title>\n"
+            f"<link href={quoteattr(base + FEED_FILENAME)} rel=\"self\"/>\n"
+            f"<link href={quoteattr(base)}/>\n"
+            f"<id>{escape(base)}</id>\n"
+            f"<updated>{updated or format_timestamp(0)}</updated>\n"
+            f"<author><name>{escape(title)}</name></author>\n"
+            f"{''.join(entries)}</feed>\n"
+        )
+        return write_if_changed(os.path.join(self.dest_dir, FEED_FILENAME), feed.encode("utf-8"))
+
+
+class SiteFeeds:
+    """
+    Collects every page of a build into the sitemap and the Atom feed as
+    the pages are walked. A page's lastmod is the mtime its source had
+    when its content last changed, as recorded in the build manifest, or
+    the current mtime of the source without a manifest. Pages are listed
+    in the order they are added.
+    """
+
+    def __init__(self, dest_dir, site_url, basepath="/", manifest=None, max_entries=DEFAULT_FEED_ENTRIES):
+        self.dest_dir = dest_dir
+        self.site_url = site_url
+        self.basepath = basepath
+        self.manifest = manifest
+        self.sitemap = SitemapWriter(dest_dir)
+        self.feed = FeedWriter(dest_dir, max_entries)
+
+    def add_page(self, src_path, dest_path, front_matter):
+        """Add a generated, or unchanged, page; call after the manifest has recorded it."""
+        mtime_ns = self.manifest.modified_ns(src_path) if self.manifest is not None else None
+        if mtime_ns is None:
+            mtime_ns = os.stat(src_path).st_mtime_ns
+        lastmod = format_timestamp(mtime_ns)
+        url = page_url(self.site_url, self.basepath, os.path.relpath(dest_path, self.dest_dir))
+        self.sitemap.add(url, lastmod)
+        self.feed.add(url, lastmod, src_path, front_matter)
+
+    def close(self, title=None):
+        """
+        Write the rest of the sitemap and the feed. Returns an
+        output.WriteResult of the sitemap files and the feed.
+        """
+        result = self.sitemap.close(self.site_url, self.basepath)
+        result.add(os.path.join(self.dest_dir, FEED_FILENAME), self.feed.close(self.site_url, self.basepath, title))
+        return result
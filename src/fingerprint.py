@@ -0,0 +1,97 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+from manifest import hash_bytes, hash_file_recorded
+from output import write_json_atomic
+from sync import copy_file
+
+
+ASSET_MANIFEST_FILENAME = "asset-manifest.json"
+ASSET_MANIFEST_FORMAT = 1
+
+# Files that are referenced from pages and safe to serve under a hashed name
+FINGERPRINT_EXTENSIONS = frozenset(
+    {".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif", ".woff", ".woff2", ".ttf", ".otf"}
+)
+# Hex digits of the content hash put into the file name
+FINGERPRINT_LENGTH = 10
+
+
+class AssetMap(dict):
+    """
+    Maps root-relative asset URLs ("/index.css") to their fingerprinted
+    URLs ("/index.3f2a9c01bd.css"). Built once per build and not changed
+    afterwards, so its key can be computed once.
+    """
+
+    @cached_property
+    def key(self):
+        """Identifies the whole mapping, for keying caches and the build manifest."""
+        return hash_bytes(json.dumps(self, sort_keys=True).encode("utf-8"))
+
+
+def fingerprinted_path(rel_path, digest):
+    """Insert the first FINGERPRINT_LENGTH hex digits of digest before the extension."""
+    root, ext = os.path.splitext(rel_path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def _load_hashes(dest_dir):
+    """Return the {relative path: [size, mtime_ns, digest]} recorded by the last run."""
+    try:
+        with open(os.path.join(dest_dir, ASSET_MANIFEST_FILENAME), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != ASSET_MANIFEST_FORMAT:
+        return {}
+    return data.get("files", {})
+
+
+def fingerprint_static(src_dir, dest_dir, jobs=None):
+    """
+    Copy every fingerprintable file in src_dir to dest_dir under a name
+    that contains its content hash, next to the copy under its own name,
+    and write the mapping to dest_dir/asset-manifest.json.
+    Files are hashed with streamed reads in a thread pool; a file whose
+    size and mtime match the last run reuses its recorded hash. Hashed
+    copies of earlier versions are kept, since cached pages may still
+    reference them. Returns the AssetMap.
+    """
+    previous = _load_hashes(dest_dir)
+    assets = []
+    for dirpath, _, filenames in os.walk(src_dir):
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in FINGERPRINT_EXTENSIONS:
+                continue
+            src_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(src_path, src_dir).replace(os.sep, "/")
+            stat = os.stat(src_path)
+            assets.append((rel_path, src_path, stat.st_size, stat.st_mtime_ns))
+
+    def fingerprint(asset):
+        rel_path, src_path, size, mtime_ns = asset
+        digest = hash_file_recorded(src_path, size, mtime_ns, previous.get(rel_path))
+        dest_path = os.path.join(dest_dir, *fingerprinted_path(rel_path, digest).split("/"))
+        # The name changes with the content, so an existing copy of the same size is this file
+        if not (os.path.exists(dest_path) and os.path.getsize(dest_path) == size):
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            copy_file(src_path, dest_path)
+        return digest
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        digests = list(executor.map(fingerprint, assets))
+
+    asset_map = AssetMap()
+    files = {}
+    for (rel_path, _, size, mtime_ns), digest in zip(assets, digests):
+        asset_map["/" + rel_path] = "/" + fingerprinted_path(rel_path, digest)
+        files[rel_path] = [size, mtime_ns, digest]
+
+    write_json_atomic(
+        os.path.join(dest_dir, ASSET_MANIFEST_FILENAME),
+        {"format": ASSET_MANIFEST_FORMAT, "assets": asset_map, "files": files},
+    )
+    return asset_map
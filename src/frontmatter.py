@@ -0,0 +1,140 @@
+import os
+import re
+
+
+FRONT_MATTER_DELIMITER = "---"
+# A header that is not closed within this many lines is not front matter
+MAX_FRONT_MATTER_LINES = 256
+
+# key: value, where the value may be empty when a list follows
+FRONT_MATTER_LINE_PATTERN = re.compile(r"([A-Za-z_][\w-]*)\s*:(?:\s+(.*))?$")
+
+BOOLEANS = {"true": True, "yes": True, "false": False, "no": False}
+
+
+def _parse_scalar(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    lowered = value.lower()
+    if lowered in BOOLEANS:
+        return BOOLEANS[lowered]
+    if lowered in ("null", "~"):
+        return None
+    return value
+
+
+def _parse_value(value):
+    if value.startswith("[") and value.endswith("]"):
+        items = value[1:-1].split(",")
+        return [_parse_scalar(item.strip()) for item in items if item.strip()]
+    return _parse_scalar(value)
+
+
+def parse_front_matter(lines):
+    """
+    Parse the lines between the front matter delimiters.
+    Supports the subset of YAML that page metadata needs: "key: value"
+    pairs with strings, quoted strings, booleans and null, inline lists
+    ("tags: [a, b]") and block lists ("- item" lines under an empty key).
+    Blank lines and "#" comments are skipped.
+    """
+    front_matter = {}
+    list_key = None
+    for number, line in enumerate(lines, start=2):
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and list_key is not None:
+            front_matter[list_key].append(_parse_scalar(stripped[2:].strip()))
+            continue
+        match = FRONT_MATTER_LINE_PATTERN.match(stripped)
+        if match is None:
+            raise ValueError(f"Invalid front matter on line {number}: {line.rstrip()!r}")
+        key, value = match.group(1), (match.group(2) or "").strip()
+        if value:
+            front_matter[key] = _parse_value(value)
+            list_key = None
+        else:
+            front_matter[key] = []
+            list_key = key
+    return front_matter
+
+
+def _header_lines(lines):
+    """
+    Collect the lines of a front matter header from an iterator positioned
+    after the opening delimiter. Returns None if it is not closed in time.
+    """
+    header = []
+    for line in lines:
+        if line.rstrip() == FRONT_MATTER_DELIMITER:
+            return header
+        if len(header) >= MAX_FRONT_MATTER_LINES:
+            return None
+        header.append(line)
+    return None
+
+
+def split_front_matter(markdown):
+    """
+    Split a markdown document into (front matter dict, body).
+    Documents without front matter come back unchanged with an empty dict.
+    """
+    if not markdown.startswith(FRONT_MATTER_DELIMITER):
+        return {}, markdown
+    lines = iter(markdown.splitlines(keepends=True))
+    if next(lines).rstrip() != FRONT_MATTER_DELIMITER:
+        return {}, markdown
+    header = _header_lines(lines)
+    if header is None:
+        return {}, markdown
+    return parse_front_matter(header), "".join(lines)
+
+
+def read_front_matter(path):
+    """
+    Read only the front matter of a markdown file.
+    Stops at the closing delimiter, or after the first line when there is
+    no front matter, so the body is never loaded or parsed.
+    """
+    with open(path, "r") as f:
+        if f.readline().rstrip() != FRONT_MATTER_DELIMITER:
+            return {}
+        header = _header_lines(f)
+    if header is None:
+        return {}
+    return parse_front_matter(header)
+
+
+def is_draft(front_matter):
+    return front_matter.get("draft") is True
+
+
+def resolve_page_template(front_matter, template_path):
+    """
+    Return the template for a page: the one named by its "template" key,
+    relative to the directory of the default template, or template_path.
+    """
+    name = front_matter.get("template")
+    if not name:
+        return template_path
+    return os.path.join(os.path.dirname(template_path), name)
+
+
+def template_values(front_matter, slots=()):
+    """
+    Format front matter values for template slots.
+    Any of slots that the front matter does not set is filled with an
+    empty string, so a template can use keys that only some pages have.
+    """
+    values = dict.fromkeys(slots, "")
+    for key, value in front_matter.items():
+        if value is None:
+            values[key] = ""
+        elif isinstance(value, bool):
+            values[key] = "true" if value else "false"
+        elif isinstance(value, list):
+            values[key] = ", ".join("" if item is None else str(item) for item in value)
+        else:
+            values[key] = value
+    return values
@@ -1,6 +1,13 @@
+import sys
+
+
 class HTMLNode:
+    # Slots instead of a per-instance __dict__ keep large trees compact
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
+        # Interned so the thousands of identical tags in a page share one string
+        self.tag = sys.intern(tag) if type(tag) is str else tag
         self.value = value
         self.children = children
         self.props = props
@@ -8,6 +15,13 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError()
 
+    def render_to(self, write):
+        """
+        Stream the HTML for this node to write(), a callable that accepts
+        string fragments such as a file's write method or a list's append.
+        """
+        raise NotImplementedError()
+
     def props_to_html(self):
         if self.props is None or len(self.props) == 0:
             return ""
@@ -23,6 +37,8 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -35,26 +51,49 @@ class LeafNode(HTMLNode):
         
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def render_to(self, write):
+        write(self.to_html())
+
     def __repr__(self):
         return f"LeafNode(tag={self.tag!r}, value={self.value!r}, props={self.props!r})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
-        if self.tag is None:
-            raise ValueError("Parent nodes must have a tag")
-        
-        if self.children is None:
-            raise ValueError("Parent nodes must have children")
-        
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        parts = []
+        self.render_to(parts.append)
+        return "".join(parts)
+
+    def render_to(self, write):
+        """
+        Stream the HTML for this subtree to write().
+        Walks the tree with an explicit stack instead of recursion, so deep
+        trees neither hit the recursion limit nor build nested temporary strings.
+        """
+        # The stack holds nodes still to render and closing tags still to write
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            
+            if isinstance(item, str):
+                write(item)
+            elif isinstance(item, ParentNode):
+                if item.tag is None:
+                    raise ValueError("Parent nodes must have a tag")
+                
+                if item.children is None:
+                    raise ValueError("Parent nodes must have children")
+                
+                write(f"<{item.tag}{item.props_to_html()}>")
+                stack.append(f"</{item.tag}>")
+                stack.extend(reversed(item.children))
+            else:
+                item.render_to(write)
 
     def __repr__(self):
         return f"ParentNode(tag={self.tag!r}, children={self.children!r}, props={self.props!r})"
@@ -0,0 +1,155 @@
+import json
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+from manifest import hash_bytes, hash_file_recorded
+from output import write_json_atomic
+
+
+IMAGE_INDEX_FILENAME = "image-index.json"
+IMAGE_INDEX_FORMAT = 1
+
+# Formats whose dimensions read_image_size() can find in the header
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".webp"})
+# Bytes read up front; enough for the PNG, GIF and WebP headers
+HEADER_SIZE = 32
+# JPEG start-of-frame markers, which hold the dimensions
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class ImageSizes(dict):
+    """
+    Maps root-relative image URLs ("/images/map.png") to their (width,
+    height) in pixels. Built once per build and not changed afterwards, so
+    its key can be computed once.
+    """
+
+    @cached_property
+    def key(self):
+        """Identifies the whole mapping, for keying caches and the build manifest."""
+        return hash_bytes(json.dumps(sorted(self.items())).encode("utf-8"))
+
+
+def _jpeg_size(f):
+    """Walk the JPEG segments after SOI to the first start-of-frame segment."""
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        # Markers may be padded with any number of 0xFF bytes
+        while marker[1] == 0xFF:
+            marker = marker[1:] + f.read(1)
+            if len(marker) < 2:
+                return None
+        if marker[1] == 0xD8 or 0xD0 <= marker[1] <= 0xD7:
+            # Standalone markers carry no length
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        (length,) = struct.unpack(">H", length)
+        if length < 2:
+            return None
+        if marker[1] in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">HH", frame[1:5])
+            return width, height
+        # Skip the segment, including EXIF data and embedded thumbnails, without reading it
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image_size(path):
+    """
+    Return the (width, height) of the PNG, JPEG, GIF or WebP image at path,
+    or None if it is not one or its header is damaged.
+    Only the header is read: a fixed 32 bytes, plus a seek from segment to
+    segment for JPEG; no pixels are decoded.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR" and len(header) >= 24:
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a") and len(header) >= 10:
+            return struct.unpack("<HH", header[6:10])
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            chunk = header[12:16]
+            if chunk == b"VP8 " and header[23:26] == b"\x9d\x01\x2a" and len(header) >= 30:
+                width, height = struct.unpack("<HH", header[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b"VP8L" and header[20:21] == b"\x2f" and len(header) >= 25:
+                (bits,) = struct.unpack("<I", header[21:25])
+                return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            if chunk == b"VP8X" and len(header) >= 30:
+                width = int.from_bytes(header[24:27], "little") + 1
+                height = int.from_bytes(header[27:30], "little") + 1
+                return width, height
+            return None
+        if header.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+    return None
+
+
+def _load_index(cache_dir):
+    """Return the {relative path: [size, mtime_ns, digest]} and {digest: [width, height]} of the last run."""
+    try:
+        with open(os.path.join(cache_dir, IMAGE_INDEX_FILENAME), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(data, dict) or data.get("format") != IMAGE_INDEX_FORMAT:
+        return {}, {}
+    return data.get("files", {}), data.get("sizes", {})
+
+
+def load_image_sizes(static_dir, cache_dir, jobs=None):
+    """
+    Return the ImageSizes of every PNG, JPEG, GIF and WebP file in
+    static_dir, and save the index they were looked up in to
+    cache_dir/image-index.json.
+    The index maps content hashes to dimensions, so a renamed or copied
+    image is not read again. A file whose size and mtime match the last
+    run reuses its recorded hash without being opened; other files are
+    hashed and, when the hash is new, have their header read, in a thread
+    pool. Files that are not valid images are left out.
+    """
+    previous_files, previous_sizes = _load_index(cache_dir)
+    images = []
+    for dirpath, _, filenames in os.walk(static_dir):
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            src_path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(src_path, static_dir).replace(os.sep, "/")
+            stat = os.stat(src_path)
+            images.append((rel_path, src_path, stat.st_size, stat.st_mtime_ns))
+
+    def measure(image):
+        rel_path, src_path, size, mtime_ns = image
+        digest = hash_file_recorded(src_path, size, mtime_ns, previous_files.get(rel_path))
+        if digest in previous_sizes:
+            return digest, previous_sizes[digest]
+        return digest, read_image_size(src_path)
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        measured = list(executor.map(measure, images))
+
+    image_sizes = ImageSizes()
+    files = {}
+    sizes = {}
+    for (rel_path, _, size, mtime_ns), (digest, dimensions) in zip(images, measured):
+        files[rel_path] = [size, mtime_ns, digest]
+        # Files that are not valid images are recorded too, so they are not read again
+        sizes[digest] = None if dimensions is None else list(dimensions)
+        if dimensions is not None:
+            image_sizes["/" + rel_path] = tuple(dimensions)
+
+    write_json_atomic(
+        os.path.join(cache_dir, IMAGE_INDEX_FILENAME),
+        {"format": IMAGE_INDEX_FORMAT, "files": files, "sizes": sizes},
+    )
+    return image_sizes
@@ -0,0 +1,144 @@
+import heapq
+import json
+import time
+from collections import Counter
+
+
+# Page stages in pipeline order
+PAGE_STAGES = ("read", "block_split", "inline_parse", "render", "template", "write")
+
+
+class _Timer:
+    """Context manager that adds its wall and CPU time to a stats object."""
+
+    __slots__ = ("stats", "stage", "wall", "cpu")
+
+    def __init__(self, stats, stage):
+        self.stats = stats
+        self.stage = stage
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stats.add_time(self.stage, time.perf_counter() - self.wall, time.process_time() - self.cpu)
+        return False
+
+
+class PageStats:
+    """Timings and counters for a single page."""
+
+    def __init__(self, path):
+        self.path = path
+        self.wall = {}
+        self.cpu = {}
+        self.blocks = Counter()
+        self.inline_nodes = 0
+        self.cached_blocks = 0
+        self.cached_page = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def timed(self, stage):
+        """Time a with-block as the given stage."""
+        return _Timer(self, stage)
+
+    def add_time(self, stage, wall, cpu):
+        self.wall[stage] = self.wall.get(stage, 0.0) + wall
+        self.cpu[stage] = self.cpu.get(stage, 0.0) + cpu
+
+    @property
+    def total_wall(self):
+        return sum(self.wall.values())
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "wall_seconds": round(self.total_wall, 6),
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.wall.items()},
+            "blocks": dict(self.blocks),
+            "inline_nodes": self.inline_nodes,
+            "cached_blocks": self.cached_blocks,
+            "cached_page": self.cached_page,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+        }
+
+
+class BuildStats:
+    """
+    Aggregated counters and timings for a build.
+    Pages are added as they finish; only the slowest pages are kept in full.
+    """
+
+    def __init__(self, slowest=10):
+        self.slowest = slowest
+        self.pages = 0
+        self.wall = {}
+        self.cpu = {}
+        self.blocks = Counter()
+        self.inline_nodes = 0
+        self.cached_blocks = 0
+        self.cached_pages = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Min-heap of (wall seconds, sequence, page dict)
+        self._slowest_pages = []
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    def timed(self, stage):
+        """Time a build-level with-block, such as copying static files."""
+        return _Timer(self, stage)
+
+    def add_time(self, stage, wall, cpu):
+        self.wall[stage] = self.wall.get(stage, 0.0) + wall
+        self.cpu[stage] = self.cpu.get(stage, 0.0) + cpu
+
+    def add_page(self, page):
+        """Merge a finished PageStats into the build totals."""
+        self.pages += 1
+        for stage, seconds in page.wall.items():
+            self.add_time(stage, seconds, page.cpu.get(stage, 0.0))
+        self.blocks.update(page.blocks)
+        self.inline_nodes += page.inline_nodes
+        self.cached_blocks += page.cached_blocks
+        self.cached_pages += page.cached_page
+        self.bytes_in += page.bytes_in
+        self.bytes_out += page.bytes_out
+
+        entry = (page.total_wall, self.pages, page.to_dict())
+        if len(self._slowest_pages) < self.slowest:
+            heapq.heappush(self._slowest_pages, entry)
+        elif entry[0] > self._slowest_pages[0][0]:
+            heapq.heapreplace(self._slowest_pages, entry)
+
+    def to_dict(self):
+        """
+        Return the report. CPU times of pages generated in worker processes
+        are those of the workers, so they may add up to more than the wall time.
+        """
+        slowest_pages = [entry[2] for entry in sorted(self._slowest_pages, reverse=True)]
+        return {
+            "pages": self.pages,
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "cpu_seconds": round(time.process_time() - self._started_cpu, 6),
+            "stages": {
+                stage: {"wall_seconds": round(self.wall[stage], 6), "cpu_seconds": round(self.cpu[stage], 6)}
+                for stage in self.wall
+            },
+            "blocks": dict(sorted(self.blocks.items())),
+            "inline_nodes": self.inline_nodes,
+            "cached_blocks": self.cached_blocks,
+            "cached_pages": self.cached_pages,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "slowest_pages": slowest_pages,
+        }
+
+    def write_report(self, path):
+        """Write the report as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
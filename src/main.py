@@ -1,72 +1,262 @@
+import argparse
+import json
 import os
 import shutil
 import sys
+from contextlib import nullcontext
 from textnode import TextNode, TextType
-from blockhandler import markdown_to_html_node
+from blockcache import BlockCache, PageCache
+from blockhandler import parse_markdown
+from compress import DEFAULT_MIN_SIZE, compress_outputs
+from devserver import serve_site
+# extract_title lives in docinfo; it is imported here so main.extract_title keeps working
+from docinfo import DocumentInfo, document_title, extract_title
+from feeds import SiteFeeds, page_title
+from fingerprint import fingerprint_static
+from frontmatter import is_draft, read_front_matter, resolve_page_template, split_front_matter, template_values
+from imagesize import load_image_sizes
+from instrument import BuildStats, PageStats
+from manifest import BuildManifest
+from options import BuildOptions, as_build_options
+from output import ChangedFileWriter, WriteResult, write_if_changed
+from parallel import PageGenerationError, generate_pages_parallel
+from pipeline import DEFAULT_IN_FLIGHT, generate_pages_async
+from sync import sync_static
+from watch import WATCH_DIRNAME, watch_site
 
 
-def extract_title(markdown):
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    options=None,
+    template=None,
+    stats=None,
+    cache=None,
+    page_cache=None,
+):
     """
-    Extract the h1 header from a markdown string.
-    Returns the header text without the # and whitespace.
-    Raises an exception if no h1 header is found.
+    Generate an HTML page from a markdown file using a template.
+    options is an options.BuildOptions, or a basepath string as before it
+    existed; by default the basepath is "/".
+    Pass a Template compiled with the same options to avoid re-reading the
+    template for every page.
+    Pass an instrument.PageStats as stats to record per-stage timings and counters,
+    a blockcache.BlockCache as cache to reuse previously rendered blocks, and
+    a blockcache.PageCache as page_cache to reuse the body of an unchanged page.
+    
+    Front matter at the top of the file is not part of the body. Its values
+    fill the template slots of the same name, its "title" replaces the h1,
+    and its "template" names a template next to template_path to use instead.
+    
+    Returns False when dest_path already held the same page and was left
+    untouched, True when it was written.
     """
-    lines = markdown.split("\n")
-    for line in lines:
-        stripped = line.strip()
-        if stripped.startswith("# ") and not stripped.startswith("## "):
-            # Remove the # and strip whitespace
-            return stripped[2:].strip()
+    # Read markdown file
+    if stats is None:
+        with open(from_path, "r") as f:
+            markdown_content = f.read()
+    else:
+        with stats.timed("read"):
+            with open(from_path, "r") as f:
+                markdown_content = f.read()
+                stats.bytes_in = os.fstat(f.fileno()).st_size
     
-    raise Exception("No h1 header found in markdown")
+    template, values = _prepare_page(
+        markdown_content,
+        from_path,
+        dest_path,
+        template_path,
+        options,
+        template,
+        stats,
+        cache,
+        page_cache,
+    )
+    return write_page(dest_path, template, values["Title"], values["Content"], stats, values)
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+def render_page(
+    markdown_content,
+    from_path,
+    dest_path,
+    template_path,
+    options=None,
+    template=None,
+    stats=None,
+    cache=None,
+    page_cache=None,
+):
     """
-    Generate an HTML page from a markdown file using a template.
+    Return the finished page for markdown read from from_path, without
+    writing it. Takes the same arguments as generate_page, plus the source
+    text, so that reading and writing can happen elsewhere.
+    """
+    template, values = _prepare_page(
+        markdown_content,
+        from_path,
+        dest_path,
+        template_path,
+        options,
+        template,
+        stats,
+        cache,
+        page_cache,
+    )
+    if stats is None:
+        return template.render(**values)
+    return _render_instrumented(template, values, stats)
+
+
+def _prepare_page(
+    markdown_content,
+    from_path,
+    dest_path,
+    template_path,
+    options,
+    template,
+    stats,
+    cache,
+    page_cache,
+):
+    """
+    Parse a page and return its template and the values for its slots,
+    with the title as Title and the body node as Content.
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    options = as_build_options(options)
+    front_matter, markdown_content = split_front_matter(markdown_content)
     
-    # Read markdown file
-    with open(from_path, "r") as f:
-        markdown_content = f.read()
+    page_template_path = resolve_page_template(front_matter, template_path)
+    print(f"Generating page from {from_path} to {dest_path} using {page_template_path}")
     
-    # Read template file
-    with open(template_path, "r") as f:
-        template_content = f.read()
+    if page_template_path != template_path:
+        template = options.load_template(page_template_path)
+    elif template is None:
+        template = options.compile_template(template_path)
     
     # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    html_node, info = _page_body(markdown_content, options.resolver(), stats, cache, page_cache)
     
-    # Extract title
-    title = extract_title(markdown_content)
+    # The title was collected while parsing, unless the front matter sets one
+    values = template_values(front_matter, template.slots)
+    values["Title"] = values.get("title") or document_title(info, markdown_content)
+    values["Content"] = html_node
+    return template, values
+
+
+def _page_body(markdown_content, resolver, stats=None, cache=None, page_cache=None):
+    """
+    Convert markdown to the page body node and its DocumentInfo.
+    With a page cache, the body and metadata from an earlier build of the
+    same source are reused, the body as a raw LeafNode, and no markdown is
+    parsed.
+    """
+    if page_cache is None:
+        return parse_markdown(markdown_content, stats, cache, resolver)
     
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    from htmlnode import LeafNode
     
-    # Replace path references with basepath
-    final_html = final_html.replace('href="/', f'href="{basepath}')
-    final_html = final_html.replace('src="/', f'src="{basepath}')
+    key = page_cache.key(markdown_content, resolver)
+    entry = page_cache.get(key)
+    if entry is None:
+        html_node, info = parse_markdown(markdown_content, stats, cache, resolver)
+        with stats.timed("render") if stats is not None else nullcontext():
+            html = html_node.to_html()
+        page_cache.put(key, json.dumps([html, info.to_dict()]))
+    else:
+        html, info_data = json.loads(entry)
+        info = DocumentInfo.from_dict(info_data)
+        if stats is not None:
+            stats.cached_page = True
+    return LeafNode(None, html), info
+
+
+def _render_instrumented(template, values, stats):
+    """
+    Render a page to a string in separately timed steps.
+    Unlike the streaming path, the tree and the filled template are each
+    built as a string first, so that every step can be measured on its own.
+    """
+    from htmlnode import LeafNode
     
-    # Ensure destination directory exists
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    with stats.timed("render"):
+        parts = []
+        values["Content"].render_to(parts.append)
+        values["Content"] = LeafNode(None, "".join(parts))
     
-    # Write the HTML file
-    with open(dest_path, "w") as f:
-        f.write(final_html)
+    with stats.timed("template"):
+        parts = []
+        template.render_to(parts.append, **values)
+        return "".join(parts)
+
+
+def write_page(dest_path, template, title, html_node, stats=None, values=None):
+    """
+    Write a parsed page to dest_path using a compiled template.
+    values fills template slots other than Title and Content.
+    The page is streamed and compared with the existing file as it is
+    rendered; with stats it is rendered to a string first, see
+    _render_instrumented(). Returns whether the file was written.
+    """
+    values = dict(values or {}, Title=title, Content=html_node)
+    
+    if stats is None:
+        # Stream the filled template, comparing it with the existing file as it is produced
+        with ChangedFileWriter(dest_path) as out:
+            template.render_to(out.write, **values)
+        return out.written
+    return write_text(dest_path, _render_instrumented(template, values, stats), stats)
+
+
+def write_text(dest_path, text, stats=None):
+    """
+    Write a rendered page to dest_path, timed as the write stage when an
+    instrument.PageStats is given.
+    A file that already holds the same page is left untouched, keeping its
+    mtime; returns False in that case and True when the file was written.
+    """
+    data = text.encode("utf-8")
+    with stats.timed("write") if stats is not None else nullcontext():
+        written = write_if_changed(dest_path, data)
+    if stats is not None:
+        stats.bytes_out = len(data)
+    return written
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    options=None,
+    manifest=None,
+    template=None,
+    stats=None,
+    cache=None,
+    page_cache=None,
+    drafts=False,
+    feeds=None,
+):
     """
     Recursively generate HTML pages from all markdown files in a directory.
     Maintains the same directory structure in the destination.
+    Every page is built with options, an options.BuildOptions.
+    When a BuildManifest is given, pages that are unchanged since the
+    previous build are skipped. When an instrument.BuildStats is given,
+    every generated page is measured and added to it. Pages marked as
+    drafts in their front matter are skipped unless drafts is set.
+    Every page, including unchanged ones, is added to feeds, a
+    feeds.SiteFeeds, as it is walked; directories are walked in sorted
+    order so the sitemap lists pages in the same order every build.
+    Returns an output.WriteResult of the pages written and left unchanged.
     """
+    options = as_build_options(options)
+    # Compile the template once for the whole tree
+    if template is None:
+        template = options.compile_template(template_path)
+    result = WriteResult()
+    
     # Get all entries in the content directory
-    entries = os.listdir(dir_path_content)
+    entries = sorted(os.listdir(dir_path_content))
     
     for entry in entries:
         src_path = os.path.join(dir_path_content, entry)
@@ -78,8 +268,35 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
                 html_filename = entry[:-3] + ".html"
                 dest_path = os.path.join(dest_dir_path, html_filename)
                 
-                # Generate the page
-                generate_page(src_path, template_path, dest_path, basepath)
+                # Only the front matter is read to decide whether and how to build
+                front_matter = read_front_matter(src_path)
+                if is_draft(front_matter) and not drafts:
+                    continue
+                page_template_path = resolve_page_template(front_matter, template_path)
+                
+                # Skip pages that are unchanged since the last build
+                if manifest is None or not manifest.is_fresh(src_path, dest_path, page_template_path, options):
+                    # Generate the page
+                    page_stats = PageStats(src_path) if stats is not None else None
+                    written = generate_page(
+                        src_path,
+                        template_path,
+                        dest_path,
+                        options,
+                        template,
+                        page_stats,
+                        cache,
+                        page_cache,
+                    )
+                    result.add(dest_path, written)
+                    if stats is not None:
+                        stats.add_page(page_stats)
+                    
+                    if manifest is not None:
+                        manifest.record(src_path, dest_path, page_template_path, options)
+                
+                if feeds is not None:
+                    feeds.add_page(src_path, dest_path, front_matter)
         else:
             # If it's a directory, create the corresponding directory in dest and recurse
             new_dest_dir = os.path.join(dest_dir_path, entry)
@@ -87,13 +304,52 @@ def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, bas
                 os.makedirs(new_dest_dir)
             
             # Recursively process the subdirectory
-            generate_pages_recursive(src_path, template_path, new_dest_dir, basepath)
+            result.update(
+                generate_pages_recursive(
+                    src_path,
+                    template_path,
+                    new_dest_dir,
+                    options,
+                    manifest,
+                    template,
+                    stats,
+                    cache,
+                    page_cache,
+                    drafts,
+                    feeds,
+                )
+            )
+    
+    return result
+
+
+def collect_pages(dir_path_content, dest_dir_path, drafts=False):
+    """
+    Recursively collect (source, destination) pairs for every markdown file.
+    Uses the same traversal and naming as generate_pages_recursive, and
+    the same front matter check to leave out drafts unless drafts is set.
+    """
+    pages = []
+    for entry in sorted(os.listdir(dir_path_content)):
+        src_path = os.path.join(dir_path_content, entry)
+        
+        if os.path.isfile(src_path):
+            if entry.endswith(".md"):
+                if not drafts and is_draft(read_front_matter(src_path)):
+                    continue
+                html_filename = entry[:-3] + ".html"
+                pages.append((src_path, os.path.join(dest_dir_path, html_filename)))
+        else:
+            pages.extend(collect_pages(src_path, os.path.join(dest_dir_path, entry), drafts))
+    
+    return pages
 
 
 def copy_static_to_public(src_dir, dest_dir):
     """
     Recursively copy all contents from src_dir to dest_dir.
     First deletes all contents of dest_dir to ensure a clean copy.
+    Builds use sync.sync_static instead, which keeps unchanged files.
     """
     if os.path.exists(dest_dir):
         print(f"Deleting {dest_dir}...")
@@ -124,11 +380,149 @@ def _copy_directory_contents(src, dest):
             _copy_directory_contents(src_path, dest_path)
 
 
-def main():
-    # Get basepath from CLI argument, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the static site into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/", help='path prefix for links and assets (default: "/")')
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only regenerate pages whose source, template or basepath changed since the last build; "
+        "without it every page is regenerated, but pages that come out the same are not rewritten",
+    )
+    parser.add_argument(
+        "--hash-static",
+        action="store_true",
+        help="compare static files by content hash when their mtime differs",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="generate pages in N worker processes (0 means one per CPU)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="overlap reading sources, rendering and writing pages in an asyncio pipeline; "
+        "helps most on slow or network filesystems",
+    )
+    parser.add_argument(
+        "--in-flight",
+        type=int,
+        default=DEFAULT_IN_FLIGHT,
+        metavar="N",
+        help=f"with --pipeline, hold at most N pages in memory at once (default: {DEFAULT_IN_FLIGHT})",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="build, serve docs/ with live reload and rebuild changed pages until interrupted",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="serve the site without building it, rendering each page in memory when it is requested",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="also copy CSS, JS, image and font assets under content-hashed names and link pages to those, "
+        "so they can be served with immutable cache headers",
+    )
+    parser.add_argument(
+        "--image-sizes",
+        action="store_true",
+        help="give images in static/ their width and height, read from the file headers and cached in .cache/, "
+        "and load every image lazily",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip whitespace and comments that do not render from the template before building",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="write a maximally compressed .gz sidecar next to every HTML, CSS, JS, SVG and XML output",
+    )
+    parser.add_argument(
+        "--gzip-min-size",
+        type=int,
+        default=DEFAULT_MIN_SIZE,
+        metavar="BYTES",
+        help=f"with --gzip, skip files smaller than this (default: {DEFAULT_MIN_SIZE})",
+    )
+    parser.add_argument(
+        "--site-url",
+        metavar="URL",
+        help="also write sitemap.xml and an atom.xml feed, linking to pages under URL (e.g. https://example.com)",
+    )
+    parser.add_argument(
+        "--drafts",
+        action="store_true",
+        help="also generate pages marked with draft: true in their front matter",
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port for --watch and --serve (default: 8888)")
+    parser.add_argument(
+        "--block-cache",
+        action="store_true",
+        help="reuse the rendered HTML of unchanged blocks from .cache/ across builds",
+    )
+    parser.add_argument(
+        "--block-cache-size",
+        type=int,
+        default=64,
+        metavar="MB",
+        help="evict the least recently used blocks beyond this size (default: 64)",
+    )
+    parser.add_argument(
+        "--page-cache",
+        action="store_true",
+        help="reuse the rendered body of unchanged pages from .cache/, so template changes skip "
+        "markdown parsing (a basepath change re-parses every page once)",
+    )
+    parser.add_argument(
+        "--page-cache-size",
+        type=int,
+        default=256,
+        metavar="MB",
+        help="evict the least recently used page bodies beyond this size (default: 256)",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="PATH",
+        help="write per-stage timings, block and node counts and the slowest pages as JSON to PATH",
+    )
+    parser.add_argument(
+        "--report-slowest",
+        type=int,
+        default=10,
+        metavar="N",
+        help="number of slowest pages listed in --report (default: 10)",
+    )
+    args = parser.parse_args(argv)
+    if args.pipeline and args.jobs != 1:
+        parser.error("--pipeline cannot be combined with --jobs")
+    if args.fingerprint and args.watch:
+        parser.error("--fingerprint cannot be combined with --watch")
+    if args.image_sizes and args.watch:
+        parser.error("--image-sizes cannot be combined with --watch")
+    if args.serve and (args.watch or args.fingerprint or args.image_sizes):
+        parser.error("--serve cannot be combined with --watch, --fingerprint or --image-sizes")
+    if args.site_url and (args.watch or args.serve):
+        parser.error("--site-url cannot be combined with --watch or --serve")
+    if args.site_url and not args.site_url.startswith(("http://", "https://")):
+        parser.error("--site-url must start with http:// or https://")
+    if args.in_flight < 1:
+        parser.error("--in-flight must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    basepath = args.basepath
     
     # Get project root directory
     project_root = os.path.dirname(os.path.dirname(__file__))
@@ -137,12 +531,124 @@ def main():
     docs_dir = os.path.join(project_root, "docs")
     content_dir = os.path.join(project_root, "content")
     template_path = os.path.join(project_root, "template.html")
+    cache_dir = os.path.join(project_root, ".cache")
+    
+    # Watch mode and the development server do not fingerprint assets or measure images
+    live_options = BuildOptions(basepath, minify=args.minify)
+    if args.watch:
+        # Drafts and the dev basepath must never end up in the deployed docs/
+        watch_dir = os.path.join(cache_dir, WATCH_DIRNAME)
+        watch_site(content_dir, static_dir, template_path, watch_dir, live_options, args.port)
+        return
+    
+    if args.serve:
+        serve_site(content_dir, static_dir, template_path, live_options, args.port)
+        return
+    
+    stats = BuildStats(args.report_slowest) if args.report else None
+    
+    # Sync static files into the docs directory. docs/ is never deleted, so
+    # outputs that come out the same keep their mtime in full builds too
+    with stats.timed("static") if stats is not None else nullcontext():
+        result = sync_static(static_dir, docs_dir, use_hash=args.hash_static)
+        print(
+            f"Synced {static_dir}: {len(result.copied)} copied, "
+            f"{result.unchanged} unchanged, {len(result.deleted)} deleted"
+        )
+        assets = fingerprint_static(static_dir, docs_dir) if args.fingerprint else None
+    if assets is not None:
+        print(f"Fingerprinted {len(assets)} assets")
+    
+    images = None
+    if args.image_sizes:
+        with stats.timed("images") if stats is not None else nullcontext():
+            images = load_image_sizes(static_dir, cache_dir)
+        print(f"Measured {len(images)} images")
+    
+    # A full build regenerates every page, but still records them, so that
+    # pages whose source is gone are removed and --incremental can follow
+    options = BuildOptions(basepath, assets, args.minify, images)
+    manifest = BuildManifest.load(docs_dir, rebuild=not args.incremental)
+    cache = BlockCache.open(cache_dir, args.block_cache_size * 1024 * 1024) if args.block_cache else None
+    page_cache = PageCache.open(cache_dir, args.page_cache_size * 1024 * 1024) if args.page_cache else None
+    feeds = SiteFeeds(docs_dir, args.site_url, basepath, manifest) if args.site_url else None
+    
+    # Generate all pages, either recursively, in a process pool or in the I/O pipeline
+    if args.jobs != 1 or args.pipeline:
+        pages = collect_pages(content_dir, docs_dir, args.drafts)
+        try:
+            if args.pipeline:
+                result = generate_pages_async(
+                    pages,
+                    template_path,
+                    options,
+                    args.in_flight,
+                    manifest,
+                    stats,
+                    cache,
+                    page_cache,
+                )
+            else:
+                result = generate_pages_parallel(
+                    pages,
+                    template_path,
+                    options,
+                    args.jobs,
+                    manifest,
+                    stats,
+                    cache,
+                    page_cache,
+                )
+        except PageGenerationError as e:
+            for src_path, error in e.failures:
+                print(f"Error generating page {src_path}: {error}", file=sys.stderr)
+            # Pages that did succeed are still recorded for the next build
+            manifest.save()
+            sys.exit(f"Build failed: {e}")
+    else:
+        result = generate_pages_recursive(
+            content_dir,
+            template_path,
+            docs_dir,
+            options,
+            manifest,
+            stats=stats,
+            cache=cache,
+            page_cache=page_cache,
+            drafts=args.drafts,
+            feeds=feeds,
+        )
+    print(f"Generated pages: {len(result.written)} written, {result.unchanged} unchanged")
+    
+    if feeds is not None:
+        with stats.timed("feeds") if stats is not None else nullcontext():
+            if args.jobs != 1 or args.pipeline:
+                # The pool and the pipeline do not walk the tree; add the pages in the order they were collected
+                for src_path, dest_path in pages:
+                    feeds.add_page(src_path, dest_path, read_front_matter(src_path))
+            home_path = os.path.join(content_dir, "index.md")
+            written = feeds.close(page_title(home_path) if os.path.isfile(home_path) else None)
+        print(f"Wrote sitemap and feed: {len(written.written)} written, {written.unchanged} unchanged")
+    
+    for removed_path in manifest.remove_stale():
+        print(f"Removed stale page: {removed_path}")
+    manifest.save()
+    
+    for open_cache in (cache, page_cache):
+        if open_cache is not None:
+            open_cache.close()
     
-    # Copy static files to docs directory
-    copy_static_to_public(static_dir, docs_dir)
+    if args.gzip:
+        with stats.timed("compress") if stats is not None else nullcontext():
+            compressed = compress_outputs(docs_dir, min_size=args.gzip_min_size)
+        print(
+            f"Compressed {docs_dir}: {len(compressed.compressed)} written, {compressed.unchanged} unchanged, "
+            f"{compressed.skipped} skipped, {len(compressed.deleted)} deleted"
+        )
     
-    # Generate all pages recursively
-    generate_pages_recursive(content_dir, template_path, docs_dir, basepath)
+    if stats is not None:
+        stats.write_report(args.report)
+        print(f"Build report written to {args.report}")
 
 
 if __name__ == "__main__":
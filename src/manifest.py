@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+
+from options import as_build_options
+from output import write_json_atomic
+
+
+MANIFEST_FILENAME = ".build-manifest.json"
+MANIFEST_FORMAT = 1
+# Bytes read at a time when hashing a file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_bytes(data):
+    """Return the hex sha256 digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path):
+    """
+    Return the hex sha256 digest of a file's contents.
+    The file is read in chunks, so large files are never held in memory.
+    """
+    digest = hashlib.sha256()
+    buffer = bytearray(HASH_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while size := f.readinto(buffer):
+            digest.update(view[:size])
+    return digest.hexdigest()
+
+
+def prune_empty_dirs(root, dir_path):
+    """Remove dir_path and then its parents while they are empty, stopping at root."""
+    root = os.path.abspath(root)
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != root and dir_path.startswith(root + os.sep):
+        if os.listdir(dir_path):
+            break
+        os.rmdir(dir_path)
+        dir_path = os.path.dirname(dir_path)
+
+
+def hash_file_recorded(path, size, mtime_ns, recorded):
+    """
+    Return the digest of a file of the given size and mtime_ns.
+    recorded is the [size, mtime_ns, digest] a previous run stored for
+    it, or None; its digest is reused without opening the file when the
+    size and mtime still match, and the file is hashed otherwise.
+    """
+    if recorded is not None and recorded[:2] == [size, mtime_ns]:
+        return recorded[2]
+    return hash_file(path)
+
+
+class BuildManifest:
+    """
+    Records what each generated page was built from.
+    Stored next to the output so the next build can skip pages whose
+    source, compiled template, options.BuildOptions and parser version
+    have not changed,
+    and remove outputs whose source page was deleted. Also records the
+    mtime each source had when its content last changed, which survives
+    checkouts and touches that change mtimes but not content.
+    With rebuild set, no page is fresh, so a full build regenerates every
+    page while still removing the outputs of deleted sources.
+    """
+
+    def __init__(self, path, pages=None, modified=None, rebuild=False):
+        self.path = path
+        self.rebuild = rebuild
+        self.root = os.path.dirname(path)
+        self.pages = pages if pages is not None else {}
+        self.modified = modified if modified is not None else {}
+        self._seen = set()
+        self._source_hashes = {}
+        self._template_hashes = {}
+
+    @classmethod
+    def load(cls, dest_dir, rebuild=False):
+        """
+        Load the manifest stored in dest_dir.
+        A missing, unreadable or outdated manifest yields an empty one,
+        which simply makes the next build a full build.
+        """
+        path = os.path.join(dest_dir, MANIFEST_FILENAME)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, rebuild=rebuild)
+
+        if not isinstance(data, dict) or data.get("format") != MANIFEST_FORMAT:
+            return cls(path, rebuild=rebuild)
+
+        return cls(path, data.get("pages", {}), data.get("modified", {}), rebuild)
+
+    def save(self):
+        """Write the manifest to disk."""
+        write_json_atomic(self.path, {"format": MANIFEST_FORMAT, "pages": self.pages, "modified": self.modified})
+
+    def _key(self, path):
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def template_hash(self, template_path, options):
+        """
+        Hash the compiled text of a template once per build. Minification
+        and the asset and basepath rewrites are part of that text, so a
+        change to any of them regenerates the pages using the template.
+        """
+        key = (template_path, options.template_key)
+        if key not in self._template_hashes:
+            text = options.compile_template(template_path).text
+            self._template_hashes[key] = hash_bytes(text.encode("utf-8"))
+        return self._template_hashes[key]
+
+    def _source_hash(self, key, source_path):
+        if key not in self._source_hashes:
+            self._source_hashes[key] = hash_file(source_path)
+        return self._source_hashes[key]
+
+    def _entry(self, dest_path, template_path, options, source_hash):
+        from blockhandler import PARSER_VERSION
+        entry = {
+            "output": self._key(dest_path),
+            "source_hash": source_hash,
+            "template_hash": self.template_hash(template_path, options),
+            "basepath": options.basepath,
+            "parser_version": PARSER_VERSION,
+        }
+        # Page content depends on the assets and images too; only builds
+        # that use them record them
+        if options.assets:
+            entry["assets"] = options.assets.key
+        if options.images is not None:
+            entry["images"] = options.images.key
+        return entry
+
+    def is_fresh(self, source_path, dest_path, template_path, options=None):
+        """
+        Check whether dest_path is up to date for source_path when built
+        with options, an options.BuildOptions.
+        Also marks the source as seen, so it survives remove_stale().
+        """
+        key = self._key(source_path)
+        self._seen.add(key)
+
+        entry = self.pages.get(key)
+        if self.rebuild or entry is None or not os.path.exists(dest_path):
+            return False
+
+        source_hash = self._source_hash(key, source_path)
+        return entry == self._entry(dest_path, template_path, as_build_options(options), source_hash)
+
+    def stale_pages(self, pages, template_path, options=None):
+        """
+        Return (source_path, dest_path, page_template_path) for every
+        (source_path, dest_path) page that is not fresh. The template of
+        each page is resolved from its front matter, which is the only
+        part of the source that is read here.
+        """
+        from frontmatter import read_front_matter, resolve_page_template
+
+        stale = []
+        for source_path, dest_path in pages:
+            page_template_path = resolve_page_template(read_front_matter(source_path), template_path)
+            if not self.is_fresh(source_path, dest_path, page_template_path, options):
+                stale.append((source_path, dest_path, page_template_path))
+        return stale
+
+    def record(self, source_path, dest_path, template_path, options=None):
+        """Record that dest_path was generated from source_path."""
+        key = self._key(source_path)
+        self._seen.add(key)
+        source_hash = self._source_hash(key, source_path)
+        previous = self.pages.get(key)
+        if previous is None or previous["source_hash"] != source_hash or key not in self.modified:
+            self.modified[key] = os.stat(source_path).st_mtime_ns
+        self.pages[key] = self._entry(dest_path, template_path, as_build_options(options), source_hash)
+
+    def modified_ns(self, source_path):
+        """Return the mtime source_path had when its content last changed, or None if it was never recorded."""
+        return self.modified.get(self._key(source_path))
+
+    def remove_stale(self):
+        """
+        Delete the outputs of every page that was not seen during this build.
+        Returns the list of removed output paths.
+        """
+        removed = []
+        for key in sorted(set(self.pages) - self._seen):
+            entry = self.pages.pop(key)
+            self.modified.pop(key, None)
+            output_path = os.path.join(self.root, entry["output"])
+            if os.path.exists(output_path):
+                os.remove(output_path)
+                removed.append(output_path)
+                prune_empty_dirs(self.root, os.path.dirname(output_path))
+        return removed
@@ -0,0 +1,74 @@
+import re
+
+
+# Elements whose content is kept exactly as written
+PRESERVED_TAGS = ("pre", "textarea", "script", "style")
+
+# Elements that do not flow with the text around them, so whitespace next
+# to their tags never renders
+BLOCK_TAGS = frozenset(
+    {
+        "!doctype", "address", "article", "aside", "base", "blockquote", "body", "br", "caption", "col",
+        "colgroup", "dd", "details", "dialog", "div", "dl", "dt", "fieldset", "figcaption", "figure",
+        "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "head", "header", "hgroup", "hr", "html",
+        "li", "link", "main", "meta", "nav", "noscript", "ol", "option", "p", "pre", "script",
+        "section", "style", "summary", "table", "tbody", "td", "template", "textarea", "tfoot", "th",
+        "thead", "title", "tr", "ul",
+    }
+)
+
+# Comments, preserved elements with their content, other tags and text
+TOKEN_PATTERN = re.compile(
+    r"(?P<comment><!--.*?-->)"
+    r"|(?P<preserved><(?P<preserved_tag>" + "|".join(PRESERVED_TAGS) + r")\b[^>]*>.*?</(?P=preserved_tag)\s*>)"
+    r"|(?P<tag><[!/]?[A-Za-z][^>]*>)"
+    r"|(?P<text>[^<]+|<)",
+    re.DOTALL | re.IGNORECASE,
+)
+TAG_NAME_PATTERN = re.compile(r"</?(!?[A-Za-z][\w-]*)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _is_block(token):
+    if token is None:
+        # The start and end of the document
+        return True
+    match = TAG_NAME_PATTERN.match(token)
+    return match is not None and match.group(1).lower() in BLOCK_TAGS
+
+
+def minify_html(html):
+    """
+    Remove whitespace and comments that do not change how html renders.
+    Runs of whitespace in text become a single space, and are dropped
+    entirely next to block-level tags. Comments are removed, except
+    conditional comments ("<!--[if"). The content of pre, textarea,
+    script and style elements and the tags themselves are kept as they
+    are, so template placeholders such as {{ Title }} survive unchanged.
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(html):
+        token = match.group(0)
+        if match.group("comment") is not None and not token.startswith("<!--[if"):
+            continue
+        is_text = match.group("text") is not None
+        if is_text and tokens and tokens[-1][1]:
+            # Text on both sides of a removed comment is one run of text
+            tokens[-1] = (tokens[-1][0] + token, True)
+        else:
+            tokens.append((token, is_text))
+
+    parts = []
+    for i, (token, is_text) in enumerate(tokens):
+        if not is_text:
+            parts.append(token)
+            continue
+        previous = tokens[i - 1][0] if i > 0 else None
+        following = tokens[i + 1][0] if i + 1 < len(tokens) else None
+        text = WHITESPACE_PATTERN.sub(" ", token)
+        if text.startswith(" ") and _is_block(previous):
+            text = text[1:]
+        if text.endswith(" ") and _is_block(following):
+            text = text[:-1]
+        parts.append(text)
+    return "".join(parts)
@@ -0,0 +1,60 @@
+from template import Template, load_template
+from urls import UrlResolver
+
+
+class BuildOptions:
+    """
+    The settings that decide what a page comes out as, passed as one
+    object from main() down to every page: the basepath, the build's
+    fingerprint.AssetMap, if any, whether templates are minified, and the
+    build's imagesize.ImageSizes, if any.
+
+    Templates are compiled and URLs resolved through these options, so
+    every build path applies them the same way.
+    """
+
+    __slots__ = ("basepath", "assets", "minify", "images")
+
+    def __init__(self, basepath="/", assets=None, minify=False, images=None):
+        self.basepath = basepath
+        self.assets = assets
+        self.minify = minify
+        self.images = images
+
+    @property
+    def template_key(self):
+        """Identifies everything a compiled template depends on besides its file, for keying compiled templates."""
+        return (self.basepath, self.assets.key if self.assets else None, self.minify)
+
+    def resolver(self):
+        """Return the urls.UrlResolver for page content."""
+        return UrlResolver(self.basepath, self.assets, self.images)
+
+    def compile_template(self, template_path):
+        """Read and compile the template at template_path."""
+        return Template.from_file(template_path, self.basepath, self.assets, self.minify)
+
+    def load_template(self, template_path):
+        """Return the compiled template at template_path, see template.load_template()."""
+        return load_template(template_path, self.basepath, self.assets, self.minify)
+
+    def __repr__(self):
+        return (
+            f"BuildOptions(basepath={self.basepath!r}, assets={len(self.assets or ())}, "
+            f"minify={self.minify!r}, images={len(self.images or ())})"
+        )
+
+
+def as_build_options(options):
+    """
+    Return options as a BuildOptions. None gives the defaults, and a
+    string, the basepath that was passed in its place before BuildOptions
+    existed, is wrapped in one. Anything else raises TypeError.
+    """
+    if options is None:
+        return BuildOptions()
+    if isinstance(options, str):
+        return BuildOptions(options)
+    if not isinstance(options, BuildOptions):
+        raise TypeError(f"options must be a BuildOptions or a basepath string, got {type(options).__name__}")
+    return options
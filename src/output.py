@@ -0,0 +1,186 @@
+import json
+import os
+
+
+# Bytes read at a time when comparing an existing output with a new one
+COMPARE_CHUNK_SIZE = 64 * 1024
+
+
+class WriteResult:
+    """Counts of the pages a build wrote and left untouched."""
+
+    def __init__(self):
+        self.written = []
+        self.unchanged = 0
+
+    def add(self, dest_path, written):
+        if written:
+            self.written.append(dest_path)
+        else:
+            self.unchanged += 1
+
+    def update(self, other):
+        self.written.extend(other.written)
+        self.unchanged += other.unchanged
+
+    def __repr__(self):
+        return f"WriteResult(written={len(self.written)}, unchanged={self.unchanged})"
+
+
+def same_contents(path, data):
+    """
+    Check whether the file at path holds exactly data.
+    Sizes are compared first, so only a file of the same size is read,
+    chunk by chunk, stopping at the first difference.
+    """
+    try:
+        size = os.stat(path).st_size
+    except FileNotFoundError:
+        return False
+    if size != len(data):
+        return False
+    view = memoryview(data)
+    offset = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(COMPARE_CHUNK_SIZE):
+            if view[offset:offset + len(chunk)] != chunk:
+                return False
+            offset += len(chunk)
+    return offset == len(data)
+
+
+def write_atomic(dest_path, data):
+    """
+    Write data to a temporary file, then move it into place as dest_path,
+    so a failed write never leaves a half-written file behind.
+    """
+    dest_dir = os.path.dirname(dest_path)
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(dest_path, data):
+    """Write data as indented JSON with sorted keys, with write_atomic()."""
+    write_atomic(dest_path, json.dumps(data, indent=1, sort_keys=True).encode("utf-8"))
+
+
+def write_if_changed(dest_path, data):
+    """
+    Write data to dest_path unless the file already holds exactly data.
+    An unchanged file keeps its mtime, so rsync, CDN and object storage
+    uploads that compare timestamps skip it. Returns whether it was written.
+    """
+    if same_contents(dest_path, data):
+        return False
+    write_atomic(dest_path, data)
+    return True
+
+
+class ChangedFileWriter:
+    """
+    Writes a file from text produced in pieces, such as a template
+    streamed with render_to(), leaving an existing file that already holds
+    the same bytes untouched. Pieces are buffered up to COMPARE_CHUNK_SIZE
+    bytes and each full buffer is compared with the next bytes of the
+    existing file. Nothing is written while they match. At the first
+    difference, the matching prefix is copied from the existing file to a
+    temporary file and everything after it is written there, so memory
+    use stays at one chunk however large the page is.
+
+    Use as a context manager and pass write() to the producer. written
+    tells whether the file was written and size is the number of bytes.
+    """
+
+    def __init__(self, dest_path):
+        self.dest_path = dest_path
+        self.tmp_path = dest_path + ".tmp"
+        self.size = 0
+        self.written = False
+        self._pending = []
+        self._pending_size = 0
+        self._existing = None
+        self._out = None
+
+    def __enter__(self):
+        try:
+            self._existing = open(self.dest_path, "rb")
+        except FileNotFoundError:
+            self._start_output()
+        return self
+
+    def write(self, text):
+        self._pending.append(text)
+        self._pending_size += len(text)
+        # Characters are never fewer than their UTF-8 bytes
+        if self._pending_size >= COMPARE_CHUNK_SIZE:
+            self._flush()
+
+    def _flush(self):
+        data = "".join(self._pending).encode("utf-8")
+        self._pending = []
+        self._pending_size = 0
+        if self._existing is not None:
+            if self._existing.read(len(data)) == data:
+                self.size += len(data)
+                return
+            self._start_output()
+        self._out.write(data)
+        self.size += len(data)
+
+    def _start_output(self):
+        """Switch from comparing to writing, keeping the size bytes that matched."""
+        dest_dir = os.path.dirname(self.dest_path)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        self._out = open(self.tmp_path, "wb")
+        if self._existing is not None:
+            self._existing.seek(0)
+            remaining = self.size
+            while remaining:
+                chunk = self._existing.read(min(remaining, COMPARE_CHUNK_SIZE))
+                self._out.write(chunk)
+                remaining -= len(chunk)
+            self._existing.close()
+            self._existing = None
+
+    def _discard(self):
+        if self._existing is not None:
+            self._existing.close()
+        if self._out is not None:
+            self._out.close()
+            os.remove(self.tmp_path)
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self._discard()
+            return False
+        try:
+            self._flush()
+            # An existing file that goes on past the new bytes has changed too
+            if self._existing is not None and self._existing.read(1):
+                self._start_output()
+        except BaseException:
+            self._discard()
+            raise
+
+        if self._existing is not None:
+            # Every byte matched: leave the file and its mtime alone
+            self._existing.close()
+            return False
+        self._out.close()
+        try:
+            os.replace(self.tmp_path, self.dest_path)
+        except BaseException:
+            os.remove(self.tmp_path)
+            raise
+        self.written = True
+        return False
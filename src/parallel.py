@@ -0,0 +1,192 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from output import WriteResult
+
+
+# Compiled templates and open render caches, kept per worker process
+_templates = {}
+_caches = {}
+
+
+class PageGenerationError(Exception):
+    """Raised after a parallel build when one or more pages failed."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        super().__init__(f"{len(failures)} page(s) failed to generate")
+
+
+class PageResults:
+    """
+    Bookkeeping shared by the process pool and the pipeline, which build
+    pages away from the main process's walk. Only the pages the manifest,
+    if any, does not consider fresh are kept in pages. Results are then
+    added as (src_path, dest_path, error, page_stats, written) tuples:
+    successful pages are counted, recorded in the manifest and merged
+    into stats, and failures are raised together by finish().
+    """
+
+    def __init__(self, pages, template_path, options, manifest=None, stats=None):
+        self.options = options
+        self.manifest = manifest
+        self.stats = stats
+        self.result = WriteResult()
+        self.failures = []
+        self._page_templates = {}
+        if manifest is not None:
+            # Pages may name their own template in front matter
+            stale = manifest.stale_pages(pages, template_path, options)
+            self._page_templates = {src_path: page_template_path for src_path, _, page_template_path in stale}
+            pages = [(src_path, dest_path) for src_path, dest_path, _ in stale]
+        self.pages = pages
+
+    def add(self, results):
+        for src_path, dest_path, error, page_stats, written in results:
+            if error is not None:
+                self.failures.append((src_path, error))
+                continue
+            self.result.add(dest_path, written)
+            if self.manifest is not None:
+                self.manifest.record(src_path, dest_path, self._page_templates[src_path], self.options)
+            if self.stats is not None:
+                self.stats.add_page(page_stats)
+
+    def finish(self):
+        """Return the output.WriteResult, or raise a PageGenerationError if any page failed."""
+        if self.failures:
+            self.failures.sort()
+            raise PageGenerationError(self.failures)
+        return self.result
+
+
+def _cache_config(cache):
+    """Describe a cache so that a worker can open its own connection to it."""
+    if cache is None:
+        return None
+    return (type(cache), cache.path, cache.max_bytes)
+
+
+def _worker_cache(cache_config):
+    """Return this worker's connection to the cache described by cache_config."""
+    if cache_config is None:
+        return None
+    if cache_config not in _caches:
+        cache_class, path, max_bytes = cache_config
+        _caches[cache_config] = cache_class(path, max_bytes)
+    return _caches[cache_config]
+
+
+def _generate_chunk(
+    chunk,
+    template_path,
+    options,
+    collect_stats=False,
+    cache_config=None,
+    page_cache_config=None,
+):
+    """
+    Worker entry point: generate every page in a chunk.
+    Returns (src_path, dest_path, error, page_stats, written) tuples, where
+    error is None on success and a formatted message otherwise, so that one
+    broken page does not hide the results of the rest of the chunk.
+    page_stats is an instrument.PageStats when collect_stats is set, and
+    written is False for a page whose output was already up to date. The cache configs
+    describe the shared block and page caches, if any, and options is the
+    build's options.BuildOptions.
+    """
+    from instrument import PageStats
+    from main import generate_page
+
+    cache = _worker_cache(cache_config)
+    page_cache = _worker_cache(page_cache_config)
+    results = []
+    for src_path, dest_path in chunk:
+        page_stats = PageStats(src_path) if collect_stats else None
+        try:
+            key = (template_path, options.template_key)
+            if key not in _templates:
+                _templates[key] = options.compile_template(template_path)
+            written = generate_page(
+                src_path,
+                template_path,
+                dest_path,
+                options,
+                _templates[key],
+                page_stats,
+                cache,
+                page_cache,
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+            results.append((src_path, dest_path, error, None, False))
+        else:
+            results.append((src_path, dest_path, None, page_stats, written))
+    # Make this chunk's blocks and pages visible to the other workers
+    for worker_cache in (cache, page_cache):
+        if worker_cache is not None:
+            worker_cache.flush()
+    return results
+
+
+def chunk_pages(pages, jobs):
+    """
+    Split the page list into chunks for submission.
+    Aims for about four chunks per worker so the pool stays balanced
+    while keeping per-task overhead low.
+    """
+    if not pages:
+        return []
+    chunk_size = max(1, min(64, -(-len(pages) // (jobs * 4))))
+    return [pages[i:i + chunk_size] for i in range(0, len(pages), chunk_size)]
+
+
+def generate_pages_parallel(
+    pages,
+    template_path,
+    options=None,
+    jobs=None,
+    manifest=None,
+    stats=None,
+    cache=None,
+    page_cache=None,
+):
+    """
+    Generate (src_path, dest_path) pages in a process pool, built with
+    options, an options.BuildOptions.
+    Every page is attempted; failures are collected and raised together
+    as a PageGenerationError once the pool has drained. Page measurements
+    taken in the workers are merged into stats, an instrument.BuildStats.
+    Workers open their own connections to the databases of cache and
+    page_cache, a blockcache.BlockCache and PageCache. Returns an
+    output.WriteResult of the pages written and left unchanged.
+    """
+    from options import as_build_options
+
+    if jobs is None or jobs < 1:
+        jobs = os.cpu_count() or 1
+    options = as_build_options(options)
+    results = PageResults(pages, template_path, options, manifest, stats)
+
+    # Let the workers see everything this process has cached so far
+    for open_cache in (cache, page_cache):
+        if open_cache is not None:
+            open_cache.flush()
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(
+                _generate_chunk,
+                chunk,
+                template_path,
+                options,
+                stats is not None,
+                _cache_config(cache),
+                _cache_config(page_cache),
+            )
+            for chunk in chunk_pages(results.pages, jobs)
+        ]
+        for future in as_completed(futures):
+            results.add(future.result())
+    return results.finish()
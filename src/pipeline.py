@@ -0,0 +1,174 @@
+import asyncio
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from parallel import PageResults
+
+
+# Pages that may be between the start of their read and the end of their write
+DEFAULT_IN_FLIGHT = 64
+# Threads for reading sources and writing pages; they wait on the disk, not the CPU
+IO_THREADS = 8
+# Most rendered pages handed to a single write call
+WRITE_BATCH = 32
+
+
+def _format_error(e):
+    return f"{type(e).__name__}: {e}\n{traceback.format_exc()}"
+
+
+def _read_source(src_path, page_stats=None):
+    """I/O thread: read one markdown source."""
+    if page_stats is None:
+        with open(src_path, "r") as f:
+            return f.read()
+    with page_stats.timed("read"):
+        with open(src_path, "r") as f:
+            page_stats.bytes_in = os.fstat(f.fileno()).st_size
+            return f.read()
+
+
+def _write_batch(batch):
+    """
+    I/O thread: write rendered pages, leaving up to date files untouched.
+    Returns (src_path, dest_path, error, page_stats, written) for every page.
+    """
+    from main import write_text
+
+    results = []
+    for src_path, dest_path, page, page_stats in batch:
+        try:
+            written = write_text(dest_path, page, page_stats)
+        except Exception as e:
+            results.append((src_path, dest_path, _format_error(e), None, False))
+        else:
+            results.append((src_path, dest_path, None, page_stats, written))
+    return results
+
+
+async def _run_pipeline(pages, render, in_flight, collect_stats, io_executor, cpu_executor):
+    """
+    Push (src_path, dest_path) pages through three stages connected by
+    bounded queues: reads are started up to in_flight pages ahead on the
+    I/O threads, render(markdown_content, src_path, dest_path, page_stats)
+    runs on the CPU thread, and finished pages are written in batches.
+    Returns (src_path, dest_path, error, page_stats, written) for every page.
+    """
+    from instrument import PageStats
+
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(in_flight)
+    reads = asyncio.Queue(in_flight)
+    rendered = asyncio.Queue(in_flight)
+    results = []
+
+    async def prefetch():
+        for src_path, dest_path in pages:
+            await slots.acquire()
+            page_stats = PageStats(src_path) if collect_stats else None
+            read = loop.run_in_executor(io_executor, _read_source, src_path, page_stats)
+            await reads.put((src_path, dest_path, read, page_stats))
+        await reads.put(None)
+
+    async def render_pages():
+        while (item := await reads.get()) is not None:
+            src_path, dest_path, read, page_stats = item
+            try:
+                markdown_content = await read
+                page = await loop.run_in_executor(
+                    cpu_executor, render, markdown_content, src_path, dest_path, page_stats
+                )
+            except Exception as e:
+                results.append((src_path, dest_path, _format_error(e), None, False))
+                slots.release()
+                continue
+            await rendered.put((src_path, dest_path, page, page_stats))
+        await rendered.put(None)
+
+    async def write_pages():
+        finished = False
+        while not finished:
+            # Take whatever has been rendered while the previous batch was written
+            batch = [await rendered.get()]
+            while len(batch) < WRITE_BATCH and not rendered.empty():
+                batch.append(rendered.get_nowait())
+            if batch[-1] is None:
+                finished = True
+                batch.pop()
+            if batch:
+                results.extend(await loop.run_in_executor(io_executor, _write_batch, batch))
+                for _ in batch:
+                    slots.release()
+
+    await asyncio.gather(prefetch(), render_pages(), write_pages())
+    return results
+
+
+def generate_pages_async(
+    pages,
+    template_path,
+    options=None,
+    in_flight=DEFAULT_IN_FLIGHT,
+    manifest=None,
+    stats=None,
+    cache=None,
+    page_cache=None,
+):
+    """
+    Generate (src_path, dest_path) pages in an asyncio pipeline that
+    overlaps reading sources, parsing and rendering, and writing pages,
+    built with options, an options.BuildOptions.
+    At most in_flight pages are held in memory at once. Parsing and
+    rendering run on a single thread, so on a slow filesystem the build
+    takes about as long as the larger of its I/O and CPU time rather
+    than their sum. Failures are collected and raised together as a
+    PageGenerationError, like generate_pages_parallel(). Returns an
+    output.WriteResult of the pages written and left unchanged.
+    """
+    from main import render_page
+    from options import as_build_options
+
+    if in_flight < 1:
+        raise ValueError(f"in_flight must be at least 1, got {in_flight}")
+    options = as_build_options(options)
+    results = PageResults(pages, template_path, options, manifest, stats)
+
+    template = options.compile_template(template_path)
+
+    # sqlite connections belong to the thread that opened them, so the
+    # render thread gets connections of its own, like a parallel worker.
+    # They connect lazily, on first use in that thread.
+    for open_cache in (cache, page_cache):
+        if open_cache is not None:
+            open_cache.flush()
+    render_cache = type(cache)(cache.path, cache.max_bytes) if cache is not None else None
+    render_page_cache = type(page_cache)(page_cache.path, page_cache.max_bytes) if page_cache is not None else None
+
+    def render(markdown_content, src_path, dest_path, page_stats):
+        return render_page(
+            markdown_content,
+            src_path,
+            dest_path,
+            template_path,
+            options,
+            template,
+            page_stats,
+            render_cache,
+            render_page_cache,
+        )
+
+    with (
+        ThreadPoolExecutor(max_workers=min(IO_THREADS, in_flight)) as io_executor,
+        ThreadPoolExecutor(max_workers=1) as cpu_executor,
+    ):
+        try:
+            results.add(
+                asyncio.run(_run_pipeline(results.pages, render, in_flight, stats is not None, io_executor, cpu_executor))
+            )
+        finally:
+            for thread_cache in (render_cache, render_page_cache):
+                if thread_cache is not None:
+                    cpu_executor.submit(thread_cache.close).result()
+
+    return results.finish()
@@ -0,0 +1,168 @@
+import errno
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from manifest import hash_file, prune_empty_dirs
+from output import write_json_atomic
+
+
+SYNC_STATE_FILENAME = ".static-manifest.json"
+
+# Errors that mean a kernel-side copy is not possible for this pair of files,
+# e.g. different filesystems or an unsupported filesystem type
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+
+class SyncResult:
+    """Counts of what a sync_static() run did."""
+
+    def __init__(self):
+        self.copied = []
+        self.unchanged = 0
+        self.deleted = []
+
+    def __repr__(self):
+        return f"SyncResult(copied={len(self.copied)}, unchanged={self.unchanged}, deleted={len(self.deleted)})"
+
+
+def _kernel_copy(fsrc, fdst, size):
+    """
+    Copy size bytes between two open files without passing the data through
+    Python. Returns False when neither copy_file_range nor sendfile can be
+    used, leaving the caller to fall back to a regular copy.
+    """
+    for copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if copy is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                if copy is os.sendfile:
+                    sent = copy(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                else:
+                    sent = copy(fsrc.fileno(), fdst.fileno(), size - offset, offset, offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS or offset:
+                raise
+            continue
+        return offset == size
+    return False
+
+
+def copy_file(src_path, dest_path):
+    """
+    Copy a file using kernel-side copies where available, then give the copy
+    the source's permissions and timestamps so later syncs see it as unchanged.
+    The copy is written to a temporary name and moved into place.
+    """
+    tmp_path = dest_path + ".tmp"
+    try:
+        with open(src_path, "rb") as fsrc, open(tmp_path, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            if not _kernel_copy(fsrc, fdst, size):
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+                shutil.copyfileobj(fsrc, fdst)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _walk_files(root, rel_dir=""):
+    """Yield (relative path, stat result) for every file under root."""
+    with os.scandir(os.path.join(root, rel_dir)) as entries:
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir(follow_symlinks=True):
+                yield from _walk_files(root, rel_path)
+            else:
+                yield rel_path, entry.stat()
+
+
+def _is_unchanged(src_path, src_stat, dest_path, use_hash):
+    """
+    Decide whether dest_path already matches src_path.
+    Size and mtime must match; with use_hash, a size match with a different
+    mtime is settled by comparing content hashes.
+    """
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+
+    if dest_stat.st_size != src_stat.st_size:
+        return False
+    if dest_stat.st_mtime_ns == src_stat.st_mtime_ns:
+        return True
+    if use_hash and hash_file(src_path) == hash_file(dest_path):
+        # Same content: only refresh the timestamps so the next run is cheap
+        os.utime(dest_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        return True
+    return False
+
+
+def _load_state(dest_dir):
+    try:
+        with open(os.path.join(dest_dir, SYNC_STATE_FILENAME), "r") as f:
+            return set(json.load(f).get("files", []))
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+def _save_state(dest_dir, files):
+    write_json_atomic(os.path.join(dest_dir, SYNC_STATE_FILENAME), {"files": sorted(files)})
+
+
+def sync_static(src_dir, dest_dir, jobs=None, use_hash=False):
+    """
+    Make the static files in dest_dir match src_dir.
+    Only files that are new or changed are copied, in a thread pool, and
+    only files that an earlier sync copied but which are gone from src_dir
+    are deleted. Everything else in dest_dir, such as generated pages, is
+    left alone. Returns a SyncResult.
+    """
+    result = SyncResult()
+    os.makedirs(dest_dir, exist_ok=True)
+    previous_files = _load_state(dest_dir)
+
+    to_copy = []
+    current_files = set()
+    for rel_path, src_stat in _walk_files(src_dir):
+        key = rel_path.replace(os.sep, "/")
+        current_files.add(key)
+        src_path = os.path.join(src_dir, rel_path)
+        dest_path = os.path.join(dest_dir, rel_path)
+        if _is_unchanged(src_path, src_stat, dest_path, use_hash):
+            result.unchanged += 1
+        else:
+            to_copy.append((src_path, dest_path))
+
+    for _, dest_path in to_copy:
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+
+    if to_copy:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            # list() re-raises the first copy error, if any
+            list(executor.map(lambda pair: copy_file(*pair), to_copy))
+        result.copied = [dest_path for _, dest_path in to_copy]
+
+    for key in sorted(previous_files - current_files):
+        dest_path = os.path.join(dest_dir, *key.split("/"))
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            result.deleted.append(dest_path)
+            prune_empty_dirs(dest_dir, os.path.dirname(dest_path))
+
+    if current_files != previous_files:
+        _save_state(dest_dir, current_files)
+
+    return result
@@ -0,0 +1,127 @@
+import os
+import re
+
+
+# Matches placeholders such as {{ Title }} and {{ Content }}
+PLACEHOLDER_PATTERN = re.compile(r"\{\{ (\w+) \}\}")
+
+# A complete href or src attribute value
+ATTRIBUTE_URL_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+# (template path, basepath, assets key, minify) -> ((mtime_ns, size), Template), see load_template
+_compiled = {}
+
+
+def rewrite_basepath(html, basepath="/"):
+    """
+    Prefix root-relative href and src attributes with the basepath.
+    Only applied to the template itself; page content gets its URLs from
+    a urls.UrlResolver while it is parsed.
+    """
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+
+def rewrite_assets(html, assets):
+    """
+    Replace href and src attribute values that name a fingerprinted asset
+    with its hashed URL from a fingerprint.AssetMap. The basepath is not
+    applied; use rewrite_basepath() afterwards.
+    """
+    from urls import resolve_asset
+
+    if not assets:
+        return html
+    return ATTRIBUTE_URL_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{resolve_asset(match.group(2), assets)}"', html
+    )
+
+
+class Template:
+    """
+    A page template compiled once per build.
+    The template text is split into literal segments and named slots, with
+    the basepath already applied to the literals, so rendering a page is a
+    single join instead of a chain of whole-document replaces. With a
+    fingerprint.AssetMap, asset URLs are replaced by their hashed names.
+    With minify, whitespace and comments that do not render are removed
+    from the template text before it is split, once per build.
+    """
+
+    def __init__(self, text, basepath="/", assets=None, minify=False):
+        self.basepath = basepath
+        self.literals = []
+        self.slots = []
+        self._placeholders = []
+
+        if minify:
+            from minify import minify_html
+            text = minify_html(text)
+        text = rewrite_assets(text, assets)
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(text):
+            self.literals.append(rewrite_basepath(text[position:match.start()], basepath))
+            self.slots.append(match.group(1))
+            self._placeholders.append(match.group(0))
+            position = match.end()
+        self.literals.append(rewrite_basepath(text[position:], basepath))
+
+    @classmethod
+    def from_file(cls, template_path, basepath="/", assets=None, minify=False):
+        """Read and compile a template file."""
+        with open(template_path, "r") as f:
+            return cls(f.read(), basepath, assets, minify)
+
+    @property
+    def text(self):
+        """The compiled template text, with every rewrite applied and the slots still as placeholders."""
+        parts = [self.literals[0]]
+        for placeholder, literal in zip(self._placeholders, self.literals[1:]):
+            parts.append(placeholder)
+            parts.append(literal)
+        return "".join(parts)
+
+    def render(self, **values):
+        """
+        Fill the slots with the given values and return the page.
+        Slots without a value are left as they appear in the template.
+        """
+        parts = []
+        self.render_to(parts.append, **values)
+        return "".join(parts)
+
+    def render_to(self, write, **values):
+        """
+        Stream the filled template to write().
+        String values are written as they are and HTMLNode values are
+        streamed with render_to(); neither is rewritten.
+        """
+        write(self.literals[0])
+        for i, slot in enumerate(self.slots):
+            value = values.get(slot, self._placeholders[i])
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.render_to(write)
+            write(self.literals[i + 1])
+
+    def __repr__(self):
+        return f"Template(slots={self.slots!r}, basepath={self.basepath!r})"
+
+
+def load_template(template_path, basepath="/", assets=None, minify=False):
+    """
+    Return the compiled template at template_path.
+    Templates are compiled once per process and compiled again only when
+    the file's mtime or size changes, so pages that name their own
+    template in front matter share one compiled copy.
+    """
+    stat = os.stat(template_path)
+    state = (stat.st_mtime_ns, stat.st_size)
+    key = (template_path, basepath, assets.key if assets else None, minify)
+    cached = _compiled.get(key)
+    if cached is None or cached[0] != state:
+        cached = _compiled[key] = (state, Template.from_file(template_path, basepath, assets, minify))
+    return cached[1]
@@ -0,0 +1,201 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import blockhandler
+from blockcache import BlockCache, PageCache
+from blockhandler import markdown_to_html_node
+from instrument import BuildStats, PageStats
+from main import generate_page, generate_pages_recursive
+from options import BuildOptions
+from parallel import generate_pages_parallel
+from urls import UrlResolver
+
+
+MARKDOWN = """# Title
+
+A paragraph with **bold** text
+
+> Shared disclaimer
+
+```
+code
+```
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "cache", "blocks.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_roundtrip_across_connections(self):
+        cache = BlockCache(self.path)
+        key = cache.key("some block")
+        self.assertIsNone(cache.get(key))
+        cache.put(key, "<p>some block</p>")
+        self.assertEqual(cache.get(key), "<p>some block</p>")
+        cache.close()
+
+        reopened = BlockCache(self.path)
+        self.assertEqual(reopened.get(key), "<p>some block</p>")
+        self.assertEqual((reopened.hits, reopened.misses), (1, 0))
+        reopened.close()
+
+    def test_key_depends_on_parser_version(self):
+        key = BlockCache(self.path).key("block")
+        original_version = blockhandler.PARSER_VERSION
+        blockhandler.PARSER_VERSION = original_version + 1
+        try:
+            self.assertNotEqual(BlockCache(self.path).key("block"), key)
+        finally:
+            blockhandler.PARSER_VERSION = original_version
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(self.path, max_bytes=25)
+        cache.put("old", "x" * 10)
+        cache.flush()
+        cache.put("used", "y" * 10)
+        cache.flush()
+        # Touch the oldest entry so that "used" becomes the eviction candidate
+        cache.get("old")
+        cache.flush()
+        cache.put("new", "z" * 10)
+        cache.flush()
+        self.assertEqual(cache.get("old"), "x" * 10)
+        self.assertIsNone(cache.get("used"))
+        self.assertEqual(cache.get("new"), "z" * 10)
+        cache.close()
+
+    def test_corrupt_database_starts_over(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a database" * 100)
+        cache = BlockCache(self.path)
+        self.assertIsNone(cache.get("missing"))
+        cache.close()
+
+    def test_cached_html_is_identical(self):
+        cache = BlockCache(self.path)
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache=cache).to_html(), expected)
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, cache=cache).to_html(), expected)
+        self.assertEqual(cache.hits, 4)
+        cache.close()
+
+    def test_only_changed_blocks_are_parsed(self):
+        cache = BlockCache(self.path)
+        markdown_to_html_node(MARKDOWN, cache=cache)
+        stats = PageStats("page.md")
+        edited = MARKDOWN.replace("**bold**", "**strong**")
+        html = markdown_to_html_node(edited, stats, cache).to_html()
+        self.assertEqual(html, markdown_to_html_node(edited).to_html())
+        self.assertEqual(stats.cached_blocks, 3)
+        # Only the edited paragraph was parsed: A paragraph with, strong, text
+        self.assertEqual(stats.inline_nodes, 3)
+        cache.close()
+
+    def test_shared_between_parallel_workers(self):
+        content_dir = os.path.join(self.root, "content")
+        dest_dir = os.path.join(self.root, "docs")
+        template_path = os.path.join(self.root, "template.html")
+        os.makedirs(content_dir)
+        with open(template_path, "w") as f:
+            f.write("<html><body>{{ Content }}</body></html>")
+        pages = []
+        for i in range(4):
+            src_path = os.path.join(content_dir, f"{i}.md")
+            with open(src_path, "w") as f:
+                f.write(f"# Page {i}\n\n> Shared disclaimer\n")
+            pages.append((src_path, os.path.join(dest_dir, f"{i}.html")))
+
+        cache = BlockCache(self.path)
+        generate_pages_parallel(pages, template_path, jobs=2, cache=cache)
+        for i in range(4):
+            with open(os.path.join(dest_dir, f"{i}.html")) as f:
+                self.assertIn(f"<h1>Page {i}</h1>", f.read())
+
+        reopened = BlockCache(self.path)
+        resolver = UrlResolver("/")
+        self.assertIsNotNone(reopened.get(reopened.key("> Shared disclaimer", resolver)))
+        self.assertIsNotNone(reopened.get(reopened.key("# Page 3", resolver)))
+        reopened.close()
+
+
+class TestPageCache(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.dest_dir = os.path.join(self.root, "docs")
+        self.template_path = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        self._write(self.template_path, '<html><title>{{ Title }}</title><body>{{ Content }}</body></html>')
+        self._write(os.path.join(self.content_dir, "index.md"), MARKDOWN + "\n[home](/)\n")
+        self._write(os.path.join(self.content_dir, "blog", "index.md"), "# Blog\n\nPosts")
+        self.page_cache = PageCache.open(os.path.join(self.root, ".cache"))
+
+    def tearDown(self):
+        self.page_cache.close()
+        shutil.rmtree(self.root)
+
+    def _write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _read(self, *parts):
+        with open(os.path.join(self.dest_dir, *parts)) as f:
+            return f.read()
+
+    def _build(self, basepath="/"):
+        stats = BuildStats()
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, BuildOptions(basepath), stats=stats, page_cache=self.page_cache
+        )
+        return stats.cached_pages
+
+    def test_template_change_reuses_bodies(self):
+        self.assertEqual(self._build("/site/"), 0)
+        self._write(self.template_path, '<html><body><nav><a href="/">Home</a></nav>{{ Content }}</body></html>')
+        self.assertEqual(self._build("/site/"), 2)
+        cached = self._read("index.html")
+
+        uncached_path = os.path.join(self.root, "uncached.html")
+        generate_page(os.path.join(self.content_dir, "index.md"), self.template_path, uncached_path, BuildOptions("/site/"))
+        with open(uncached_path) as f:
+            self.assertEqual(cached, f.read())
+        self.assertIn('<a href="/site/">home</a>', cached)
+
+    def test_basepath_change_is_parsed(self):
+        self._build()
+        self.assertEqual(self._build("/site/"), 0)
+        self.assertIn('<a href="/site/">home</a>', self._read("index.html"))
+        self.assertEqual(self._build("/site/"), 2)
+
+    def test_changed_source_is_parsed(self):
+        self._build()
+        self._write(os.path.join(self.content_dir, "blog", "index.md"), "# Blog\n\nNew posts")
+        self.assertEqual(self._build(), 1)
+        self.assertIn("<p>New posts</p>", self._read("blog", "index.html"))
+
+    def test_shared_with_parallel_workers(self):
+        self._build()
+        pages = [
+            (os.path.join(self.content_dir, "index.md"), os.path.join(self.dest_dir, "index.html")),
+            (os.path.join(self.content_dir, "blog", "index.md"), os.path.join(self.dest_dir, "blog", "index.html")),
+        ]
+        stats = BuildStats()
+        generate_pages_parallel(pages, self.template_path, jobs=2, stats=stats, page_cache=self.page_cache)
+        self.assertEqual(stats.cached_pages, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 
-from blockhandler import BlockType, markdown_to_blocks, block_to_block_type, markdown_to_html_node
+import io
+
+from blockhandler import BlockType, markdown_to_blocks, block_to_block_type, markdown_to_html_node, iter_blocks
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -245,5 +247,67 @@ This is a paragraph with **bold** text.
         )
 
 
+class TestIterBlocks(unittest.TestCase):
+    def test_reads_file_object(self):
+        f = io.StringIO("# Title\n\nSome text\nmore text\n\n- a\n- b\n")
+        self.assertEqual(
+            list(iter_blocks(f)),
+            [
+                (BlockType.HEADING, ["# Title"]),
+                (BlockType.PARAGRAPH, ["Some text", "more text"]),
+                (BlockType.UNORDERED_LIST, ["- a", "- b"]),
+            ],
+        )
+
+    def test_is_lazy(self):
+        def lines():
+            yield "first block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        blocks = iter_blocks(lines())
+        self.assertEqual(next(blocks), (BlockType.PARAGRAPH, ["first block"]))
+
+    def test_fenced_code_with_blank_lines(self):
+        md = "Intro\n\n```\ndef f():\n\n    return 1\n```\n\nOutro"
+        self.assertEqual(
+            list(iter_blocks(md.split("\n"))),
+            [
+                (BlockType.PARAGRAPH, ["Intro"]),
+                (BlockType.CODE, ["```", "def f():", "", "    return 1", "```"]),
+                (BlockType.PARAGRAPH, ["Outro"]),
+            ],
+        )
+
+    def test_unclosed_fence_falls_back_to_paragraphs(self):
+        md = "```\nnot closed\n\nnext block"
+        self.assertEqual(
+            list(iter_blocks(md.split("\n"))),
+            [
+                (BlockType.PARAGRAPH, ["```", "not closed"]),
+                (BlockType.PARAGRAPH, ["next block"]),
+            ],
+        )
+
+    def test_crlf_line_endings(self):
+        f = io.StringIO("one\r\n\r\ntwo\r\n", newline="")
+        self.assertEqual(markdown_to_blocks(f), ["one", "two"])
+
+    def test_whitespace_only_line_separates_blocks(self):
+        self.assertEqual(markdown_to_blocks("one\n   \ntwo"), ["one", "two"])
+
+
+class TestFencedCodeHTML(unittest.TestCase):
+    def test_codeblock_with_blank_line(self):
+        md = "```\nfirst\n\nsecond\n```"
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(html, "<div><pre><code>first\n\nsecond\n</code></pre></div>")
+
+    def test_markdown_to_html_node_from_file(self):
+        f = io.StringIO("# Title\n\n```\nx\n\ny\n```\n")
+        html = markdown_to_html_node(f).to_html()
+        self.assertEqual(html, "<div><h1>Title</h1><pre><code>x\n\ny\n</code></pre></div>")
+
+
 if __name__ == "__main__":
     unittest.main()
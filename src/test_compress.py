@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+import gzip
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from compress import compress_file, compress_outputs
+
+
+PAGE = "<html><body>" + "<p>Not all those who wander are lost.</p>" * 100 + "</body></html>"
+
+
+class TestCompressOutputs(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.root, "blog"))
+        self.write("index.html", PAGE)
+        self.write(os.path.join("blog", "post.html"), PAGE)
+        self.write("index.css", "body { margin: 0; }\n" * 100)
+        self.write("tiny.html", "<p>hi</p>")
+        self.write("photo.png", "x" * 5000)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def path(self, rel_path):
+        return os.path.join(self.root, rel_path)
+
+    def write(self, rel_path, text):
+        with open(self.path(rel_path), "w") as f:
+            f.write(text)
+
+    def test_writes_sidecars(self):
+        result = compress_outputs(self.root)
+        self.assertEqual(
+            sorted(os.path.relpath(path, self.root) for path in result.compressed),
+            [os.path.join("blog", "post.html.gz"), "index.css.gz", "index.html.gz"],
+        )
+        self.assertEqual(result.skipped, 1)
+        with gzip.open(self.path("index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), PAGE)
+        self.assertFalse(os.path.exists(self.path("tiny.html.gz")))
+        self.assertFalse(os.path.exists(self.path("photo.png.gz")))
+
+    def test_sidecars_are_deterministic(self):
+        compress_file(self.path("index.html"))
+        with open(self.path("index.html.gz"), "rb") as f:
+            first = f.read()
+        compress_file(self.path("index.html"))
+        with open(self.path("index.html.gz"), "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_newer_sidecars_are_skipped(self):
+        compress_outputs(self.root)
+        result = compress_outputs(self.root)
+        self.assertEqual((result.compressed, result.unchanged), ([], 3))
+
+        self.write("index.html", PAGE + "<!-- edited -->")
+        stat = os.stat(self.path("index.html.gz"))
+        os.utime(self.path("index.html"), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        result = compress_outputs(self.root)
+        self.assertEqual(result.compressed, [self.path("index.html.gz")])
+        with gzip.open(self.path("index.html.gz"), "rt") as f:
+            self.assertTrue(f.read().endswith("<!-- edited -->"))
+
+    def test_orphaned_and_small_sidecars_are_deleted(self):
+        compress_outputs(self.root)
+        os.remove(self.path(os.path.join("blog", "post.html")))
+        self.write("index.css", "body {}")
+        self.write("archive.tar.gz", "not a sidecar")
+        result = compress_outputs(self.root)
+        self.assertEqual(
+            sorted(result.deleted), sorted([self.path(os.path.join("blog", "post.html.gz")), self.path("index.css.gz")])
+        )
+        self.assertTrue(os.path.exists(self.path("archive.tar.gz")))
+
+    def test_min_size(self):
+        result = compress_outputs(self.root, min_size=1)
+        self.assertIn(self.path("index.html.gz"), result.compressed)
+        # Compressing "<p>hi</p>" makes it larger, so it gets no sidecar
+        self.assertFalse(os.path.exists(self.path("tiny.html.gz")))
+        self.assertEqual(result.skipped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from devserver import DevRequestHandler, PageRenderer
+from options import BuildOptions
+
+
+TEMPLATE = '<html><title>{{ Title }}</title><link href="/index.css"><body>{{ Content }}</body></html>'
+
+
+class DevServerTestCase(unittest.TestCase):
+    basepath = "/"
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.static_dir = os.path.join(self.root, "static")
+        self.template_path = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        os.makedirs(self.static_dir)
+        self.write(self.template_path, TEMPLATE)
+        self.write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self.write(os.path.join(self.content_dir, "index.md"), "# Home\n\n[Blog](/blog/)")
+        self.write(os.path.join(self.content_dir, "blog", "index.md"), "---\ndraft: true\n---\n# Blog\n\nPosts")
+        self.write(os.path.join(self.content_dir, "blog", "post.md"), "# Post\n\nText")
+        self.renderer = PageRenderer(self.content_dir, self.template_path, BuildOptions(self.basepath))
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+        # Make sure the change is visible even with coarse mtimes
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestPageRenderer(DevServerTestCase):
+    def test_source_path(self):
+        def source(url_path):
+            path = self.renderer.source_path(url_path)
+            return None if path is None else os.path.relpath(path, self.content_dir)
+
+        self.assertEqual(source("/"), "index.md")
+        self.assertEqual(source("/index.html"), "index.md")
+        self.assertEqual(source("/blog/"), os.path.join("blog", "index.md"))
+        self.assertEqual(source("/blog/post.html"), os.path.join("blog", "post.md"))
+        self.assertIsNone(source("/index.css"))
+        self.assertIsNone(source("/../secret/"))
+
+    def test_renders_once_until_source_changes(self):
+        src_path = os.path.join(self.content_dir, "index.md")
+        html = self.renderer.render(src_path).decode("utf-8")
+        self.assertEqual(
+            html,
+            '<html><title>Home</title><link href="/index.css"><body>'
+            '<div><h1>Home</h1><p><a href="/blog/">Blog</a></p></div></body></html>',
+        )
+        self.renderer.render(src_path)
+        self.assertEqual(self.renderer.renders, 1)
+
+        self.write(src_path, "# Changed")
+        self.assertIn(b"<h1>Changed</h1>", self.renderer.render(src_path))
+        self.assertEqual(self.renderer.renders, 2)
+
+    def test_template_change_rerenders(self):
+        src_path = os.path.join(self.content_dir, "index.md")
+        self.renderer.render(src_path)
+        self.write(self.template_path, "<main>{{ Content }}</main>")
+        self.assertTrue(self.renderer.render(src_path).startswith(b"<main>"))
+        self.assertEqual(self.renderer.renders, 2)
+
+    def test_drafts_and_missing_pages(self):
+        self.assertIn(b"<h1>Blog</h1>", self.renderer.render(os.path.join(self.content_dir, "blog", "index.md")))
+        self.assertIsNone(self.renderer.render(os.path.join(self.content_dir, "missing.md")))
+
+    def test_least_recently_served_pages_are_dropped(self):
+        renderer = PageRenderer(self.content_dir, self.template_path, max_pages=1)
+        home = os.path.join(self.content_dir, "index.md")
+        post = os.path.join(self.content_dir, "blog", "post.md")
+        renderer.render(home)
+        renderer.render(post)
+        renderer.render(post)
+        self.assertEqual(renderer.renders, 2)
+        renderer.render(home)
+        self.assertEqual(renderer.renders, 3)
+
+
+class TestDevRequestHandler(DevServerTestCase):
+    basepath = "/site/"
+
+    def setUp(self):
+        super().setUp()
+        handler = partial(DevRequestHandler, directory=self.static_dir, renderer=self.renderer)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, args=(0.01,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def get(self, path):
+        try:
+            with urllib.request.urlopen(self.url + path) as response:
+                return response.status, response.geturl(), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, None, b""
+
+    def test_pages_and_static_files(self):
+        status, _, body = self.get("/site/")
+        self.assertEqual(status, 200)
+        self.assertIn(b'<link href="/site/index.css">', body)
+        self.assertIn(b'<a href="/site/blog/">', body)
+        self.assertEqual(self.get("/site/index.css")[2], b"body {}")
+        self.assertIn(b"<h1>Post</h1>", self.get("/site/blog/post.html?x=1")[2])
+
+    def test_redirects_and_missing_paths(self):
+        status, url, body = self.get("/site/blog")
+        self.assertEqual(status, 200)
+        self.assertTrue(url.endswith("/site/blog/"))
+        self.assertIn(b"<h1>Blog</h1>", body)
+        self.assertEqual(self.get("/site/missing.html")[0], 404)
+        self.assertEqual(self.get("/index.css")[0], 404)
+
+    def test_concurrent_requests(self):
+        paths = ["/site/", "/site/blog/", "/site/blog/post.html"] * 10
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(self.get, paths))
+        self.assertTrue(all(status == 200 for status, _, _ in responses))
+        # Pages requested at the same time may be rendered more than once, but never again afterwards
+        renders = self.renderer.renders
+        self.get("/site/")
+        self.assertEqual(self.renderer.renders, renders)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from blockcache import BlockCache
+from blockhandler import markdown_to_html_node, parse_markdown
+from docinfo import DocumentInfo, Heading, document_title, slugify
+from urls import UrlResolver
+
+
+MARKDOWN = """# The **Fellowship**
+
+Intro with a [link](/blog/one) and ![a map](/images/map.png)
+
+## Members
+
+- Frodo of the [Shire](https://example.com/shire)
+- Sam
+
+## Members
+
+> Not all those who wander
+
+```
+# not a heading [nor](/a-link)
+```
+
+Use `[code](/not-a-link)` and [a real one](/blog/two)
+"""
+
+
+class TestSlugify(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("The **Fellowship**"), "the-fellowship")
+        self.assertEqual(slugify("Hello, World & Friends!"), "hello-world-friends")
+        self.assertEqual(slugify("snake_case"), "snake-case")
+        self.assertEqual(slugify("!!!"), "section")
+
+
+class TestDocumentInfo(unittest.TestCase):
+    def test_parse_markdown_collects_metadata(self):
+        node, info = parse_markdown(MARKDOWN, resolver=UrlResolver("/site/"))
+        self.assertEqual(node.to_html(), markdown_to_html_node(MARKDOWN, resolver=UrlResolver("/site/")).to_html())
+        self.assertEqual(info.title, "The **Fellowship**")
+        self.assertEqual(
+            info.headings,
+            [
+                Heading(1, "The **Fellowship**", "the-fellowship"),
+                Heading(2, "Members", "members"),
+                Heading(2, "Members", "members-1"),
+            ],
+        )
+        self.assertEqual(info.links, ["/site/blog/one", "https://example.com/shire", "/site/blog/two"])
+        self.assertEqual(info.images, ["/site/images/map.png"])
+        # Code blocks are not counted, inline code is
+        self.assertEqual(info.word_count, 27)
+
+    def test_linked_image(self):
+        _, info = parse_markdown("[![logo](/images/tom.png)](/blog/tom) and ![map](/map.png)")
+        self.assertEqual(info.links, ["/blog/tom"])
+        self.assertEqual(info.images, ["/images/tom.png", "/map.png"])
+
+    def test_no_h1(self):
+        _, info = parse_markdown("## Only h2\n\ntext")
+        self.assertIsNone(info.title)
+        with self.assertRaises(Exception):
+            document_title(info, "## Only h2\n\ntext")
+
+    def test_title_falls_back_to_extract_title(self):
+        markdown = "Some paragraph\n# Title inside it"
+        _, info = parse_markdown(markdown)
+        self.assertIsNone(info.title)
+        self.assertEqual(document_title(info, markdown), "Title inside it")
+
+    def test_dict_roundtrip(self):
+        _, info = parse_markdown(MARKDOWN)
+        restored = DocumentInfo.from_dict(info.to_dict())
+        self.assertEqual(restored.to_dict(), info.to_dict())
+        self.assertEqual(restored.headings, info.headings)
+
+    def test_block_cache_keeps_metadata(self):
+        root = tempfile.mkdtemp()
+        try:
+            cache = BlockCache(os.path.join(root, "blocks.sqlite3"))
+            _, expected = parse_markdown(MARKDOWN)
+            _, cold = parse_markdown(MARKDOWN, cache=cache)
+            _, warm = parse_markdown(MARKDOWN, cache=cache)
+            # Seven distinct blocks; the repeated heading hits on the first pass
+            self.assertEqual((cache.misses, cache.hits), (7, 9))
+            self.assertEqual(cold.to_dict(), expected.to_dict())
+            self.assertEqual(warm.to_dict(), expected.to_dict())
+            cache.close()
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import feeds
+from feeds import FEED_FILENAME, SITEMAP_FILENAME, FeedWriter, SiteFeeds, SitemapWriter, format_date, format_timestamp, page_url
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from options import BuildOptions
+
+
+class TestPageUrl(unittest.TestCase):
+    def test_page_url(self):
+        self.assertEqual(page_url("https://example.com/", "/", "index.html"), "https://example.com/")
+        self.assertEqual(page_url("https://example.com", "/site/", "blog/index.html"), "https://example.com/site/blog/")
+        self.assertEqual(page_url("https://example.com", "/", "blog/a b.html"), "https://example.com/blog/a%20b.html")
+
+    def test_format_timestamp(self):
+        self.assertEqual(format_timestamp(86_400_999_999_999), "1970-01-02T00:00:00Z")
+
+
+class TestSitemapWriter(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def read(self, filename):
+        with open(os.path.join(self.root, filename)) as f:
+            return f.read()
+
+    def write_sitemap(self, count, lastmod="2024-01-01T00:00:00Z"):
+        sitemap = SitemapWriter(self.root, max_urls=2)
+        for i in range(count):
+            sitemap.add(f"https://example.com/{i}?a=1&b=2", lastmod)
+        return sitemap.close("https://example.com", "/")
+
+    def test_single_file(self):
+        result = self.write_sitemap(2)
+        self.assertEqual(result.written, [os.path.join(self.root, SITEMAP_FILENAME)])
+        sitemap = self.read(SITEMAP_FILENAME)
+        self.assertIn("<urlset", sitemap)
+        self.assertIn("<loc>https://example.com/1?a=1&amp;b=2</loc><lastmod>2024-01-01T00:00:00Z</lastmod>", sitemap)
+
+    def test_splits_into_shards_with_an_index(self):
+        result = self.write_sitemap(5)
+        self.assertEqual(len(result.written), 4)
+        index = self.read(SITEMAP_FILENAME)
+        self.assertIn("<sitemapindex", index)
+        self.assertIn("<loc>https://example.com/sitemap-3.xml</loc>", index)
+        self.assertEqual(self.read("sitemap-3.xml").count("<url>"), 1)
+
+        # Unchanged shards are not written again
+        result = self.write_sitemap(5)
+        self.assertEqual((result.written, result.unchanged), ([], 4))
+
+        # Shards of a larger site are removed
+        self.write_sitemap(3)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "sitemap-3.xml")))
+        self.write_sitemap(1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "sitemap-1.xml")))
+        self.assertIn("<urlset", self.read(SITEMAP_FILENAME))
+
+
+class TestFeedWriter(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_newest_entries(self):
+        feed = FeedWriter(self.root, max_entries=2)
+        for day in (3, 1, 4, 2):
+            src_path = os.path.join(self.root, f"{day}.md")
+            with open(src_path, "w") as f:
+                f.write(f"# Day {day} & more")
+            front_matter = {"summary": "Fourth"} if day == 4 else {}
+            feed.add(f"https://example.com/{day}/", f"2024-01-0{day}T00:00:00Z", src_path, front_matter)
+        with mock.patch.object(feeds, "page_title", side_effect=feeds.page_title) as titled:
+            self.assertTrue(feed.close("https://example.com", "/", "Site"))
+            self.assertEqual(titled.call_count, 2)
+
+        with open(os.path.join(self.root, FEED_FILENAME)) as f:
+            atom = f.read()
+        self.assertIn("<title>Site</title>", atom)
+        self.assertIn("<updated>2024-01-04T00:00:00Z</updated>\n<author>", atom)
+        self.assertLess(atom.index("Day 4 &amp; more"), atom.index("Day 3 &amp; more"))
+        self.assertNotIn("Day 2", atom)
+        self.assertIn("<summary>Fourth</summary>", atom)
+        self.assertNotIn("<published>", atom)
+
+    def test_entries_ordered_by_date(self):
+        feed = FeedWriter(self.root, max_entries=2)
+        # An old post edited today is older than a new post, and than a page without a date
+        pages = [
+            ("old", "2024-03-01T00:00:00Z", {"date": "2023-06-01"}),
+            ("undated", "2024-01-10T00:00:00Z", {}),
+            ("new", "2024-01-01T00:00:00Z", {"date": "2024-02-01"}),
+        ]
+        for name, lastmod, front_matter in pages:
+            src_path = os.path.join(self.root, f"{name}.md")
+            with open(src_path, "w") as f:
+                f.write(f"# Page {name}")
+            feed.add(f"https://example.com/{name}/", lastmod, src_path, front_matter)
+        feed.close("https://example.com")
+        with open(os.path.join(self.root, FEED_FILENAME)) as f:
+            atom = f.read()
+        self.assertNotIn("Page old", atom)
+        self.assertLess(atom.index("Page new"), atom.index("Page undated"))
+        self.assertIn("<updated>2024-02-01T00:00:00Z</updated><published>2024-02-01T00:00:00Z</published>", atom)
+
+    def test_published_date(self):
+        src_path = os.path.join(self.root, "post.md")
+        with open(src_path, "w") as f:
+            f.write("# Post")
+        feed = FeedWriter(self.root)
+        front_matter = {"date": "2024-02-01T09:30:00+02:00", "description": "Not a summary"}
+        feed.add("https://example.com/post/", "2024-01-01T00:00:00Z", src_path, front_matter)
+        feed.close("https://example.com")
+        with open(os.path.join(self.root, FEED_FILENAME)) as f:
+            atom = f.read()
+        # The entry and the feed are not updated before the page was published
+        self.assertIn("<updated>2024-02-01T07:30:00Z</updated><published>2024-02-01T07:30:00Z</published>", atom)
+        self.assertIn("<updated>2024-02-01T07:30:00Z</updated>\n<author>", atom)
+        self.assertNotIn("<summary>", atom)
+
+    def test_format_date(self):
+        self.assertEqual(format_date("2024-01-15"), "2024-01-15T00:00:00Z")
+        self.assertEqual(format_date("2024-01-15T09:30:00Z"), "2024-01-15T09:30:00Z")
+        self.assertIsNone(format_date("last tuesday"))
+
+
+class TestSiteFeeds(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write("index.md", "# Home")
+        self.write(os.path.join("blog", "index.md"), "---\ntitle: The Blog\n---\n# Blog")
+        self.write(os.path.join("blog", "draft.md"), "---\ndraft: true\n---\n# Draft")
+        self.template_path = os.path.join(self.root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, text, mtime_ns=1_700_000_000_000_000_000):
+        path = os.path.join(self.content, rel_path)
+        with open(path, "w") as f:
+            f.write(text)
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def build(self):
+        build_manifest = BuildManifest.load(self.dest)
+        site_feeds = SiteFeeds(self.dest, "https://example.com", "/site/", build_manifest)
+        generate_pages_recursive(
+            self.content, self.template_path, self.dest, BuildOptions("/site/"), build_manifest, feeds=site_feeds
+        )
+        build_manifest.save()
+        site_feeds.close("Home")
+        with open(os.path.join(self.dest, SITEMAP_FILENAME)) as f:
+            return f.read()
+
+    def test_pages_are_added_during_the_walk(self):
+        sitemap = self.build()
+        self.assertEqual(sitemap.count("<url>"), 2)
+        self.assertIn("<loc>https://example.com/site/blog/</loc><lastmod>2023-11-14T22:13:20Z</lastmod>", sitemap)
+        self.assertNotIn("draft", sitemap)
+        with open(os.path.join(self.dest, FEED_FILENAME)) as f:
+            self.assertIn("<title>The Blog</title>", f.read())
+
+    def test_lastmod_follows_content_changes(self):
+        first = self.build()
+        # Touching a source does not change its lastmod, and unchanged pages are still listed
+        path = os.path.join(self.content, "index.md")
+        os.utime(path, ns=(1_800_000_000_000_000_000, 1_800_000_000_000_000_000))
+        self.assertEqual(self.build(), first)
+
+        self.write("index.md", "# Home, edited", mtime_ns=1_800_000_000_000_000_000)
+        sitemap = self.build()
+        self.assertIn("<loc>https://example.com/site/</loc><lastmod>2027-01-15T08:00:00Z</lastmod>", sitemap)
+        self.assertEqual(sitemap.count("<url>"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
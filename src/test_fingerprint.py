@@ -0,0 +1,132 @@
+import unittest
+import sys
+import os
+import hashlib
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import fingerprint
+import manifest as manifest_module
+from fingerprint import ASSET_MANIFEST_FILENAME, AssetMap, fingerprint_static, fingerprinted_path
+from main import generate_pages_recursive
+from manifest import BuildManifest, hash_file
+from options import BuildOptions
+from template import Template
+from urls import UrlResolver
+
+
+class TestAssetMap(unittest.TestCase):
+    def test_fingerprinted_path(self):
+        self.assertEqual(fingerprinted_path("images/a.png", "0123456789abcdef"), "images/a.0123456789.png")
+        self.assertEqual(fingerprinted_path("LICENSE", "0123456789abcdef"), "LICENSE.0123456789")
+
+    def test_key_depends_on_mapping(self):
+        first = AssetMap({"/a.css": "/a.1.css"})
+        self.assertEqual(first.key, AssetMap({"/a.css": "/a.1.css"}).key)
+        self.assertNotEqual(first.key, AssetMap({"/a.css": "/a.2.css"}).key)
+
+    def test_resolver(self):
+        resolver = UrlResolver("/site/", AssetMap({"/index.css": "/index.abc.css"}))
+        self.assertEqual(resolver.resolve("/index.css"), "/site/index.abc.css")
+        self.assertEqual(resolver.resolve("/index.css?v=1#top"), "/site/index.abc.css?v=1#top")
+        self.assertEqual(resolver.resolve("/other.css"), "/site/other.css")
+        self.assertNotEqual(resolver.cache_key, UrlResolver("/site/").cache_key)
+
+    def test_template(self):
+        assets = AssetMap({"/index.css": "/index.abc.css", "/logo.png": "/logo.def.png"})
+        template = Template(
+            '<link href="/index.css"><img src="/logo.png"><a href="/">{{ Title }}</a>', "/site/", assets
+        )
+        self.assertEqual(
+            template.render(Title="t"),
+            '<link href="/site/index.abc.css"><img src="/site/logo.def.png"><a href="/site/">t</a>',
+        )
+
+
+class TestFingerprintStatic(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write("index.css", "body { color: red; }")
+        self.write(os.path.join("images", "map.png"), "PNG data")
+        self.write("CNAME", "example.com")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, text):
+        with open(os.path.join(self.static, rel_path), "w") as f:
+            f.write(text)
+
+    def digest(self, text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def test_copies_hashed_files_and_writes_manifest(self):
+        assets = fingerprint_static(self.static, self.dest)
+        css = fingerprinted_path("index.css", self.digest("body { color: red; }"))
+        png = fingerprinted_path("images/map.png", self.digest("PNG data"))
+        self.assertEqual(assets, {"/index.css": "/" + css, "/images/map.png": "/" + png})
+        with open(os.path.join(self.dest, css)) as f:
+            self.assertEqual(f.read(), "body { color: red; }")
+        self.assertTrue(os.path.exists(os.path.join(self.dest, png)))
+        # Only fingerprintable files are copied
+        self.assertFalse(any(name.startswith("CNAME") for name in os.listdir(self.dest)))
+        with open(os.path.join(self.dest, ASSET_MANIFEST_FILENAME)) as f:
+            self.assertEqual(json.load(f)["assets"], assets)
+
+    def test_unchanged_files_are_not_hashed_again(self):
+        first = fingerprint_static(self.static, self.dest)
+        with mock.patch.object(manifest_module, "hash_file", side_effect=hash_file) as hashed:
+            self.assertEqual(fingerprint_static(self.static, self.dest), first)
+            self.assertEqual(hashed.call_count, 0)
+            self.write("index.css", "body { color: blue; }")
+            second = fingerprint_static(self.static, self.dest)
+            self.assertEqual(hashed.call_count, 1)
+        self.assertNotEqual(second["/index.css"], first["/index.css"])
+        # The old copy stays for pages that still reference it
+        self.assertTrue(os.path.exists(os.path.join(self.dest, first["/index.css"][1:])))
+
+    def test_hash_file_streams(self):
+        path = os.path.join(self.root, "large.bin")
+        data = os.urandom(manifest_module.HASH_CHUNK_SIZE * 2 + 123)
+        with open(path, "wb") as f:
+            f.write(data)
+        self.assertEqual(hash_file(path), hashlib.sha256(data).hexdigest())
+
+    def test_pages_link_to_fingerprinted_assets(self):
+        content = os.path.join(self.root, "content")
+        os.makedirs(content)
+        with open(os.path.join(content, "index.md"), "w") as f:
+            f.write("# Home\n\n![map](/images/map.png) and `![code](/images/map.png)`")
+        template_path = os.path.join(self.root, "template.html")
+        with open(template_path, "w") as f:
+            f.write('<link href="/index.css">{{ Content }}')
+
+        assets = fingerprint_static(self.static, self.dest)
+        build_manifest = BuildManifest.load(self.dest)
+        generate_pages_recursive(content, template_path, self.dest, BuildOptions(assets=assets), build_manifest)
+        with open(os.path.join(self.dest, "index.html")) as f:
+            html = f.read()
+        self.assertIn(f'<link href="{assets["/index.css"]}">', html)
+        self.assertIn(f'<img src="{assets["/images/map.png"]}" alt="map">', html)
+        # Code is not rewritten
+        self.assertIn("<code>![code](/images/map.png)</code>", html)
+
+        # Pages are rebuilt when an asset's hash changes
+        src_path = os.path.join(content, "index.md")
+        dest_path = os.path.join(self.dest, "index.html")
+        self.assertTrue(build_manifest.is_fresh(src_path, dest_path, template_path, BuildOptions(assets=assets)))
+        self.write("index.css", "body { color: blue; }")
+        changed = fingerprint_static(self.static, self.dest)
+        self.assertFalse(build_manifest.is_fresh(src_path, dest_path, template_path, BuildOptions(assets=changed)))
+
+
+if __name__ == "__main__":
+    unittest.main()
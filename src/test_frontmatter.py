@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from frontmatter import (
+    MAX_FRONT_MATTER_LINES,
+    read_front_matter,
+    resolve_page_template,
+    split_front_matter,
+    template_values,
+)
+from main import collect_pages, generate_page, generate_pages_recursive
+from manifest import BuildManifest
+
+
+POST = """---
+title: "Concerning Hobbits: A Study"
+date: 2024-01-15
+tags: [hobbits, shire]
+draft: false
+# not a key
+authors:
+  - Bilbo
+  - Frodo
+summary:
+---
+# Concerning Hobbits
+
+Hobbits are an unobtrusive people.
+"""
+
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_values(self):
+        front_matter, body = split_front_matter(POST)
+        self.assertEqual(
+            front_matter,
+            {
+                "title": "Concerning Hobbits: A Study",
+                "date": "2024-01-15",
+                "tags": ["hobbits", "shire"],
+                "draft": False,
+                "authors": ["Bilbo", "Frodo"],
+                "summary": [],
+            },
+        )
+        self.assertEqual(body, "# Concerning Hobbits\n\nHobbits are an unobtrusive people.\n")
+
+    def test_no_front_matter(self):
+        markdown = "# Title\n\n---\nkey: value\n---\n"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+
+    def test_unclosed_header_is_body(self):
+        markdown = "---\n" + "key: value\n" * (MAX_FRONT_MATTER_LINES + 1) + "---\n# Title"
+        self.assertEqual(split_front_matter(markdown), ({}, markdown))
+        self.assertEqual(split_front_matter("---\nkey: value\n"), ({}, "---\nkey: value\n"))
+
+    def test_invalid_line_raises(self):
+        with self.assertRaises(ValueError) as context:
+            split_front_matter("---\ntitle: ok\nnot a pair\n---\n# Title")
+        self.assertIn("line 3", str(context.exception))
+
+    def test_template_values(self):
+        front_matter, _ = split_front_matter(POST)
+        values = template_values(front_matter, ["Title", "Content", "date", "updated"])
+        self.assertEqual(values["tags"], "hobbits, shire")
+        self.assertEqual(values["draft"], "false")
+        self.assertEqual(values["summary"], "")
+        self.assertEqual(values["updated"], "")
+        self.assertEqual(values["date"], "2024-01-15")
+
+    def test_resolve_page_template(self):
+        self.assertEqual(resolve_page_template({}, "/site/template.html"), "/site/template.html")
+        self.assertEqual(resolve_page_template({"template": "post.html"}, "/site/template.html"), "/site/post.html")
+
+
+class TestFrontMatterPages(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(self.content)
+        self.template_path = os.path.join(self.root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<title>{{ Title }}</title><p>{{ date }}|{{ tags }}</p>{{ Content }}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, name, text):
+        path = os.path.join(self.content, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def read(self, name):
+        with open(os.path.join(self.dest, name)) as f:
+            return f.read()
+
+    def test_read_front_matter_stops_at_header(self):
+        path = self.write("post.md", POST + "not: front matter\n" * 1000)
+        self.assertEqual(read_front_matter(path)["tags"], ["hobbits", "shire"])
+        self.assertEqual(read_front_matter(self.write("plain.md", "# Plain\n")), {})
+
+    def test_generate_page_uses_front_matter(self):
+        path = self.write("post.md", POST)
+        generate_page(path, self.template_path, os.path.join(self.dest, "post.html"))
+        self.assertEqual(
+            self.read("post.html"),
+            "<title>Concerning Hobbits: A Study</title><p>2024-01-15|hobbits, shire</p>"
+            "<div><h1>Concerning Hobbits</h1><p>Hobbits are an unobtrusive people.</p></div>",
+        )
+
+    def test_missing_values_render_empty(self):
+        path = self.write("plain.md", "# Plain\n")
+        generate_page(path, self.template_path, os.path.join(self.dest, "plain.html"))
+        self.assertEqual(self.read("plain.html"), "<title>Plain</title><p>|</p><div><h1>Plain</h1></div>")
+
+    def test_page_template(self):
+        with open(os.path.join(self.root, "post.html"), "w") as f:
+            f.write("<article>{{ Title }}{{ Content }}</article>")
+        path = self.write("post.md", "---\ntemplate: post.html\n---\n# Post\n")
+        generate_page(path, self.template_path, os.path.join(self.dest, "post.html"))
+        self.assertEqual(self.read("post.html"), "<article>Post<div><h1>Post</h1></div></article>")
+
+    def test_drafts_are_skipped(self):
+        self.write("index.md", "# Index\n")
+        self.write("wip.md", "---\ndraft: true\n---\n# Work in progress\n")
+        names = [os.path.basename(src) for src, _ in collect_pages(self.content, self.dest)]
+        self.assertEqual(names, ["index.md"])
+        self.assertEqual(len(collect_pages(self.content, self.dest, drafts=True)), 2)
+
+        generate_pages_recursive(self.content, self.template_path, self.dest)
+        self.assertEqual(sorted(os.listdir(self.dest)), ["index.html"])
+        generate_pages_recursive(self.content, self.template_path, self.dest, drafts=True)
+        self.assertEqual(sorted(os.listdir(self.dest)), ["index.html", "wip.html"])
+
+    def test_page_becoming_draft_is_removed_incrementally(self):
+        path = self.write("post.md", "# Post\n")
+        manifest = BuildManifest.load(self.dest)
+        generate_pages_recursive(self.content, self.template_path, self.dest, manifest=manifest)
+        manifest.remove_stale()
+        manifest.save()
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "post.html")))
+
+        self.write("post.md", "---\ndraft: true\n---\n# Post\n")
+        manifest = BuildManifest.load(self.dest)
+        generate_pages_recursive(self.content, self.template_path, self.dest, manifest=manifest)
+        manifest.remove_stale()
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "post.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import sys
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -147,5 +148,65 @@ class TestParentNode(unittest.TestCase):
         self.assertTrue(result.startswith("ParentNode"))
 
 
+class TestNodeSlots(unittest.TestCase):
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_tags_are_interned(self):
+        tag = "".join(["sp", "an"])
+        node = LeafNode(tag, "x")
+        self.assertIs(node.tag, sys.intern("span"))
+
+    def test_leaf_keeps_public_attributes(self):
+        node = LeafNode("a", "x", {"href": "/"})
+        self.assertEqual((node.tag, node.value, node.children, node.props), ("a", "x", None, {"href": "/"}))
+
+
+class TestRenderTo(unittest.TestCase):
+    def test_leaf_render_to(self):
+        parts = []
+        LeafNode("a", "Click", {"href": "/x"}).render_to(parts.append)
+        self.assertEqual("".join(parts), '<a href="/x">Click</a>')
+
+    def test_parent_render_to_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "Hello, "), LeafNode("b", "world")]),
+                ParentNode("ul", [ParentNode("li", [LeafNode(None, "one")])], {"class": "list"}),
+            ],
+        )
+        parts = []
+        node.render_to(parts.append)
+        self.assertEqual(
+            "".join(parts),
+            '<div><p>Hello, <b>world</b></p><ul class="list"><li>one</li></ul></div>',
+        )
+
+    def test_render_to_file(self):
+        import io
+        buffer = io.StringIO()
+        ParentNode("p", [LeafNode("i", "x")]).render_to(buffer.write)
+        self.assertEqual(buffer.getvalue(), "<p><i>x</i></p>")
+
+    def test_render_to_deep_tree_has_no_recursion_limit(self):
+        depth = sys.getrecursionlimit() * 2
+        node = LeafNode(None, "deep")
+        for _ in range(depth):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertEqual(len(html), len("deep") + depth * len("<span></span>"))
+
+    def test_render_to_invalid_child_raises(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        with self.assertRaises(ValueError):
+            node.render_to([].append)
+
+    def test_html_node_render_to_raises_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode(tag="div").render_to([].append)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,182 @@
+import unittest
+import sys
+import os
+import shutil
+import struct
+import tempfile
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import imagesize
+import manifest as manifest_module
+from imagesize import IMAGE_INDEX_FILENAME, ImageSizes, load_image_sizes, read_image_size
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from options import BuildOptions
+from textnode import TextNode, TextType, text_node_to_html_node
+from urls import UrlResolver
+
+
+def png(width, height):
+    return b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0dIHDR" + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00"
+
+
+def gif(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 20
+
+
+def jpeg(width, height):
+    # An EXIF segment larger than the header read comes before the frame
+    exif = b"\xff\xe1" + struct.pack(">H", 2 + 5000) + b"\x00" * 5000
+    frame = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + exif + b"\xff\xff" + frame + b"\xff\xd9"
+
+
+def webp(chunk, payload):
+    data = chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(data) + 4) + b"WEBP" + data
+
+
+class TestReadImageSize(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def size_of(self, data):
+        path = os.path.join(self.root, "image")
+        with open(path, "wb") as f:
+            f.write(data)
+        return read_image_size(path)
+
+    def test_formats(self):
+        cases = [
+            ("png", png(640, 480), (640, 480)),
+            ("gif", gif(32, 16), (32, 16)),
+            ("jpeg", jpeg(1920, 1080), (1920, 1080)),
+            ("webp lossy", webp(b"VP8 ", b"\x00\x00\x00\x9d\x01\x2a" + struct.pack("<HH", 300, 200)), (300, 200)),
+            ("webp lossless", webp(b"VP8L", b"\x2f" + struct.pack("<I", 99 | 49 << 14)), (100, 50)),
+            ("webp extended", webp(b"VP8X", b"\x00" * 4 + b"\x87\x13\x00" + b"\xb7\x0b\x00"), (5000, 3000)),
+        ]
+        for name, data, expected in cases:
+            with self.subTest(name):
+                self.assertEqual(self.size_of(data), expected)
+
+    def test_damaged_or_unknown(self):
+        self.assertIsNone(self.size_of(b""))
+        self.assertIsNone(self.size_of(b"<svg></svg>"))
+        self.assertIsNone(self.size_of(png(1, 1)[:20]))
+        self.assertIsNone(self.size_of(jpeg(10, 10)[:100]))
+        self.assertIsNone(self.size_of(b"\xff\xd8\xff\xe1\x00\x00"))
+
+
+class TestImageAttributes(unittest.TestCase):
+    def test_known_image(self):
+        resolver = UrlResolver("/site/", images=ImageSizes({"/images/map.png": (640, 480)}))
+        node = text_node_to_html_node(TextNode("map", TextType.IMAGE, "/images/map.png?v=2"), resolver)
+        self.assertEqual(
+            node.props,
+            {
+                "src": "/site/images/map.png?v=2",
+                "alt": "map",
+                "width": "640",
+                "height": "480",
+                "loading": "lazy",
+                "decoding": "async",
+            },
+        )
+
+    def test_unknown_image_is_still_lazy(self):
+        resolver = UrlResolver(images=ImageSizes())
+        node = text_node_to_html_node(TextNode("x", TextType.IMAGE, "https://example.com/x.png"), resolver)
+        self.assertEqual(
+            node.props, {"src": "https://example.com/x.png", "alt": "x", "loading": "lazy", "decoding": "async"}
+        )
+
+    def test_no_image_sizes(self):
+        node = text_node_to_html_node(TextNode("map", TextType.IMAGE, "/images/map.png"), UrlResolver())
+        self.assertEqual(node.props, {"src": "/images/map.png", "alt": "map"})
+
+    def test_cache_key(self):
+        plain = UrlResolver("/site/")
+        first = UrlResolver("/site/", images=ImageSizes({"/a.png": (1, 2)}))
+        second = UrlResolver("/site/", images=ImageSizes({"/a.png": (2, 1)}))
+        self.assertEqual(len({plain.cache_key, first.cache_key, second.cache_key}), 3)
+
+
+class TestLoadImageSizes(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        self.cache_dir = os.path.join(self.root, ".cache")
+        os.makedirs(os.path.join(self.static, "images"))
+        self.write(os.path.join("images", "map.png"), png(640, 480))
+        self.write("photo.jpg", jpeg(1200, 800))
+        self.write("broken.gif", b"not a gif")
+        self.write("index.css", b"body {}")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, rel_path, data):
+        with open(os.path.join(self.static, rel_path), "wb") as f:
+            f.write(data)
+
+    def test_sizes(self):
+        images = load_image_sizes(self.static, self.cache_dir)
+        self.assertEqual(images, {"/images/map.png": (640, 480), "/photo.jpg": (1200, 800)})
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, IMAGE_INDEX_FILENAME)))
+
+    def test_index_is_reused(self):
+        first = load_image_sizes(self.static, self.cache_dir)
+        with (
+            mock.patch.object(imagesize, "read_image_size", side_effect=read_image_size) as read,
+            mock.patch.object(manifest_module, "hash_file", side_effect=manifest_module.hash_file) as hashed,
+        ):
+            self.assertEqual(load_image_sizes(self.static, self.cache_dir), first)
+            self.assertEqual((hashed.call_count, read.call_count), (0, 0))
+
+            # A renamed image is hashed again but its header is not read
+            os.rename(os.path.join(self.static, "photo.jpg"), os.path.join(self.static, "renamed.jpg"))
+            images = load_image_sizes(self.static, self.cache_dir)
+            self.assertEqual((hashed.call_count, read.call_count), (1, 0))
+            self.assertEqual(images["/renamed.jpg"], (1200, 800))
+            self.assertNotIn("/photo.jpg", images)
+
+            self.write("photo.jpg", jpeg(10, 20))
+            self.assertEqual(load_image_sizes(self.static, self.cache_dir)["/photo.jpg"], (10, 20))
+            self.assertEqual(read.call_count, 1)
+
+    def test_pages_get_image_sizes(self):
+        content = os.path.join(self.root, "content")
+        dest = os.path.join(self.root, "docs")
+        os.makedirs(content)
+        with open(os.path.join(content, "index.md"), "w") as f:
+            f.write("# Home\n\n![map](/images/map.png)")
+        template_path = os.path.join(self.root, "template.html")
+        with open(template_path, "w") as f:
+            f.write("{{ Content }}")
+
+        images = load_image_sizes(self.static, self.cache_dir)
+        build_manifest = BuildManifest.load(dest)
+        generate_pages_recursive(content, template_path, dest, BuildOptions(images=images), build_manifest)
+        with open(os.path.join(dest, "index.html")) as f:
+            self.assertIn(
+                '<img src="/images/map.png" alt="map" width="640" height="480" loading="lazy" decoding="async"></img>',
+                f.read(),
+            )
+
+        # Pages are rebuilt when an image's size changes
+        src_path = os.path.join(content, "index.md")
+        dest_path = os.path.join(dest, "index.html")
+        self.assertTrue(build_manifest.is_fresh(src_path, dest_path, template_path, BuildOptions(images=images)))
+        self.write(os.path.join("images", "map.png"), png(320, 240))
+        changed = load_image_sizes(self.static, self.cache_dir)
+        self.assertFalse(build_manifest.is_fresh(src_path, dest_path, template_path, BuildOptions(images=changed)))
+
+
+if __name__ == "__main__":
+    unittest.main()
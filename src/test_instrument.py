@@ -0,0 +1,149 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from blockhandler import markdown_to_html_node
+from instrument import PAGE_STAGES, BuildStats, PageStats
+from main import generate_page, generate_pages_recursive
+from options import BuildOptions
+from parallel import generate_pages_parallel
+
+
+TEMPLATE = '<html><title>{{ Title }}</title><body>{{ Content }}<a href="/x">x</a></body></html>'
+
+MARKDOWN = """# Title
+
+Some **bold** and a [link](/blog)
+
+- one
+- two
+
+```
+code
+```
+"""
+
+
+class TestPageStats(unittest.TestCase):
+    def test_markdown_to_html_node_counts_blocks_and_nodes(self):
+        stats = PageStats("page.md")
+        node = markdown_to_html_node(MARKDOWN, stats)
+        self.assertEqual(node.to_html(), markdown_to_html_node(MARKDOWN).to_html())
+        self.assertEqual(
+            dict(stats.blocks),
+            {"heading": 1, "paragraph": 1, "unordered_list": 1, "code": 1},
+        )
+        # Title; Some, bold, and a, link; one; two; code
+        self.assertEqual(stats.inline_nodes, 8)
+        self.assertIn("block_split", stats.wall)
+        self.assertIn("inline_parse", stats.wall)
+
+    def test_timed_accumulates(self):
+        stats = PageStats("page.md")
+        stats.add_time("read", 0.5, 0.25)
+        with stats.timed("read"):
+            pass
+        self.assertGreaterEqual(stats.wall["read"], 0.5)
+        self.assertGreaterEqual(stats.cpu["read"], 0.25)
+        self.assertEqual(stats.total_wall, stats.wall["read"])
+
+
+class TestBuildStats(unittest.TestCase):
+    def _page(self, path, seconds):
+        page = PageStats(path)
+        page.add_time("render", seconds, seconds)
+        page.blocks["paragraph"] += 2
+        page.inline_nodes = 3
+        page.bytes_in = 10
+        page.bytes_out = 20
+        return page
+
+    def test_totals(self):
+        stats = BuildStats()
+        stats.add_page(self._page("a.md", 0.1))
+        stats.add_page(self._page("b.md", 0.2))
+        report = stats.to_dict()
+        self.assertEqual(report["pages"], 2)
+        self.assertAlmostEqual(report["stages"]["render"]["wall_seconds"], 0.3)
+        self.assertEqual(report["blocks"], {"paragraph": 4})
+        self.assertEqual(report["inline_nodes"], 6)
+        self.assertEqual(report["bytes_in"], 20)
+        self.assertEqual(report["bytes_out"], 40)
+
+    def test_keeps_only_slowest_pages(self):
+        stats = BuildStats(slowest=2)
+        for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+            stats.add_page(self._page(f"{i}.md", seconds))
+        slowest = stats.to_dict()["slowest_pages"]
+        self.assertEqual([page["path"] for page in slowest], ["2.md", "0.md"])
+
+
+class TestInstrumentedBuild(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.template_path = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        self._write(self.template_path, TEMPLATE)
+        self._write(os.path.join(self.content_dir, "index.md"), MARKDOWN)
+        self._write(os.path.join(self.content_dir, "blog", "index.md"), "# Blog\n\nPosts")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_instrumented_page_is_identical(self):
+        src_path = os.path.join(self.content_dir, "index.md")
+        plain_path = os.path.join(self.root, "plain.html")
+        measured_path = os.path.join(self.root, "measured.html")
+        # A basepath string still works in place of BuildOptions
+        generate_page(src_path, self.template_path, plain_path, "/base/")
+        stats = PageStats(src_path)
+        generate_page(src_path, self.template_path, measured_path, BuildOptions("/base/"), stats=stats)
+
+        self.assertEqual(self._read(measured_path), self._read(plain_path))
+        self.assertEqual(set(stats.wall), set(PAGE_STAGES))
+        self.assertEqual(stats.bytes_in, len(MARKDOWN))
+        self.assertEqual(stats.bytes_out, os.path.getsize(measured_path))
+
+    def test_recursive_build_report(self):
+        stats = BuildStats()
+        generate_pages_recursive(self.content_dir, self.template_path, os.path.join(self.root, "docs"), stats=stats)
+        report_path = os.path.join(self.root, "build.json")
+        stats.write_report(report_path)
+
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertEqual(report["pages"], 2)
+        self.assertEqual(set(report["stages"]), set(PAGE_STAGES))
+        self.assertEqual(report["blocks"]["heading"], 2)
+        self.assertEqual(len(report["slowest_pages"]), 2)
+
+    def test_parallel_build_report(self):
+        dest_dir = os.path.join(self.root, "docs")
+        pages = [
+            (os.path.join(self.content_dir, "index.md"), os.path.join(dest_dir, "index.html")),
+            (os.path.join(self.content_dir, "blog", "index.md"), os.path.join(dest_dir, "blog", "index.html")),
+        ]
+        stats = BuildStats()
+        generate_pages_parallel(pages, self.template_path, jobs=2, stats=stats)
+        report = stats.to_dict()
+        self.assertEqual(report["pages"], 2)
+        self.assertEqual(report["blocks"]["paragraph"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from manifest import BuildManifest, MANIFEST_FILENAME
+from main import generate_pages_recursive
+from options import BuildOptions
+
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.dest_dir = os.path.join(self.root, "docs")
+        self.template_path = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        self._write(self.template_path, TEMPLATE)
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome")
+        self._write(os.path.join(self.content_dir, "blog", "index.md"), "# Blog\n\nPosts")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _build(self, basepath="/", rebuild=False):
+        manifest = BuildManifest.load(self.dest_dir, rebuild=rebuild)
+        generated = []
+        original_record = manifest.record
+
+        def record(source_path, *args):
+            generated.append(os.path.relpath(source_path, self.content_dir))
+            original_record(source_path, *args)
+
+        manifest.record = record
+        generate_pages_recursive(self.content_dir, self.template_path, self.dest_dir, BuildOptions(basepath), manifest)
+        removed = manifest.remove_stale()
+        manifest.save()
+        return sorted(generated), removed
+
+    def test_first_build_generates_everything(self):
+        generated, removed = self._build()
+        self.assertEqual(generated, [os.path.join("blog", "index.md"), "index.md"])
+        self.assertEqual(removed, [])
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, MANIFEST_FILENAME)))
+
+    def test_unchanged_build_skips_everything(self):
+        self._build()
+        generated, _ = self._build()
+        self.assertEqual(generated, [])
+
+    def test_changed_source_is_regenerated(self):
+        self._build()
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome back")
+        generated, _ = self._build()
+        self.assertEqual(generated, ["index.md"])
+        with open(os.path.join(self.dest_dir, "index.html")) as f:
+            self.assertIn("Welcome back", f.read())
+
+    def test_template_change_regenerates_everything(self):
+        self._build()
+        self._write(self.template_path, TEMPLATE.replace("<body>", "<body class=\"x\">"))
+        generated, _ = self._build()
+        self.assertEqual(len(generated), 2)
+
+    def test_basepath_change_regenerates_everything(self):
+        self._build()
+        generated, _ = self._build("/site/")
+        self.assertEqual(len(generated), 2)
+
+    def test_missing_output_is_regenerated(self):
+        self._build()
+        os.remove(os.path.join(self.dest_dir, "index.html"))
+        generated, _ = self._build()
+        self.assertEqual(generated, ["index.md"])
+
+    def test_deleted_source_removes_output(self):
+        self._build()
+        os.remove(os.path.join(self.content_dir, "blog", "index.md"))
+        generated, removed = self._build()
+        self.assertEqual(generated, [])
+        self.assertEqual(removed, [os.path.join(self.dest_dir, "blog", "index.html")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "blog")))
+
+    def test_corrupt_manifest_means_full_build(self):
+        self._build()
+        self._write(os.path.join(self.dest_dir, MANIFEST_FILENAME), "not json")
+        generated, _ = self._build()
+        self.assertEqual(len(generated), 2)
+
+    def test_rebuild_regenerates_everything_but_keeps_unchanged_files(self):
+        self._build()
+        index_path = os.path.join(self.dest_dir, "index.html")
+        os.utime(index_path, ns=(0, 0))
+        os.remove(os.path.join(self.content_dir, "blog", "index.md"))
+        generated, removed = self._build(rebuild=True)
+        self.assertEqual(generated, ["index.md"])
+        self.assertEqual(removed, [os.path.join(self.dest_dir, "blog", "index.html")])
+        # The page came out the same, so it was not rewritten
+        self.assertEqual(os.stat(index_path).st_mtime_ns, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
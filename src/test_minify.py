@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from htmlnode import LeafNode, ParentNode
+from main import generate_pages_recursive
+from manifest import BuildManifest
+from minify import minify_html
+from options import BuildOptions
+from template import Template
+
+
+class TestMinifyHtml(unittest.TestCase):
+    def test_drops_whitespace_between_blocks(self):
+        html = "<!doctype html>\n<html>\n  <head>\n    <title>{{ Title }}</title>\n  </head>\n</html>\n"
+        self.assertEqual(minify_html(html), "<!doctype html><html><head><title>{{ Title }}</title></head></html>")
+
+    def test_collapses_inline_whitespace(self):
+        self.assertEqual(
+            minify_html("<p>\n  Hello,\n   <b>world</b>  and   <i>all</i>\n</p>"),
+            "<p>Hello, <b>world</b> and <i>all</i></p>",
+        )
+
+    def test_preserves_pre_textarea_script_and_style(self):
+        html = (
+            "<div>\n<pre>  line one\n    line two\n</pre>\n"
+            "<textarea>  a\n b</textarea>\n"
+            "<script>\n  if (a  <  b) { go(); }\n</script>\n"
+            "<STYLE>\n  p { margin: 0; }\n</STYLE>\n</div>"
+        )
+        self.assertEqual(
+            minify_html(html),
+            "<div><pre>  line one\n    line two\n</pre><textarea>  a\n b</textarea>"
+            "<script>\n  if (a  <  b) { go(); }\n</script><STYLE>\n  p { margin: 0; }\n</STYLE></div>",
+        )
+
+    def test_removes_comments(self):
+        self.assertEqual(minify_html("<div>\n<!-- note -->\n</div>"), "<div></div>")
+        # Text on both sides of a comment keeps one space
+        self.assertEqual(minify_html("<p>a <!-- note --> b</p>"), "<p>a b</p>")
+        conditional = "<!--[if IE]><p>old</p><![endif]-->"
+        self.assertEqual(minify_html(conditional), conditional)
+
+
+class TestMinifiedTemplate(unittest.TestCase):
+    def test_template_is_minified_once(self):
+        text = '<html>\n  <head>\n    <link href="/index.css" rel="stylesheet" />\n  </head>\n'
+        text += "  <body>\n    <!-- page -->\n    <article>{{ Content }}</article>\n  </body>\n</html>\n"
+        template = Template(text, "/site/", minify=True)
+        self.assertEqual(template.slots, ["Content"])
+        self.assertEqual(
+            template.literals,
+            [
+                '<html><head><link href="/site/index.css" rel="stylesheet" /></head><body><article>',
+                "</article></body></html>",
+            ],
+        )
+        # Page content is inserted as it is
+        self.assertEqual(template.render(Content="<pre>a\n  b</pre>").count("a\n  b"), 1)
+        self.assertEqual(Template(text).literals[0], text[:text.index("{{")])
+
+    def test_html_nodes_add_no_whitespace(self):
+        node = ParentNode(
+            "ul",
+            [ParentNode("li", [LeafNode("b", "one"), LeafNode(None, " two")]), LeafNode("li", "three")],
+            {"class": "list"},
+        )
+        self.assertEqual(node.to_html(), '<ul class="list"><li><b>one</b> two</li><li>three</li></ul>')
+        self.assertEqual(minify_html(node.to_html()), node.to_html())
+
+
+class TestMinifiedBuild(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        os.makedirs(self.content)
+        with open(os.path.join(self.content, "index.md"), "w") as f:
+            f.write("# Home\n\n```\nkeep  this\n   indented\n```\n")
+        self.template_path = os.path.join(self.root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write("<html>\n  <body>\n    <main>{{ Content }}</main>\n  </body>\n</html>\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_build(self):
+        build_manifest = BuildManifest.load(self.dest)
+        generate_pages_recursive(self.content, self.template_path, self.dest, BuildOptions(minify=True), build_manifest)
+        with open(os.path.join(self.dest, "index.html")) as f:
+            html = f.read()
+        self.assertTrue(html.startswith("<html><body><main><div><h1>Home</h1>"))
+        self.assertTrue(html.endswith("</div></main></body></html>"))
+        self.assertIn("keep  this\n   indented", html)
+
+        # Switching minification off rebuilds the page
+        src_path = os.path.join(self.content, "index.md")
+        dest_path = os.path.join(self.dest, "index.html")
+        self.assertTrue(build_manifest.is_fresh(src_path, dest_path, self.template_path, BuildOptions(minify=True)))
+        self.assertFalse(build_manifest.is_fresh(src_path, dest_path, self.template_path, BuildOptions()))
+
+        # Whitespace that minification removes does not make the page stale
+        with open(self.template_path, "a") as f:
+            f.write("\n\n")
+        self.assertTrue(build_manifest.is_fresh(src_path, dest_path, self.template_path, BuildOptions(minify=True)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import pickle
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fingerprint import AssetMap
+from imagesize import ImageSizes
+from options import BuildOptions, as_build_options
+
+
+class TestBuildOptions(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write('<html>\n  <link href="/index.css">\n  {{ Content }}\n</html>\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_template_is_compiled_with_every_option(self):
+        options = BuildOptions("/site/", AssetMap({"/index.css": "/index.0123abcd.css"}), minify=True)
+        self.assertEqual(
+            options.compile_template(self.template_path).text,
+            '<html><link href="/site/index.0123abcd.css">{{ Content }}</html>',
+        )
+
+    def test_resolver(self):
+        options = BuildOptions("/site/", images=ImageSizes({"/a.png": (1, 2)}))
+        resolver = options.resolver()
+        self.assertEqual(resolver.resolve("/blog/"), "/site/blog/")
+        self.assertEqual(resolver.image_attributes("/a.png")["width"], "1")
+
+    def test_template_key(self):
+        self.assertEqual(BuildOptions().template_key, BuildOptions().template_key)
+        self.assertNotEqual(BuildOptions().template_key, BuildOptions(minify=True).template_key)
+        self.assertNotEqual(BuildOptions().template_key, BuildOptions("/site/").template_key)
+
+    def test_pickles_for_worker_processes(self):
+        options = pickle.loads(pickle.dumps(BuildOptions("/site/", minify=True, images=ImageSizes())))
+        self.assertEqual(options.basepath, "/site/")
+        self.assertTrue(options.minify)
+        self.assertIsNone(options.assets)
+        self.assertEqual(len(options.images), 0)
+
+    def test_as_build_options(self):
+        options = BuildOptions("/site/")
+        self.assertIs(as_build_options(options), options)
+        self.assertEqual(as_build_options(None).basepath, "/")
+        self.assertEqual(as_build_options("/repo/").basepath, "/repo/")
+        with self.assertRaises(TypeError):
+            as_build_options(["/repo/"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import output
+from main import generate_pages_recursive
+from output import ChangedFileWriter, WriteResult, same_contents, write_if_changed, write_json_atomic
+
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.path = os.path.join(self.root, "out", "page.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_same_contents(self):
+        self.assertFalse(same_contents(self.path, b"abc"))
+        write_if_changed(self.path, b"abc")
+        self.assertTrue(same_contents(self.path, b"abc"))
+        self.assertFalse(same_contents(self.path, b"abd"))
+        self.assertFalse(same_contents(self.path, b"abcd"))
+
+    def test_compares_in_chunks(self):
+        data = b"x" * (output.COMPARE_CHUNK_SIZE * 2 + 10)
+        write_if_changed(self.path, data)
+        self.assertTrue(same_contents(self.path, data))
+        self.assertFalse(same_contents(self.path, data[:-1] + b"y"))
+
+    def test_unchanged_file_keeps_mtime(self):
+        self.assertTrue(write_if_changed(self.path, b"<p>hi</p>"))
+        os.utime(self.path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertFalse(write_if_changed(self.path, b"<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertTrue(write_if_changed(self.path, b"<p>ho</p>"))
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_build_reports_unchanged_pages(self):
+        content = os.path.join(self.root, "content")
+        dest = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(content, "blog"))
+        template_path = os.path.join(self.root, "template.html")
+        with open(template_path, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for name in ("index.md", os.path.join("blog", "post.md")):
+            with open(os.path.join(content, name), "w") as f:
+                f.write("# Page\n\nText")
+
+        result = generate_pages_recursive(content, template_path, dest)
+        self.assertEqual((len(result.written), result.unchanged), (2, 0))
+
+        with open(os.path.join(content, "index.md"), "w") as f:
+            f.write("# Page\n\nEdited")
+        result = generate_pages_recursive(content, template_path, dest)
+        self.assertEqual(result.written, [os.path.join(dest, "index.html")])
+        self.assertEqual(result.unchanged, 1)
+
+    def test_changed_file_writer(self):
+        def stream(pieces):
+            with ChangedFileWriter(self.path) as out:
+                for piece in pieces:
+                    out.write(piece)
+            return out.written, out.size
+
+        big = "x" * output.COMPARE_CHUNK_SIZE
+        self.assertEqual(stream([big, "é", "tail"]), (True, len(big) + 6))
+        os.utime(self.path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertEqual(stream([big[:10], big[10:], "é", "tail"]), (False, len(big) + 6))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+
+        # A change after the first chunk keeps the bytes that matched
+        self.assertTrue(stream([big, "é", "TAIL"])[0])
+        self.assertTrue(same_contents(self.path, (big + "éTAIL").encode("utf-8")))
+        # A shorter page is a change too
+        self.assertTrue(stream([big])[0])
+        self.assertTrue(same_contents(self.path, big.encode("utf-8")))
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_changed_file_writer_failure_keeps_old_file(self):
+        write_if_changed(self.path, b"old")
+        with self.assertRaises(RuntimeError):
+            with ChangedFileWriter(self.path) as out:
+                out.write("new " * output.COMPARE_CHUNK_SIZE)
+                raise RuntimeError("render failed")
+        self.assertTrue(same_contents(self.path, b"old"))
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_write_result(self):
+        result = WriteResult()
+        result.add("a.html", True)
+        result.add("b.html", False)
+        other = WriteResult()
+        other.add("c.html", False)
+        result.update(other)
+        self.assertEqual(result.written, ["a.html"])
+        self.assertEqual(result.unchanged, 2)
+
+    def test_write_json_atomic(self):
+        path = os.path.join(self.root, "cache", "index.json")
+        write_json_atomic(path, {"b": [1, 2], "a": None})
+        with open(path) as f:
+            self.assertEqual(f.read(), '{\n "a": null,\n "b": [\n  1,\n  2\n ]\n}')
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["index.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
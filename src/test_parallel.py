@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from main import collect_pages, generate_pages_recursive
+from options import BuildOptions
+from parallel import PageGenerationError, chunk_pages, generate_pages_parallel
+
+
+TEMPLATE = '<html><title>{{ Title }}</title><link href="/index.css"><body>{{ Content }}</body></html>'
+
+
+class TestChunkPages(unittest.TestCase):
+    def test_empty(self):
+        self.assertEqual(chunk_pages([], 4), [])
+
+    def test_chunks_cover_all_pages_in_order(self):
+        pages = list(range(100))
+        chunks = chunk_pages(pages, 4)
+        self.assertEqual([page for chunk in chunks for page in chunk], pages)
+        self.assertGreaterEqual(len(chunks), 4)
+
+    def test_chunk_size_is_capped(self):
+        chunks = chunk_pages(list(range(10000)), 2)
+        self.assertTrue(all(len(chunk) <= 64 for chunk in chunks))
+
+
+class GeneratedSiteTestCase(unittest.TestCase):
+    """A content/ tree of page_count blog posts and a template, shared by the page generation tests."""
+
+    page_count = 12
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.dest_dir = os.path.join(self.root, "docs")
+        self.template_path = os.path.join(self.root, "template.html")
+        with open(self.template_path, "w") as f:
+            f.write(TEMPLATE)
+        for i in range(self.page_count):
+            page_dir = os.path.join(self.content_dir, "blog", f"post{i}")
+            os.makedirs(page_dir)
+            with open(os.path.join(page_dir, "index.md"), "w") as f:
+                f.write(f"# Post {i}\n\nSee [home](/) and **item {i}**.\n\n- a\n- b")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _read_tree(self, dir_path):
+        files = {}
+        for dirpath, _, filenames in os.walk(dir_path):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    files[os.path.relpath(path, dir_path)] = f.read()
+        return files
+
+
+class TestGeneratePagesParallel(GeneratedSiteTestCase):
+    def test_collect_pages(self):
+        dest_dir = os.path.join(self.root, "docs")
+        pages = collect_pages(self.content_dir, dest_dir)
+        self.assertEqual(len(pages), 12)
+        self.assertIn(
+            (
+                os.path.join(self.content_dir, "blog", "post3", "index.md"),
+                os.path.join(dest_dir, "blog", "post3", "index.html"),
+            ),
+            pages,
+        )
+
+    def test_output_matches_serial_build(self):
+        serial_dir = os.path.join(self.root, "serial")
+        parallel_dir = os.path.join(self.root, "parallel")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, BuildOptions("/base/"))
+        pages = collect_pages(self.content_dir, parallel_dir)
+        generate_pages_parallel(pages, self.template_path, BuildOptions("/base/"), jobs=3)
+        self.assertEqual(self._read_tree(serial_dir), self._read_tree(parallel_dir))
+
+    def test_errors_are_reported_per_page(self):
+        broken_path = os.path.join(self.content_dir, "blog", "post5", "index.md")
+        with open(broken_path, "w") as f:
+            f.write("No title here")
+        dest_dir = os.path.join(self.root, "docs")
+        pages = collect_pages(self.content_dir, dest_dir)
+        with self.assertRaises(PageGenerationError) as context:
+            generate_pages_parallel(pages, self.template_path, jobs=2)
+        failures = context.exception.failures
+        self.assertEqual([src_path for src_path, _ in failures], [broken_path])
+        self.assertIn("No h1 header found", failures[0][1])
+        # The other pages are still generated
+        self.assertTrue(os.path.exists(os.path.join(dest_dir, "blog", "post4", "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
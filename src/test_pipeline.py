@@ -0,0 +1,98 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import pipeline
+from blockcache import BlockCache, PageCache
+from instrument import BuildStats
+from main import collect_pages, generate_pages_recursive
+from manifest import BuildManifest
+from options import BuildOptions
+from parallel import PageGenerationError
+from pipeline import generate_pages_async
+from test_parallel import GeneratedSiteTestCase
+
+
+class TestGeneratePagesAsync(GeneratedSiteTestCase):
+    page_count = 20
+
+    def test_output_matches_serial_build(self):
+        serial_dir = os.path.join(self.root, "serial")
+        generate_pages_recursive(self.content_dir, self.template_path, serial_dir, BuildOptions("/base/"))
+        for in_flight in (1, 3, 64):
+            with self.subTest(in_flight=in_flight):
+                dest_dir = os.path.join(self.root, f"pipeline{in_flight}")
+                pages = collect_pages(self.content_dir, dest_dir)
+                generate_pages_async(pages, self.template_path, BuildOptions("/base/"), in_flight)
+                self.assertEqual(self._read_tree(serial_dir), self._read_tree(dest_dir))
+
+    def test_in_flight_pages_are_capped(self):
+        started = []
+        written = []
+        read_source = pipeline._read_source
+        write_batch = pipeline._write_batch
+
+        def counting_read(src_path, page_stats=None):
+            started.append(len(started) + 1 - len(written))
+            return read_source(src_path, page_stats)
+
+        def counting_write(batch):
+            results = write_batch(batch)
+            written.extend(batch)
+            return results
+
+        pages = collect_pages(self.content_dir, self.dest_dir)
+        with (
+            mock.patch.object(pipeline, "_read_source", counting_read),
+            mock.patch.object(pipeline, "_write_batch", counting_write),
+        ):
+            generate_pages_async(pages, self.template_path, in_flight=4)
+        self.assertEqual(len(written), 20)
+        self.assertLessEqual(max(started), 4)
+
+    def test_errors_are_reported_per_page(self):
+        broken_path = os.path.join(self.content_dir, "blog", "post5", "index.md")
+        with open(broken_path, "w") as f:
+            f.write("No title here")
+        pages = collect_pages(self.content_dir, self.dest_dir)
+        with self.assertRaises(PageGenerationError) as context:
+            generate_pages_async(pages, self.template_path, in_flight=2)
+        failures = context.exception.failures
+        self.assertEqual([src_path for src_path, _ in failures], [broken_path])
+        self.assertIn("No h1 header found", failures[0][1])
+        # The other pages are still generated
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "blog", "post4", "index.html")))
+
+    def test_invalid_in_flight(self):
+        with self.assertRaises(ValueError):
+            generate_pages_async([], self.template_path, in_flight=0)
+
+    def test_incremental_with_caches_and_stats(self):
+        cache_dir = os.path.join(self.root, ".cache")
+        pages = collect_pages(self.content_dir, self.dest_dir)
+        for build in range(2):
+            manifest = BuildManifest.load(self.dest_dir)
+            stats = BuildStats()
+            cache = BlockCache.open(cache_dir)
+            page_cache = PageCache.open(cache_dir)
+            if build == 1:
+                # Only the edited page is generated again, from cached blocks
+                with open(pages[0][0], "a") as f:
+                    f.write("\n\nOne more paragraph.")
+            generate_pages_async(pages, self.template_path, BuildOptions(), 8, manifest, stats, cache, page_cache)
+            manifest.save()
+            cache.close()
+            page_cache.close()
+            self.assertEqual(stats.pages, 20 if build == 0 else 1)
+        self.assertEqual(stats.cached_pages, 0)
+        self.assertGreater(stats.cached_blocks, 0)
+        with open(pages[0][1]) as f:
+            self.assertIn("One more paragraph.", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sync import copy_file, sync_static
+
+
+class TestCopyFile(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_copies_content_and_mtime(self):
+        src_path = os.path.join(self.root, "src.bin")
+        dest_path = os.path.join(self.root, "dest.bin")
+        data = os.urandom(300_000)
+        with open(src_path, "wb") as f:
+            f.write(data)
+        os.utime(src_path, ns=(1_000_000_000, 2_000_000_000))
+        copy_file(src_path, dest_path)
+        with open(dest_path, "rb") as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.stat(dest_path).st_mtime_ns, 2_000_000_000)
+        self.assertFalse(os.path.exists(dest_path + ".tmp"))
+
+    def test_copies_empty_file(self):
+        src_path = os.path.join(self.root, "empty")
+        dest_path = os.path.join(self.root, "copy")
+        open(src_path, "w").close()
+        copy_file(src_path, dest_path)
+        self.assertEqual(os.path.getsize(dest_path), 0)
+
+
+class TestSyncStatic(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.src_dir = os.path.join(self.root, "static")
+        self.dest_dir = os.path.join(self.root, "docs")
+        os.makedirs(os.path.join(self.src_dir, "images"))
+        self._write(os.path.join(self.src_dir, "index.css"), "body {}")
+        self._write(os.path.join(self.src_dir, "images", "a.png"), "png-a")
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_first_sync_copies_everything(self):
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(len(result.copied), 2)
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "images", "a.png")), "png-a")
+
+    def test_second_sync_copies_nothing(self):
+        sync_static(self.src_dir, self.dest_dir)
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual((result.copied, result.unchanged, result.deleted), ([], 2, []))
+
+    def test_changed_file_is_copied(self):
+        sync_static(self.src_dir, self.dest_dir)
+        self._write(os.path.join(self.src_dir, "index.css"), "body { margin: 0 }")
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(result.copied, [os.path.join(self.dest_dir, "index.css")])
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "index.css")), "body { margin: 0 }")
+
+    def test_same_size_different_mtime_is_copied(self):
+        sync_static(self.src_dir, self.dest_dir)
+        css_path = os.path.join(self.src_dir, "index.css")
+        self._write(css_path, "html {}")
+        os.utime(css_path, ns=(1, 1))
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(len(result.copied), 1)
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "index.css")), "html {}")
+
+    def test_hash_mode_skips_touched_but_identical_file(self):
+        sync_static(self.src_dir, self.dest_dir)
+        os.utime(os.path.join(self.src_dir, "index.css"), ns=(1, 1))
+        result = sync_static(self.src_dir, self.dest_dir, use_hash=True)
+        self.assertEqual((result.copied, result.unchanged), ([], 2))
+        self.assertEqual(os.stat(os.path.join(self.dest_dir, "index.css")).st_mtime_ns, 1)
+
+    def test_deleted_source_is_removed(self):
+        sync_static(self.src_dir, self.dest_dir)
+        os.remove(os.path.join(self.src_dir, "images", "a.png"))
+        result = sync_static(self.src_dir, self.dest_dir)
+        self.assertEqual(result.deleted, [os.path.join(self.dest_dir, "images", "a.png")])
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "images")))
+
+    def test_generated_files_are_kept(self):
+        page_path = os.path.join(self.dest_dir, "blog", "index.html")
+        os.makedirs(os.path.dirname(page_path))
+        self._write(page_path, "<html></html>")
+        sync_static(self.src_dir, self.dest_dir)
+        os.remove(os.path.join(self.src_dir, "index.css"))
+        sync_static(self.src_dir, self.dest_dir)
+        self.assertTrue(os.path.exists(page_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
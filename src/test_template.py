@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from htmlnode import LeafNode, ParentNode
+from template import Template, rewrite_basepath
+
+
+class TestRewriteBasepath(unittest.TestCase):
+    def test_rewrites_href_and_src(self):
+        html = '<a href="/blog">x</a><img src="/images/a.png">'
+        self.assertEqual(
+            rewrite_basepath(html, "/site/"),
+            '<a href="/site/blog">x</a><img src="/site/images/a.png">',
+        )
+
+    def test_default_basepath_is_noop(self):
+        html = '<a href="/blog">x</a>'
+        self.assertEqual(rewrite_basepath(html), html)
+
+    def test_leaves_absolute_urls(self):
+        html = '<a href="https://example.com/">x</a>'
+        self.assertEqual(rewrite_basepath(html, "/site/"), html)
+
+
+class TestTemplate(unittest.TestCase):
+    def test_splits_literals_and_slots(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(template.literals, ["<title>", "</title><main>", "</main>"])
+
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render(Title="Hello", Content="<p>Hi</p>"),
+            "<title>Hello</title><main><p>Hi</p></main>",
+        )
+
+    def test_basepath_applied_to_literals_only(self):
+        template = Template('<link href="/index.css">{{ Content }}', "/site/")
+        self.assertEqual(template.literals[0], '<link href="/site/index.css">')
+        self.assertEqual(
+            template.render(Content='<a href="/raw">x</a>'),
+            '<link href="/site/index.css"><a href="/raw">x</a>',
+        )
+
+    def test_text_is_the_compiled_template(self):
+        template = Template('<a href="/">{{ Title }}</a>\n<main>{{ Content }}</main>', "/site/")
+        self.assertEqual(template.text, '<a href="/site/">{{ Title }}</a>\n<main>{{ Content }}</main>')
+
+    def test_missing_value_keeps_placeholder(self):
+        template = Template("{{ Title }}|{{ Unknown }}")
+        self.assertEqual(template.render(Title="T"), "T|{{ Unknown }}")
+
+    def test_repeated_slot(self):
+        template = Template("{{ Title }} - {{ Title }}")
+        self.assertEqual(template.render(Title="T"), "T - T")
+
+    def test_no_placeholders(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render(Title="T"), "<p>static</p>")
+
+    def test_render_to_streams_nodes(self):
+        template = Template('<link href="/a.css">{{ Title }}|{{ Content }}', "/site/")
+        content = ParentNode("p", [LeafNode("a", "x", {"href": "/site/blog"})])
+        parts = []
+        template.render_to(parts.append, Title="T", Content=content)
+        self.assertEqual(
+            "".join(parts),
+            '<link href="/site/a.css">T|<p><a href="/site/blog">x</a></p>',
+        )
+
+    def test_content_is_not_rewritten(self):
+        # URLs in content are resolved while parsing, so text that only
+        # looks like an attribute must come through untouched
+        template = Template("{{ Content }}", "/site/")
+        content = ParentNode("pre", [LeafNode("code", '<a href="/x">')])
+        self.assertEqual(template.render(Content=content), '<pre><code><a href="/x"></code></pre>')
+
+    def test_from_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False) as f:
+            f.write('<img src="/logo.png">{{ Title }}')
+        try:
+            template = Template.from_file(f.name, "/base/")
+            self.assertEqual(template.render(Title="T"), '<img src="/base/logo.png">T')
+        finally:
+            os.remove(f.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -39,6 +39,11 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.LINK, "https://example.com")
         self.assertNotEqual(node, node2)
 
+    def test_slots(self):
+        node = TextNode("text", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(repr(node), "TextNode('text', <TextType.TEXT: 'text'>, None)")
+
 
 class TestTextNodeToHTMLNode(unittest.TestCase):
     def test_text(self):
@@ -230,6 +235,12 @@ class TestExtractMarkdown(unittest.TestCase):
         self.assertListEqual([("image", "https://example.com/img.png")], images)
         self.assertListEqual([("link", "https://example.com")], links)
 
+    def test_extract_images_inside_links(self):
+        self.assertListEqual([("a", "/a.png")], extract_markdown_images("see [ref ![a](/a.png) here"))
+        text = "[![logo](/logo.png)](/about)"
+        self.assertListEqual([("logo", "/logo.png")], extract_markdown_images(text))
+        self.assertListEqual([("![logo](/logo.png)", "/about")], extract_markdown_links(text))
+
 
 class TestSplitNodesImage(unittest.TestCase):
     def test_split_images(self):
@@ -292,6 +303,16 @@ class TestSplitNodesImage(unittest.TestCase):
         new_nodes = split_nodes_image([node])
         self.assertListEqual([node], new_nodes)
 
+    def test_split_images_inside_link(self):
+        node = TextNode("[![logo](/logo.png)](/about)", TextType.TEXT)
+        new_nodes = split_nodes_image([node])
+        expected = [
+            TextNode("[", TextType.TEXT),
+            TextNode("logo", TextType.IMAGE, "/logo.png"),
+            TextNode("](/about)", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, new_nodes)
+
     def test_split_images_non_text_node(self):
         node = TextNode("bold text", TextType.BOLD)
         new_nodes = split_nodes_image([node])
@@ -408,6 +429,29 @@ class TestSplitNodesLink(unittest.TestCase):
         ]
         self.assertListEqual(expected, new_nodes)
 
+    def test_split_links_repeated_link(self):
+        node = TextNode("[a](/x), [a](/x) and [a](/x)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        expected = [
+            TextNode("a", TextType.LINK, "/x"),
+            TextNode(", ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "/x"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("a", TextType.LINK, "/x"),
+        ]
+        self.assertListEqual(expected, new_nodes)
+
+    def test_split_images_adjacent_to_link(self):
+        node = TextNode("[link](/l)![img](/i.png)", TextType.TEXT)
+        self.assertListEqual(
+            [TextNode("[link](/l)", TextType.TEXT), TextNode("img", TextType.IMAGE, "/i.png")],
+            split_nodes_image([node]),
+        )
+        self.assertListEqual(
+            [TextNode("link", TextType.LINK, "/l"), TextNode("![img](/i.png)", TextType.TEXT)],
+            split_nodes_link([node]),
+        )
+
 
 class TestTextToTextNodes(unittest.TestCase):
     def test_text_to_textnodes_full(self):
@@ -488,6 +532,131 @@ class TestTextToTextNodes(unittest.TestCase):
         ]
         self.assertListEqual(expected, nodes)
 
+    def test_text_to_textnodes_link_with_underscores(self):
+        text = "See [my_page](https://example.com/my_page) and _this_"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("See ", TextType.TEXT),
+            TextNode("my_page", TextType.LINK, "https://example.com/my_page"),
+            TextNode(" and ", TextType.TEXT),
+            TextNode("this", TextType.ITALIC),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_bold_inside_link(self):
+        text = "A [**bold** link](https://example.com) here"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("A ", TextType.TEXT),
+            TextNode("**bold** link", TextType.LINK, "https://example.com"),
+            TextNode(" here", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_bold_inside_italic(self):
+        text = "*italic with **bold** inside*"
+        nodes = text_to_textnodes(text)
+        self.assertListEqual([TextNode("italic with **bold** inside", TextType.ITALIC)], nodes)
+
+    def test_text_to_textnodes_lone_asterisk_inside_bold(self):
+        text = "**2*3 is six**"
+        nodes = text_to_textnodes(text)
+        self.assertListEqual([TextNode("2*3 is six", TextType.BOLD)], nodes)
+
+    def test_text_to_textnodes_delimiters_inside_code(self):
+        text = "Run `a * b_c` now"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("Run ", TextType.TEXT),
+            TextNode("a * b_c", TextType.CODE),
+            TextNode(" now", TextType.TEXT),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_unmatched_delimiter_raises(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("This is **not closed")
+
+    def test_text_to_textnodes_bracket_without_link(self):
+        text = "An [aside] and a ! mark"
+        self.assertListEqual([TextNode(text, TextType.TEXT)], text_to_textnodes(text))
+
+    def test_text_to_textnodes_linked_image(self):
+        text = "By [![logo](/images/tom.png)](/blog/tom)"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("By ", TextType.TEXT),
+            TextNode("![logo](/images/tom.png)", TextType.LINK, "/blog/tom"),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_stray_bracket_before_image(self):
+        text = "a[_(_ ![i](/p.png)"
+        nodes = text_to_textnodes(text)
+        expected = [
+            TextNode("a[", TextType.TEXT),
+            TextNode("(", TextType.ITALIC),
+            TextNode(" ", TextType.TEXT),
+            TextNode("i", TextType.IMAGE, "/p.png"),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_stray_bracket_before_linked_image(self):
+        nodes = text_to_textnodes("[![i](p)[x](u)")
+        expected = [
+            TextNode("[", TextType.TEXT),
+            TextNode("i", TextType.IMAGE, "p"),
+            TextNode("x", TextType.LINK, "u"),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_unclosed_brackets(self):
+        # Every "[" is tried as a link; none of them may scan past the next one
+        nodes = text_to_textnodes("[*a*" * 3 + "[b](/u)")
+        expected = [
+            TextNode("[", TextType.TEXT),
+            TextNode("a", TextType.ITALIC),
+            TextNode("[", TextType.TEXT),
+            TextNode("a", TextType.ITALIC),
+            TextNode("[", TextType.TEXT),
+            TextNode("a", TextType.ITALIC),
+            TextNode("b", TextType.LINK, "/u"),
+        ]
+        self.assertListEqual(expected, nodes)
+
+    def test_text_to_textnodes_closer_inside_code_span(self):
+        # The old split on "*" accepted this, so it must not raise
+        nodes = text_to_textnodes("*)`*!a``")
+        self.assertEqual(nodes[0], TextNode(")`", TextType.ITALIC))
+
+
+class TestNestedInlineHTML(unittest.TestCase):
+    def test_bold_inside_link(self):
+        node = TextNode("**bold** link", TextType.LINK, "https://example.com")
+        html = text_node_to_html_node(node).to_html()
+        self.assertEqual(html, '<a href="https://example.com"><b>bold</b> link</a>')
+
+    def test_code_inside_bold(self):
+        node = TextNode("bold and `code` inside", TextType.BOLD)
+        html = text_node_to_html_node(node).to_html()
+        self.assertEqual(html, "<b>bold and <code>code</code> inside</b>")
+
+    def test_image_inside_link(self):
+        node = TextNode("![logo](/images/tom.png)", TextType.LINK, "/blog/tom")
+        html = text_node_to_html_node(node).to_html()
+        self.assertEqual(html, '<a href="/blog/tom"><img src="/images/tom.png" alt="logo"></img></a>')
+
+    def test_invalid_nested_markup_is_kept_verbatim(self):
+        node = TextNode("2*3 is six", TextType.BOLD)
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(html_node.value, "2*3 is six")
+        self.assertEqual(html_node.to_html(), "<b>2*3 is six</b>")
+
+    def test_image_alt_is_not_parsed(self):
+        node = TextNode("alt *text*", TextType.IMAGE, "/a.png")
+        html_node = text_node_to_html_node(node)
+        self.assertEqual(html_node.props, {"src": "/a.png", "alt": "alt *text*"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from blockhandler import markdown_to_html_node
+from textnode import TextNode, TextType, text_node_to_html_node
+from urls import UrlResolver
+
+
+class TestUrlResolver(unittest.TestCase):
+    def test_root_relative_urls_get_basepath(self):
+        resolver = UrlResolver("/site/")
+        self.assertEqual(resolver.resolve("/blog/"), "/site/blog/")
+        self.assertEqual(resolver.resolve("/"), "/site/")
+
+    def test_other_urls_are_unchanged(self):
+        resolver = UrlResolver("/site/")
+        self.assertEqual(resolver.resolve("https://example.com/"), "https://example.com/")
+        self.assertEqual(resolver.resolve("//cdn.example.com/x.js"), "//cdn.example.com/x.js")
+        self.assertEqual(resolver.resolve("images/a.png"), "images/a.png")
+        self.assertEqual(resolver.resolve("#top"), "#top")
+
+    def test_default_basepath(self):
+        self.assertEqual(UrlResolver().resolve("/blog/"), "/blog/")
+
+    def test_text_node_to_html_node(self):
+        resolver = UrlResolver("/site/")
+        link = text_node_to_html_node(TextNode("home", TextType.LINK, "/"), resolver)
+        image = text_node_to_html_node(TextNode("logo", TextType.IMAGE, "/logo.png"), resolver)
+        self.assertEqual(link.to_html(), '<a href="/site/">home</a>')
+        self.assertEqual(image.to_html(), '<img src="/site/logo.png" alt="logo"></img>')
+
+    def test_nested_link_inside_bold(self):
+        node = TextNode("see [home](/)", TextType.BOLD)
+        html = text_node_to_html_node(node, UrlResolver("/site/")).to_html()
+        self.assertEqual(html, '<b>see <a href="/site/">home</a></b>')
+
+    def test_code_is_not_rewritten(self):
+        markdown = '[home](/)\n\n```\n<a href="/x">\n```\n\nuse `src="/y"` here'
+        html = markdown_to_html_node(markdown, resolver=UrlResolver("/site/")).to_html()
+        self.assertIn('<a href="/site/">home</a>', html)
+        self.assertIn('<code><a href="/x">\n</code>', html)
+        self.assertIn('<code>src="/y"</code>', html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from watch import LIVE_RELOAD_SNIPPET, WATCH_DIRNAME, DirectoryScanner, ReloadBroadcaster, SiteWatcher, inject_live_reload
+
+
+TEMPLATE = "<html><title>{{ Title }}</title><body>{{ Content }}</body></html>"
+
+
+class TestSiteWatcher(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.root, "content")
+        self.static_dir = os.path.join(self.root, "static")
+        self.dest_dir = os.path.join(self.root, "docs")
+        self.template_path = os.path.join(self.root, "template.html")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        os.makedirs(self.static_dir)
+        self._write(self.template_path, TEMPLATE)
+        self._write(os.path.join(self.static_dir, "index.css"), "body {}")
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome")
+        self._write(os.path.join(self.content_dir, "blog", "index.md"), "# Blog\n\nPosts")
+
+        self.watcher = SiteWatcher(self.content_dir, self.static_dir, self.template_path, self.dest_dir)
+        self.watcher.build()
+        self.parsed = []
+        original_parse = self.watcher._parse
+
+        def parse(src_path):
+            self.parsed.append(os.path.relpath(src_path, self.content_dir))
+            original_parse(src_path)
+
+        self.watcher._parse = parse
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+        # Make sure the change is visible even with coarse mtimes
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def _read(self, *parts):
+        with open(os.path.join(self.dest_dir, *parts)) as f:
+            return f.read()
+
+    def test_build(self):
+        self.assertIn("<p>Welcome</p>", self._read("index.html"))
+        self.assertIn("<title>Blog</title>", self._read("blog", "index.html"))
+        self.assertEqual(self._read("index.css"), "body {}")
+
+    def test_poll_without_changes(self):
+        self.assertEqual(self.watcher.poll(), [])
+        self.assertEqual(self.parsed, [])
+
+    def test_changed_page_rebuilds_only_that_page(self):
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home\n\nChanged")
+        changed = self.watcher.poll()
+        self.assertEqual(changed, [os.path.join(self.dest_dir, "index.html")])
+        self.assertEqual(self.parsed, ["index.md"])
+        self.assertIn("<p>Changed</p>", self._read("index.html"))
+
+    def test_template_change_rerenders_without_parsing(self):
+        self._write(self.template_path, TEMPLATE.replace("<body>", "<body><nav>new</nav>"))
+        changed = self.watcher.poll()
+        self.assertEqual(len(changed), 2)
+        self.assertEqual(self.parsed, [])
+        self.assertIn("<nav>new</nav>", self._read("blog", "index.html"))
+
+    def test_new_and_deleted_pages(self):
+        os.remove(os.path.join(self.content_dir, "blog", "index.md"))
+        self._write(os.path.join(self.content_dir, "about.md"), "# About\n\nMe")
+        changed = self.watcher.poll()
+        self.assertEqual(
+            sorted(changed),
+            sorted([os.path.join(self.dest_dir, "about.html"), os.path.join(self.dest_dir, "blog", "index.html")]),
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "blog", "index.html")))
+        self.assertIn("<p>Me</p>", self._read("about.html"))
+
+    def test_broken_page_does_not_stop_watching(self):
+        self._write(os.path.join(self.content_dir, "index.md"), "no title")
+        self.assertEqual(self.watcher.poll(), [])
+        self._write(os.path.join(self.content_dir, "index.md"), "# Fixed\n\nok")
+        self.assertEqual(self.watcher.poll(), [os.path.join(self.dest_dir, "index.html")])
+
+    def test_missing_page_template_does_not_stop_watching(self):
+        page_template = os.path.join(self.root, "post.html")
+        self._write(page_template, "<article>{{ Content }}</article>")
+        self._write(os.path.join(self.content_dir, "post.md"), "---\ntemplate: post.html\n---\n# Post")
+        self.watcher.poll()
+        os.remove(page_template)
+        self._write(self.template_path, TEMPLATE.replace("<body>", "<body><nav>new</nav>"))
+        changed = self.watcher.poll()
+        self.assertEqual(len(changed), 2)
+        self.assertNotIn(os.path.join(self.dest_dir, "post.html"), changed)
+
+    def test_unchanged_directories_are_not_listed_again(self):
+        scanner = DirectoryScanner(self.content_dir, ".md")
+        with mock.patch("watch.DIRECTORY_SETTLE_NS", -1):
+            state = scanner.scan()
+            with mock.patch("os.scandir", side_effect=os.scandir) as listed:
+                self.assertEqual(scanner.scan(), state)
+                self.assertEqual(listed.call_count, 0)
+                self._write(os.path.join(self.content_dir, "blog", "post.md"), "# Post")
+                self.assertIn(os.path.join(self.content_dir, "blog", "post.md"), scanner.scan())
+                self.assertEqual(listed.call_count, 1)
+
+    def test_static_change_is_synced(self):
+        self._write(os.path.join(self.static_dir, "index.css"), "body { color: red }")
+        changed = self.watcher.poll()
+        self.assertEqual(changed, [os.path.join(self.dest_dir, "index.css")])
+        self.assertEqual(self._read("index.css"), "body { color: red }")
+
+
+class TestWatchDirectory(unittest.TestCase):
+    def test_main_does_not_watch_into_docs(self):
+        import main
+
+        with mock.patch.object(main, "watch_site") as watch_site:
+            main.main(["--watch"])
+        dest_dir = watch_site.call_args.args[3]
+        self.assertEqual(os.path.basename(dest_dir), WATCH_DIRNAME)
+        self.assertEqual(os.path.basename(os.path.dirname(dest_dir)), ".cache")
+
+
+class TestLiveReload(unittest.TestCase):
+    def test_inject_before_body_end(self):
+        html = "<html><body><p>x</p></body></html>"
+        self.assertEqual(
+            inject_live_reload(html),
+            "<html><body><p>x</p>" + LIVE_RELOAD_SNIPPET + "</body></html>",
+        )
+
+    def test_inject_without_body(self):
+        self.assertEqual(inject_live_reload("<p>x</p>"), "<p>x</p>" + LIVE_RELOAD_SNIPPET)
+
+    def test_broadcaster_notifies_subscribers(self):
+        broadcaster = ReloadBroadcaster()
+        first = broadcaster.subscribe()
+        second = broadcaster.subscribe()
+        broadcaster.unsubscribe(second)
+        broadcaster.notify()
+        self.assertEqual(first.get_nowait(), "reload")
+        self.assertTrue(second.empty())
+
+
+if __name__ == "__main__":
+    unittest.main()
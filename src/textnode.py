@@ -3,6 +3,25 @@ from typing import Optional
 import re
 
 
+# Characters that can start inline markup
+INLINE_MARKUP_PATTERN = re.compile(r"[*_`!\[]")
+
+# An image: ![alt](url). The alt text and the URL stop at the next "[",
+# where the next link or image may start, so every attempt to match
+# scans only up to there and a paragraph of unclosed brackets stays linear
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\[\)]*)\)")
+
+# A link: [text](url), not part of an image. The text may hold one whole
+# image, so linked images work, but no other "[", so a stray "[" before
+# a link or an image stays literal text
+LINK_PATTERN = re.compile(
+    r"(?<!!)\[((?:[^\[\]!]|!(?!\[))*(?:!\[[^\[\]]*\]\([^\[\)]*\)(?:[^\[\]!]|!(?!\[))*)?)\]\(([^\[\)]*)\)"
+)
+
+# An image (groups 1 and 2) or a link (groups 3 and 4), whichever starts first
+LINK_OR_IMAGE_PATTERN = re.compile(f"{IMAGE_PATTERN.pattern}|{LINK_PATTERN.pattern}")
+
+
 class TextType(Enum):
     TEXT = "text"
     BOLD = "bold"
@@ -13,6 +32,8 @@ class TextType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: Optional[str] = None):
         self.text = text
         self.text_type = text_type
@@ -25,21 +46,58 @@ class TextNode:
         return f"TextNode({self.text!r}, {self.text_type!r}, {self.url!r})"
 
 
-def text_node_to_html_node(text_node):
+def _nested_children(text, resolver=None):
+    """
+    Parse inline markup nested inside bold, italic or link text.
+    Returns a list of HTMLNode children, or None when the text is plain
+    (or not valid markup), in which case it is rendered verbatim.
+    """
+    if INLINE_MARKUP_PATTERN.search(text) is None:
+        return None
+    try:
+        nodes = text_to_textnodes(text)
+    except ValueError:
+        return None
+    if len(nodes) == 1 and nodes[0].text_type == TextType.TEXT:
+        return None
+    return [text_node_to_html_node(node, resolver) for node in nodes]
+
+
+def _leaf_or_parent(tag, text, props=None, resolver=None):
+    from htmlnode import LeafNode, ParentNode
+    
+    children = _nested_children(text, resolver)
+    if children is None:
+        return LeafNode(tag, text, props)
+    return ParentNode(tag, children, props)
+
+
+def text_node_to_html_node(text_node, resolver=None):
+    """
+    Convert a TextNode to an HTMLNode.
+    Link and image URLs are passed through the resolver, a urls.UrlResolver,
+    when one is given, and written as they are otherwise. The resolver may
+    also add dimensions and loading hints to images.
+    """
     from htmlnode import LeafNode
     
     if text_node.text_type == TextType.TEXT:
         return LeafNode(None, text_node.text)
     elif text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
+        return _leaf_or_parent("b", text_node.text, None, resolver)
     elif text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
+        return _leaf_or_parent("i", text_node.text, None, resolver)
     elif text_node.text_type == TextType.CODE:
         return LeafNode("code", text_node.text)
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+        return _leaf_or_parent("a", text_node.text, {"href": url}, resolver)
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        if resolver is None:
+            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        props = {"src": resolver.resolve(text_node.url), "alt": text_node.text}
+        props.update(resolver.image_attributes(text_node.url))
+        return LeafNode("img", "", props)
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
 
@@ -75,9 +133,7 @@ def extract_markdown_images(text):
     Returns a list of tuples: (alt_text, url)
     Pattern: ![alt text](url)
     """
-    pattern = r"!\[([^\]]*)\]\(([^\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
@@ -86,15 +142,14 @@ def extract_markdown_links(text):
     Returns a list of tuples: (anchor_text, url)
     Pattern: [anchor text](url) but not ![alt text](url)
     """
-    pattern = r"(?<!!)\[([^\]]*)\]\(([^\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
 
-def split_nodes_image(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
     """
-    Split nodes based on image markdown syntax.
-    Converts TEXT nodes containing ![alt](url) into separate TEXT and IMAGE nodes.
+    Split TEXT nodes on the image or link markdown matched by pattern,
+    in one scan per node. Uses the match offsets to slice the text,
+    instead of searching for each match again.
     """
     new_nodes = []
     
@@ -103,101 +158,164 @@ def split_nodes_image(old_nodes):
             new_nodes.append(old_node)
             continue
         
-        images = extract_markdown_images(old_node.text)
-        
-        if not images:
-            new_nodes.append(old_node)
-            continue
-        
-        remaining_text = old_node.text
-        for alt_text, url in images:
-            # Construct the markdown syntax
-            markdown = f"![{alt_text}]({url})"
-            
-            # Split by this markdown (should only split once)
-            parts = remaining_text.split(markdown, 1)
-            
-            if len(parts) != 2:
-                raise ValueError(f"Image markdown not found: {markdown}")
+        text = old_node.text
+        position = 0
+        for match in pattern.finditer(text):
+            # Add text before the match (if not empty)
+            if match.start() > position:
+                new_nodes.append(TextNode(text[position:match.start()], TextType.TEXT))
             
-            # Add text before the image (if not empty)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            
-            # Add the image node
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-            
-            # Continue with remaining text
-            remaining_text = parts[1]
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
         
-        # Add any remaining text after the last image
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
+        if position == 0:
+            new_nodes.append(old_node)
+        elif position < len(text):
+            # Add any remaining text after the last match
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
     
     return new_nodes
 
 
+def split_nodes_image(old_nodes):
+    """
+    Split nodes based on image markdown syntax.
+    Converts TEXT nodes containing ![alt](url) into separate TEXT and IMAGE nodes.
+    """
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
+
 def split_nodes_link(old_nodes):
     """
     Split nodes based on link markdown syntax.
     Converts TEXT nodes containing [text](url) into separate TEXT and LINK nodes.
     """
-    new_nodes = []
-    
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
+
+
+def _delimiter_at(text, i):
+    """Return the delimiter starting at text[i]."""
+    if text.startswith("**", i):
+        return "**"
+    return text[i]
+
+
+def _link_or_image_at(text, i):
+    """Return the match of the image starting at text[i] == "!", or the link at "[", or None."""
+    if text[i] == "!":
+        return IMAGE_PATTERN.match(text, i)
+    return LINK_PATTERN.match(text, i)
+
+
+def _find_delimiter(text, delimiter, start):
+    """
+    Return the index of the next delimiter at or after start, ignoring
+    markup around it, or -1. A "*" that is part of "**" does not count.
+    """
+    i = text.find(delimiter, start)
+    while delimiter == "*" and i != -1 and text.startswith("**", i):
+        i = text.find("*", i + 2)
+    return i
+
+
+def _find_closing_delimiter(text, delimiter, start):
+    """
+    Find where the span opened by delimiter (ending at start) is closed.
+    Walks forward with a delimiter stack so nested spans of other kinds
+    are skipped over; code spans and links are skipped as a whole.
+    Inner openers that are never closed are treated as literal text.
+    Returns the index of the closing delimiter, or -1 if there is none.
+    """
+    if delimiter == "`":
+        return text.find("`", start)
+
+    stack = [delimiter]
+    i = start
+    while True:
+        match = INLINE_MARKUP_PATTERN.search(text, i)
+        if match is None:
+            return -1
+        i = match.start()
+        char = text[i]
+
+        if char == "!" or char == "[":
+            link = _link_or_image_at(text, i)
+            i = link.end() if link else i + 1
             continue
-        
-        links = extract_markdown_links(old_node.text)
-        
-        if not links:
-            new_nodes.append(old_node)
+
+        if char == "`":
+            close = text.find("`", i + 1)
+            i = close + 1 if close != -1 else i + 1
             continue
-        
-        remaining_text = old_node.text
-        for anchor_text, url in links:
-            # Construct the markdown syntax
-            markdown = f"[{anchor_text}]({url})"
-            
-            # Split by this markdown (should only split once)
-            parts = remaining_text.split(markdown, 1)
-            
-            if len(parts) != 2:
-                raise ValueError(f"Link markdown not found: {markdown}")
-            
-            # Add text before the link (if not empty)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            
-            # Add the link node
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
-            
-            # Continue with remaining text
-            remaining_text = parts[1]
-        
-        # Add any remaining text after the last link
-        if remaining_text:
-            new_nodes.append(TextNode(remaining_text, TextType.TEXT))
-    
-    return new_nodes
+
+        token = _delimiter_at(text, i)
+        if token in stack:
+            # Closes the innermost matching span, dropping unclosed openers
+            while stack.pop() != token:
+                pass
+            if not stack:
+                return i
+        else:
+            stack.append(token)
+        i += len(token)
 
 
 def text_to_textnodes(text):
     """
     Convert raw markdown text to a list of TextNode objects.
-    Applies all splitting functions in sequence: bold, italic, code, images, links.
+    Scans the text once, left to right, emitting bold, italic, code, image
+    and link nodes as they are found. Markup nested inside bold, italic and
+    link text is kept verbatim in the node's text and expanded when the
+    node is converted to HTML.
     """
-    # Start with a single TEXT node containing all the text
-    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = []
+    text_start = 0
+    i = 0
+    
+    while True:
+        match = INLINE_MARKUP_PATTERN.search(text, i)
+        if match is None:
+            break
+        i = match.start()
+        char = text[i]
+        
+        if char == "!" or char == "[":
+            link = _link_or_image_at(text, i)
+            if link is None:
+                i += 1
+                continue
+            if text_start < i:
+                nodes.append(TextNode(text[text_start:i], TextType.TEXT))
+            text_type = TextType.IMAGE if char == "!" else TextType.LINK
+            nodes.append(TextNode(link.group(1), text_type, link.group(2)))
+            i = text_start = link.end()
+            continue
+        
+        delimiter = _delimiter_at(text, i)
+        content_start = i + len(delimiter)
+        close = _find_closing_delimiter(text, delimiter, content_start)
+        if close == -1:
+            # Like splitting the text on the delimiter, a closer inside a
+            # code span or link still closes the span
+            close = _find_delimiter(text, delimiter, content_start)
+        if close == -1:
+            raise ValueError(f"Invalid markdown: no closing delimiter found for '{delimiter}'")
+        
+        if text_start < i:
+            nodes.append(TextNode(text[text_start:i], TextType.TEXT))
+        if content_start < close:
+            nodes.append(TextNode(text[content_start:close], DELIMITER_TYPES[delimiter]))
+        i = text_start = close + len(delimiter)
     
-    # Apply all the splitting functions in sequence
-    # Important: Process ** before * to avoid conflicts
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    if text_start < len(text):
+        nodes.append(TextNode(text[text_start:], TextType.TEXT))
     
     return nodes
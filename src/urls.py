@@ -0,0 +1,83 @@
+class UrlResolver:
+    """
+    Turns the URLs written in markdown into the URLs written to the page.
+    Root-relative URLs ("/blog/") are prefixed with the basepath while the
+    page is being built, so that text which merely looks like a URL, such
+    as an href="/ inside a code block, is never rewritten.
+
+    With a fingerprint.AssetMap, root-relative URLs of fingerprinted
+    assets are first replaced by their hashed names, keeping any query
+    string or fragment.
+
+    With an imagesize.ImageSizes, images get their dimensions and are
+    loaded lazily; see image_attributes().
+    """
+
+    __slots__ = ("basepath", "assets", "images")
+
+    def __init__(self, basepath="/", assets=None, images=None):
+        self.basepath = basepath
+        self.assets = assets
+        self.images = images
+
+    @property
+    def cache_key(self):
+        """Identifies everything resolve() and image_attributes() depend on, for keying caches."""
+        key = self.basepath
+        if self.assets:
+            key += f"\0{self.assets.key}"
+        if self.images is not None:
+            key += f"\0images:{self.images.key}"
+        return key
+
+    def resolve(self, url):
+        """Return url as it should appear in the generated HTML."""
+        if self.assets:
+            url = resolve_asset(url, self.assets)
+        # Protocol-relative URLs ("//cdn.example.com/") point at another host
+        if self.basepath == "/" or not url.startswith("/") or url.startswith("//"):
+            return url
+        return self.basepath + url[1:]
+
+    def image_attributes(self, url):
+        """
+        Return the extra attributes of an image written as url in markdown.
+        Every image is loaded lazily and decoded off the main thread, and
+        images found in static/ also get their width and height, so the
+        browser can reserve their space before they load. Without image
+        sizes, there are no extra attributes.
+        """
+        if self.images is None:
+            return {}
+        attributes = {}
+        size = self.images.get(_url_path(url))
+        if size is not None:
+            attributes["width"], attributes["height"] = str(size[0]), str(size[1])
+        attributes["loading"] = "lazy"
+        attributes["decoding"] = "async"
+        return attributes
+
+    def __repr__(self):
+        return (
+            f"UrlResolver(basepath={self.basepath!r}, assets={len(self.assets or ())}, "
+            f"images={len(self.images or ())})"
+        )
+
+
+def _url_path(url):
+    """Return url without its query string and fragment."""
+    end = len(url)
+    for separator in "?#":
+        position = url.find(separator)
+        if position != -1 and position < end:
+            end = position
+    return url[:end]
+
+
+def resolve_asset(url, assets):
+    """Return url with its path replaced by the fingerprinted path from assets, if there is one."""
+    path = _url_path(url)
+    hashed = assets.get(path)
+    if hashed is None:
+        return url
+    return hashed + url[len(path):]
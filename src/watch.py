@@ -0,0 +1,342 @@
+import os
+import queue
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from blockhandler import parse_markdown
+from docinfo import document_title
+from frontmatter import resolve_page_template, split_front_matter, template_values
+from options import as_build_options
+from sync import sync_static
+
+
+LIVE_RELOAD_PATH = "/__livereload"
+
+# The directory under .cache/ that --watch builds into and serves
+WATCH_DIRNAME = "watch"
+
+# Injected into HTML responses by the development server, never into docs/
+LIVE_RELOAD_SNIPPET = (
+    "<script>"
+    f'new EventSource("{LIVE_RELOAD_PATH}").onmessage = function () {{ location.reload(); }};'
+    "</script>"
+)
+
+
+# A directory listed this soon after its last change is listed again on the
+# next scan, since another change within the same mtime tick would not show
+DIRECTORY_SETTLE_NS = 1_000_000_000
+
+
+class DirectoryScanner:
+    """
+    Maps every file under root (optionally only *suffix files) to
+    (mtime_ns, size), scan after scan. A directory is only listed again
+    when its mtime changes, which happens when entries are added, removed
+    or renamed in it, so an unchanged tree costs one stat per directory
+    and one per file. Files are still stat'ed on every scan, because
+    editing a file in place leaves the mtime of its directory alone.
+    """
+
+    def __init__(self, root, suffix=None):
+        self.root = root
+        self.suffix = suffix
+        # directory path -> (mtime_ns, settled, file paths, subdirectory paths)
+        self._listings = {}
+
+    def _list(self, path, mtime_ns):
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    subdirs.append(entry.path)
+                elif self.suffix is None or entry.name.endswith(self.suffix):
+                    files.append(entry.path)
+        settled = time.time_ns() - mtime_ns > DIRECTORY_SETTLE_NS
+        return (mtime_ns, settled, files, subdirs)
+
+    def scan(self):
+        state = {}
+        listings = {}
+        stack = [self.root]
+        while stack:
+            path = stack.pop()
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+                listing = self._listings.get(path)
+                if listing is None or listing[0] != mtime_ns or not listing[1]:
+                    listing = self._list(path, mtime_ns)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            listings[path] = listing
+            stack.extend(listing[3])
+            for file_path in listing[2]:
+                current = file_state(file_path)
+                if current is not None:
+                    state[file_path] = current
+        self._listings = listings
+        return state
+
+
+def file_state(path):
+    """Return the (mtime_ns, size) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class SiteWatcher:
+    """
+    Keeps the generated site in dest_dir up to date by polling the sources.
+    Every page depends on its markdown source and on the template. Parsed
+    trees are cached, so a changed source re-renders only its own page and
+    a changed template re-renders every page without parsing any markdown.
+    Drafts are built too, so they can be previewed. Pages that name their
+    own template in front matter are not re-rendered when it changes.
+    Pages are built with options, an options.BuildOptions.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, options=None):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.options = as_build_options(options)
+        self.template = None
+        # source path -> destination path
+        self.pages = {}
+        # source path -> (html_node, title, front matter)
+        self.trees = {}
+        self._content_state = {}
+        self._static_state = {}
+        self._template_state = None
+        self._content_scanner = DirectoryScanner(content_dir, ".md")
+        self._static_scanner = DirectoryScanner(static_dir)
+
+    def _dest_path(self, src_path):
+        rel_path = os.path.relpath(src_path, self.content_dir)
+        return os.path.join(self.dest_dir, rel_path[:-3] + ".html")
+
+    def _parse(self, src_path):
+        with open(src_path, "r") as f:
+            markdown_content = f.read()
+        front_matter, markdown_content = split_front_matter(markdown_content)
+        html_node, info = parse_markdown(markdown_content, resolver=self.options.resolver())
+        self.trees[src_path] = (html_node, document_title(info, markdown_content), front_matter)
+
+    def _render(self, src_path):
+        from main import write_page
+
+        html_node, title, front_matter = self.trees[src_path]
+        template_path = resolve_page_template(front_matter, self.template_path)
+        if template_path == self.template_path:
+            template = self.template
+        else:
+            template = self.options.load_template(template_path)
+        values = template_values(front_matter, template.slots)
+        write_page(self.pages[src_path], template, values.get("title") or title, html_node, values=values)
+
+    def _update_page(self, src_path):
+        """Parse and render one page; errors are reported, not raised."""
+        try:
+            self._parse(src_path)
+            self._render(src_path)
+        except Exception as e:
+            print(f"Error generating page {src_path}: {e}")
+            return False
+        return True
+
+    def _rerender_page(self, src_path):
+        """Render one page from its cached tree; errors are reported, not raised."""
+        try:
+            self._render(src_path)
+        except Exception as e:
+            print(f"Error generating page {src_path}: {e}")
+            return False
+        return True
+
+    def _remove_page(self, src_path):
+        dest_path = self.pages.pop(src_path)
+        self.trees.pop(src_path, None)
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        return dest_path
+
+    def build(self):
+        """Build the whole site and remember the state of every input."""
+        sync_static(self.static_dir, self.dest_dir)
+        self._static_state = self._static_scanner.scan()
+        self._template_state = file_state(self.template_path)
+        self.template = self.options.compile_template(self.template_path)
+        self._content_state = self._content_scanner.scan()
+        for src_path in sorted(self._content_state):
+            self.pages[src_path] = self._dest_path(src_path)
+            self._update_page(src_path)
+
+    def poll(self):
+        """
+        Check the inputs once and rebuild whatever depends on a change.
+        Returns the list of output paths that were written or removed.
+        """
+        changed = []
+
+        content_state = self._content_scanner.scan()
+        for src_path in sorted(self._content_state.keys() - content_state.keys()):
+            if src_path in self.pages:
+                changed.append(self._remove_page(src_path))
+        rendered = set()
+        # Only the changed sources are sorted, not the whole site
+        updated = [src_path for src_path, state in content_state.items() if self._content_state.get(src_path) != state]
+        for src_path in sorted(updated):
+            self.pages[src_path] = self._dest_path(src_path)
+            if self._update_page(src_path):
+                changed.append(self.pages[src_path])
+            rendered.add(src_path)
+        self._content_state = content_state
+
+        template_state = file_state(self.template_path)
+        if template_state != self._template_state:
+            self._template_state = template_state
+            try:
+                self.template = self.options.compile_template(self.template_path)
+            except OSError as e:
+                print(f"Error reading template {self.template_path}: {e}")
+            else:
+                for src_path in sorted(self.trees):
+                    if src_path not in rendered and self._rerender_page(src_path):
+                        changed.append(self.pages[src_path])
+
+        static_state = self._static_scanner.scan()
+        if static_state != self._static_state:
+            self._static_state = static_state
+            result = sync_static(self.static_dir, self.dest_dir)
+            changed.extend(result.copied)
+            changed.extend(result.deleted)
+
+        return changed
+
+
+class ReloadBroadcaster:
+    """Fans reload events out to every connected Server-Sent Events client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = set()
+
+    def subscribe(self):
+        client = queue.Queue()
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def notify(self, event="reload"):
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.put(event)
+
+
+def inject_live_reload(html):
+    """Insert the live reload script before </body>, or append it."""
+    index = html.rfind("</body>")
+    if index == -1:
+        return html + LIVE_RELOAD_SNIPPET
+    return html[:index] + LIVE_RELOAD_SNIPPET + html[index:]
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the generated site, adds the live reload script to HTML pages
+    and streams reload events on LIVE_RELOAD_PATH.
+    """
+
+    def __init__(self, *args, broadcaster=None, **kwargs):
+        self.broadcaster = broadcaster
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self._stream_events()
+            return
+
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.endswith("/"):
+            path = os.path.join(path, "index.html")
+        if not path.endswith(".html") or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, "r") as f:
+            body = inject_live_reload(f.read()).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        client = self.broadcaster.subscribe()
+        try:
+            while True:
+                try:
+                    event = client.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps idle connections open
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    self.wfile.write(f"data: {event}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.broadcaster.unsubscribe(client)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def watch_site(content_dir, static_dir, template_path, dest_dir, options=None, port=8888, interval=0.1):
+    """
+    Build the site with options, an options.BuildOptions, serve dest_dir
+    on port with live reload, and rebuild whatever changed every interval
+    seconds until interrupted. dest_dir must not be the deployed docs/:
+    drafts are built too, and no build manifest is kept.
+    """
+    watcher = SiteWatcher(content_dir, static_dir, template_path, dest_dir, options)
+    watcher.build()
+
+    broadcaster = ReloadBroadcaster()
+    handler = partial(LiveReloadHandler, directory=dest_dir, broadcaster=broadcaster)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {dest_dir} at http://localhost:{port} (watching for changes, Ctrl+C to stop)")
+
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            changed = watcher.poll()
+            if changed:
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"Rebuilt {len(changed)} file(s) in {elapsed:.1f} ms")
+                broadcaster.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()